@@ -4,7 +4,7 @@ from .models import MatchResult
 
 @admin.register(MatchResult)
 class MatchResultAdmin(admin.ModelAdmin):
-    list_display = ('id', 'overall_match', 'skill_match', 'experience_match', 'created_at')
-    list_filter = ('created_at',)
-    search_fields = ('cv_text', 'jd_text')
+    list_display = ('id', 'overall_match', 'skill_match', 'experience_match', 'scoring_version', 'created_at')
+    list_filter = ('created_at', 'scoring_version')
+    search_fields = ('cv_text', 'jd_text', 'cv_hash', 'jd_hash')
     readonly_fields = ('created_at',)
@@ -1,6 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        # Warm the models without blocking startup; /api/ready/ reports 503
+        # until this finishes
+        if getattr(settings, 'MODEL_WARMUP_ON_READY', False):
+            from matcher.ml.model_loader import models
+            models.warmup_in_background()
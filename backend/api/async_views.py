@@ -0,0 +1,204 @@
+"""
+Native async variants of the prediction endpoints for ASGI deployments
+
+The event loop only awaits: multipart parsing, file extraction and the
+prediction pipeline run on a bounded thread pool, so one process can hold
+many slow uploads open while CPU work proceeds. If the client disconnects
+the request task is cancelled (see cvmatcher/asgi.py) and any stages not yet
+started are skipped.
+"""
+
+import asyncio
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from rest_framework import status
+
+from .serializers import PredictRequestSerializer, PredictWithFilesSerializer
+from .views import _compute_prediction
+from matcher.ml.file_extractor import FileExtractor, FileExtractionError
+from matcher.ml.metrics import Counter, registry
+
+REJECTED_TOTAL = registry.register(Counter(
+    'cvmatcher_async_rejected_total', 'Async requests refused with 503 because the queue was full.'
+))
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'ASYNC_CPU_WORKERS', None) or os.cpu_count() or 1,
+    thread_name_prefix='async-cpu'
+)
+# Caps how many requests may be queued for the pool at once; requests
+# beyond it are refused with 503 rather than waiting on the semaphore
+_admission = None
+
+
+def _get_admission() -> asyncio.Semaphore:
+    global _admission
+    if _admission is None:
+        _admission = asyncio.Semaphore(getattr(settings, 'ASYNC_MAX_PENDING', 256))
+    return _admission
+
+
+async def _run_cpu(func, *args):
+    """
+    Run a blocking function on the bounded executor
+    The caller's context variables are carried over, so stage timings
+    recorded on the pool reach this request's Server-Timing header.
+    """
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, context.run, func, *args)
+
+
+def _admit() -> Optional[asyncio.Semaphore]:
+    """The admission semaphore, or None when it is exhausted"""
+    admission = _get_admission()
+    # Checked and acquired without an await in between, so on one event
+    # loop no other request can take the last slot in between
+    if admission.locked():
+        REJECTED_TOTAL.inc()
+        return None
+    return admission
+
+
+def _busy_response() -> JsonResponse:
+    response = JsonResponse(
+        {'error': 'Server busy, retry later'}, status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = '1'
+    return response
+
+
+def _errors_response(errors) -> JsonResponse:
+    return JsonResponse(errors, status=status.HTTP_400_BAD_REQUEST, safe=False)
+
+
+async def _predict_response(request, cv_text: str, jd_text: str) -> HttpResponse:
+    response_data, status_code, headers = await _run_cpu(
+        _compute_prediction, cv_text, jd_text, request.headers.get('If-None-Match')
+    )
+    if response_data is None:
+        response = HttpResponse(status=status_code)
+    else:
+        response = JsonResponse(response_data, status=status_code)
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+async def predict_async(request):
+    """
+    Async counterpart of PredictionView (text only)
+
+    Expected POST data (JSON):
+    {
+        "cv_text": "...",
+        "jd_text": "..."
+    }
+    """
+    if request.method != 'POST':
+        return JsonResponse(
+            {'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    # ASGIHandler has already read the body without blocking the loop
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return _errors_response({'error': 'Invalid JSON body'})
+
+    serializer = PredictRequestSerializer(data=data)
+    if not serializer.is_valid():
+        return _errors_response(serializer.errors)
+
+    cv_text = serializer.validated_data.get('cv_text', '').strip()
+    jd_text = serializer.validated_data.get('jd_text', '').strip()
+
+    admission = _admit()
+    if admission is None:
+        return _busy_response()
+    async with admission:
+        return await _predict_response(request, cv_text, jd_text)
+
+
+def _parse_multipart(request) -> dict:
+    data = request.POST.dict()
+    data.update(request.FILES.dict())
+    return data
+
+
+async def predict_with_files_async(request):
+    """
+    Async counterpart of FileUploadPredictionView
+
+    Expected POST data (multipart/form-data):
+    - cv_file / cv_text
+    - jd_file / jd_text
+    """
+    if request.method != 'POST':
+        return JsonResponse(
+            {'error': 'Method not allowed'}, status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+
+    admission = _admit()
+    if admission is None:
+        return _busy_response()
+    async with admission:
+        data = await _run_cpu(_parse_multipart, request)
+
+        serializer = PredictWithFilesSerializer(data=data)
+        if not serializer.is_valid():
+            return _errors_response(serializer.errors)
+
+        try:
+            cv_text = serializer.validated_data.get('cv_text', '').strip()
+            cv_file = serializer.validated_data.get('cv_file')
+
+            jd_text = serializer.validated_data.get('jd_text', '').strip()
+            jd_file = serializer.validated_data.get('jd_file')
+
+            # Extract both documents concurrently
+            cv_job = _run_cpu(FileExtractor.extract_text, cv_file) if cv_file else None
+            jd_job = _run_cpu(FileExtractor.extract_text, jd_file) if jd_file else None
+            if cv_job and jd_job:
+                cv_text, jd_text = await asyncio.gather(cv_job, jd_job)
+            elif cv_job:
+                cv_text = await cv_job
+            elif jd_job:
+                jd_text = await jd_job
+
+            if not cv_text or not jd_text:
+                return JsonResponse(
+                    {'error': 'Failed to extract text from files'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            return await _predict_response(request, cv_text, jd_text)
+
+        except FileExtractionError as e:
+            return JsonResponse(
+                {
+                    'error': 'File extraction error',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return JsonResponse(
+                {
+                    'error': 'Error processing files',
+                    'details': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+# Equivalent of @csrf_exempt, which only wraps sync views on Django 4.2
+predict_async.csrf_exempt = True
+predict_with_files_async.csrf_exempt = True
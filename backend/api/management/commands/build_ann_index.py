@@ -0,0 +1,61 @@
+"""
+Build (or drop) the approximate nearest-neighbour index of the CV index
+
+    python manage.py build_ann_index
+    python manage.py build_ann_index --nlist 4096 --pq-m 48
+    python manage.py build_ann_index --drop
+
+Trains the IVF centroids on a sample of the stored embeddings and assigns
+every CV to its inverted list. Later adds and removals keep it up to date,
+so it only needs rebuilding when the pool has grown or changed a lot since
+training. Use benchmarks/bench_ann.py to choose nlist, pq_m and nprobe.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matcher.ml.ann_index import IVFIndexError
+from matcher.ml.conf import get_setting
+from matcher.ml.cv_index import CVIndex, CVIndexError, get_cv_index
+
+
+class Command(BaseCommand):
+    help = 'Build the IVF approximate nearest-neighbour index over the CV index embeddings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--nlist', type=int, help='inverted lists (default: ~4 * sqrt(pool size))')
+        parser.add_argument('--nprobe', type=int, default=None,
+                            help='default lists scanned per search (default: the CV_INDEX_NPROBE setting)')
+        parser.add_argument('--pq-m', type=int, default=0,
+                            help='product-quantisation bytes per vector (default: 0, store vectors)')
+        parser.add_argument('--iterations', type=int, default=20, help='k-means iterations')
+        parser.add_argument('--index-dir', help='CV index directory (default: the CV_INDEX_DIR setting)')
+        parser.add_argument('--drop', action='store_true', help='remove the ANN index and go back to full scans')
+
+    def handle(self, *args, **options):
+        if options['index_dir']:
+            index = CVIndex(options['index_dir'], dtype=get_setting('CV_INDEX_DTYPE', 'float32'))
+        else:
+            index = get_cv_index()
+
+        if options['drop']:
+            index.drop_ann()
+            self.stdout.write(self.style.SUCCESS("ANN index removed"))
+            return
+
+        started = time.perf_counter()
+        try:
+            ann = index.build_ann(
+                nlist=options['nlist'],
+                nprobe=options['nprobe'] or get_setting('CV_INDEX_NPROBE', 16),
+                pq_m=options['pq_m'],
+                iterations=options['iterations'],
+            )
+        except (CVIndexError, IVFIndexError) as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {ann.ntotal} CVs into {ann.nlist} lists "
+            f"({ann.nbytes / 1e6:.1f} MB) in {time.perf_counter() - started:.1f}s"
+        ))
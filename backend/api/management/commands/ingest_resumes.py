@@ -0,0 +1,229 @@
+"""
+Bulk-load resumes from a directory or zip archive into the CV index
+
+    python manage.py ingest_resumes /data/client-resumes --report errors.csv
+    python manage.py ingest_resumes resumes.zip --workers 16 --skip-existing
+
+Extraction, normalisation and feature extraction run across a process pool;
+each worker opens zip members itself, so no document bytes cross the pipes
+and parsing scales with the number of cores. The main process keeps a
+bounded window of documents in flight, batch-encodes the cleaned texts and
+adds features plus embeddings to the CV index in bulk. Files that cannot be
+read are written to the report and do not stop the run, including ones
+whose parser crashes or runs out of memory and takes its worker down.
+"""
+
+import csv
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matcher.ml import predictor
+from matcher.ml.bulk import ingest_document, make_pool
+from matcher.ml.conf import get_setting
+from matcher.ml.cv_index import CVIndex, get_cv_index
+from matcher.ml.file_extractor import FileExtractor
+from matcher.ml.vectors import normalize_rows
+
+# Every batch is journaled; save() also flushes the vectors and compacts the
+# journal once it is long, so it runs every few batches (and compact() at the end)
+SAVE_EVERY_BATCHES = 20
+
+
+def iter_sources(path: str):
+    """
+    Yield (name, archive_member, size) for every supported resume under path
+    archive_member is None for files on disk; name is the path relative to
+    the directory, or the member name inside the zip
+    """
+    supported = tuple(FileExtractor.EXTRACTORS)
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(supported):
+                    yield info.filename, info.filename, info.file_size
+        return
+
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.lower().endswith(supported):
+                full_path = os.path.join(root, file_name)
+                yield os.path.relpath(full_path, path), None, os.path.getsize(full_path)
+
+
+class Command(BaseCommand):
+    help = 'Extract, featurise and embed resumes from a directory or zip archive into the CV index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='directory of resumes or a .zip archive')
+        parser.add_argument('--workers', type=int, default=None, help='extraction processes (default: CPU count)')
+        parser.add_argument('--batch-size', type=int, default=256,
+                            help='documents encoded and stored together')
+        parser.add_argument('--encode-batch-size', type=int, default=64, help='texts per encoder forward pass')
+        parser.add_argument('--id', choices=('path', 'hash'), default='path',
+                            help='index ids: the relative path/member name, or the cleaned-text hash')
+        parser.add_argument('--skip-existing', action='store_true',
+                            help='skip files whose path id is already indexed (resumes an interrupted run)')
+        parser.add_argument('--index-dir', help='CV index directory (default: the CV_INDEX_DIR setting)')
+        parser.add_argument('--report', default='ingest_errors.csv', help='CSV report of files that failed')
+
+    def handle(self, *args, **options):
+        source = os.path.abspath(options['source'])
+        if not os.path.exists(source):
+            raise CommandError(f"Source not found: {source}")
+        if options['skip_existing'] and options['id'] != 'path':
+            raise CommandError("--skip-existing needs --id path")
+
+        self.options = options
+        if options['index_dir']:
+            self.index = CVIndex(options['index_dir'], dtype=get_setting('CV_INDEX_DTYPE', 'float32'))
+        else:
+            self.index = get_cv_index()
+        self.workers = options['workers'] or os.cpu_count() or 1
+        # Enough queued work to keep every worker busy, without holding the
+        # whole corpus in memory
+        window = self.workers * 4
+
+        self.batch = []  # (name, cleaned_text, features)
+        self.batches = 0
+        self.stored = self.failed = self.skipped = 0
+        self.started = time.perf_counter()
+
+        self.pool = make_pool(self.workers)
+        try:
+            with open(options['report'], 'w', encoding='utf-8', newline='') as report_file:
+                self.report = csv.writer(report_file)
+                self.report.writerow(['file', 'error'])
+
+                in_flight = {}  # future -> (name, ingest_document arguments)
+                for name, member, size in iter_sources(source):
+                    if options['skip_existing'] and name in self.index:
+                        self.skipped += 1
+                        continue
+                    if size > FileExtractor.MAX_FILE_SIZE:
+                        self.fail(name, f"File exceeds {FileExtractor.MAX_FILE_SIZE // (1024 * 1024)} MB limit")
+                        continue
+
+                    job = (os.path.join(source, name),) if member is None else (source, member)
+                    self.submit(name, job, in_flight)
+
+                    if len(in_flight) >= window:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        self.collect_done(done, in_flight)
+
+                self.collect_done(wait(in_flight).done, in_flight)
+
+                self.flush()
+                self.index.compact()
+        finally:
+            self.pool.shutdown()
+
+        elapsed = time.perf_counter() - self.started
+        processed = self.stored + self.failed
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {self.stored} resumes, {self.failed} failed, {self.skipped} skipped "
+            f"in {elapsed:.1f}s ({processed / elapsed if elapsed else 0:.1f} docs/s); "
+            f"index now holds {len(self.index)}"
+        ))
+        if self.failed:
+            self.stdout.write(f"Failures written to {options['report']}")
+
+    def fail(self, name: str, error: str) -> None:
+        self.failed += 1
+        self.report.writerow([name, error])
+
+    def submit(self, name: str, job: tuple, in_flight: dict) -> None:
+        try:
+            future = self.pool.submit(ingest_document, *job)
+        except BrokenProcessPool:
+            # A worker died since results were last collected
+            self.recover([], in_flight)
+            future = self.pool.submit(ingest_document, *job)
+        in_flight[future] = (name, job)
+
+    def collect_done(self, done, in_flight: dict) -> None:
+        """Collect finished futures; recover the pool if a worker died"""
+        crashed = self.collect_futures(done, in_flight)
+        if crashed:
+            self.recover(crashed, in_flight)
+
+    def collect_futures(self, done, in_flight: dict) -> list:
+        """Collect finished futures; returns the (name, job) of those a dead worker failed"""
+        crashed = []
+        for future in done:
+            name, job = in_flight.pop(future)
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                crashed.append((name, job))
+                continue
+            self.collect(name, result)
+        return crashed
+
+    def recover(self, crashed: list, in_flight: dict) -> None:
+        """
+        A worker died (a parser crashed or was killed for memory), which
+        breaks the pool and fails every document in flight. Collect what
+        still finished, retry the failed documents one at a time in a
+        single-worker pool, so only those that kill a worker on their own
+        are reported, and carry on with a new pool.
+        """
+        crashed = crashed + self.collect_futures(wait(in_flight).done, in_flight)
+        self.pool.shutdown()
+
+        isolated = make_pool(1)
+        try:
+            for name, job in crashed:
+                try:
+                    result = isolated.submit(ingest_document, *job).result()
+                except BrokenProcessPool:
+                    self.fail(name, "Worker process died while extracting (parser crash or out of memory)")
+                    isolated.shutdown()
+                    isolated = make_pool(1)
+                    continue
+                self.collect(name, result)
+        finally:
+            isolated.shutdown()
+
+        self.pool = make_pool(self.workers)
+
+    def collect(self, name: str, result) -> None:
+        cleaned, features, error = result
+        if error:
+            self.fail(name, error)
+            return
+        self.batch.append((name, cleaned, features))
+        if len(self.batch) >= self.options['batch_size']:
+            self.flush()
+
+    def flush(self) -> None:
+        """Encode the pending batch and add it to the index"""
+        if not self.batch:
+            return
+
+        texts = [cleaned for _, cleaned, _ in self.batch]
+        predictor.add_semantic_skills(texts, [features for _, _, features in self.batch])
+        vectors = normalize_rows(predictor.encode_batched(texts, self.options['encode_batch_size']))
+
+        entries = []
+        for name, cleaned, features in self.batch:
+            text_hash = CVIndex.text_hash(cleaned)
+            features['id'] = name if self.options['id'] == 'path' else text_hash
+            features['text_hash'] = text_hash
+            entries.append(features)
+
+        self.batches += 1
+        self.index.add_features(entries, vectors, save=self.batches % SAVE_EVERY_BATCHES == 0)
+        self.stored += len(entries)
+        self.batch = []
+
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f"{self.stored} indexed, {self.failed} failed, "
+            f"{(self.stored + self.failed) / elapsed if elapsed else 0:.1f} docs/s"
+        )
@@ -0,0 +1,274 @@
+"""
+Score CV/JD pairs offline from a CSV or JSONL file
+
+    python manage.py score_pairs pairs.jsonl --output scores.jsonl
+    python manage.py score_pairs pairs.csv --output scores.csv --paths --workers 8
+    python manage.py score_pairs pairs.jsonl --output scores.jsonl --resume
+
+Input is streamed in chunks. For each chunk the distinct texts (or document
+paths) are cleaned and featurised across a process pool while the previous
+chunk is encoded and scored. The distinct cleaned texts are encoded in
+batches, and the pairs are scored with the batch equivalent of predict_match.
+Results are appended to the output file. After every chunk a checkpoint
+records how many input records are done and how long the output is, so
+--resume continues a crashed run without duplicating or losing rows.
+"""
+
+import csv
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from matcher.ml import predictor
+from matcher.ml.bulk import make_pool, prepare_text
+
+RESULT_FIELDS = (
+    'id', 'skill_match', 'experience_match', 'education_match',
+    'semantic_similarity', 'overall_match', 'error'
+)
+
+
+def iter_records(path: str, input_format: str):
+    """Yield one dict per input record without loading the file"""
+    with open(path, 'r', encoding='utf-8', newline='') as input_file:
+        if input_format == 'csv':
+            # CV texts easily exceed the csv module's default field limit
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            yield from csv.DictReader(input_file)
+        else:
+            for line_number, line in enumerate(input_file, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise CommandError(f"{path}:{line_number}: invalid JSON ({e})")
+
+
+def chunked(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def detect_format(path: str) -> str:
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+class Checkpoint:
+    """Progress of a run: input records consumed and bytes of output written"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as checkpoint_file:
+                return json.load(checkpoint_file)
+        except FileNotFoundError:
+            return {}
+
+    def save(self, state: dict) -> None:
+        # Atomic replace, so a crash never leaves a half-written checkpoint
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as temp_file:
+            json.dump(state, temp_file)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Command(BaseCommand):
+    help = 'Score CV/JD pairs from a CSV or JSONL file and stream the results to a file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='CSV or JSONL file with one CV/JD pair per record')
+        parser.add_argument('--output', required=True, help='results file (.csv or .jsonl)')
+        parser.add_argument('--format', choices=('csv', 'jsonl'), help='input format (default: by extension)')
+        parser.add_argument('--cv-field', default='cv_text', help='field holding the CV (default: cv_text)')
+        parser.add_argument('--jd-field', default='jd_text', help='field holding the JD (default: jd_text)')
+        parser.add_argument('--id-field', default='id',
+                            help='field copied to the output to identify a pair (default: id, '
+                                 'falling back to the record number)')
+        parser.add_argument('--paths', action='store_true',
+                            help='fields hold document paths (relative to the input file) instead of text')
+        parser.add_argument('--workers', type=int, default=None, help='feature processes (default: CPU count)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='pairs held in memory per step')
+        parser.add_argument('--batch-size', type=int, default=64, help='texts per encoder batch')
+        parser.add_argument('--checkpoint', help='checkpoint file (default: <output>.checkpoint)')
+        parser.add_argument('--resume', action='store_true', help='continue from the checkpoint')
+
+    def handle(self, *args, **options):
+        input_path = os.path.abspath(options['input'])
+        output_path = os.path.abspath(options['output'])
+        if not os.path.exists(input_path):
+            raise CommandError(f"Input not found: {input_path}")
+        if options['chunk_size'] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        self.options = options
+        self.workers = options['workers'] or os.cpu_count() or 1
+        self.input_dir = os.path.dirname(input_path)
+        self.output_csv = output_path.lower().endswith('.csv')
+
+        checkpoint = Checkpoint(options['checkpoint'] or output_path + '.checkpoint')
+        run = {
+            'input': input_path,
+            'cv_field': options['cv_field'],
+            'jd_field': options['jd_field'],
+            'paths': options['paths'],
+        }
+
+        state = checkpoint.load() if options['resume'] else {}
+        if state:
+            if state.get('run') != run:
+                raise CommandError(
+                    f"Checkpoint {checkpoint.path} belongs to a different run; remove it or drop --resume"
+                )
+            if not os.path.exists(output_path):
+                raise CommandError(f"Cannot resume: output {output_path} is missing")
+            done, errors = state['records'], state['errors']
+            output_file = open(output_path, 'r+', encoding='utf-8', newline='')
+            # Drop anything written after the last checkpoint
+            output_file.truncate(state['output_bytes'])
+            output_file.seek(state['output_bytes'])
+            self.stdout.write(f"Resuming after {done} records")
+        else:
+            checkpoint.clear()
+            done, errors = 0, 0
+            output_file = open(output_path, 'w', encoding='utf-8', newline='')
+
+        writer = csv.DictWriter(output_file, RESULT_FIELDS) if self.output_csv else None
+        if writer and output_file.tell() == 0:
+            writer.writeheader()
+
+        records = iter_records(input_path, options['format'] or detect_format(input_path))
+        chunks = chunked(itertools.islice(enumerate(records), done, None), options['chunk_size'])
+
+        started = time.perf_counter()
+        scored_this_run = 0
+
+        with make_pool(self.workers) as pool, output_file:
+            # Featurise the next chunk on the pool while this one is encoded
+            pending = self.submit(pool, next(chunks, None))
+            while pending is not None:
+                chunk, prepared = pending
+                pending = self.submit(pool, next(chunks, None))
+
+                rows = self.score_chunk(chunk, dict(prepared))
+                for row in rows:
+                    if writer:
+                        writer.writerow(row)
+                    else:
+                        output_file.write(json.dumps(row) + '\n')
+                output_file.flush()
+                os.fsync(output_file.fileno())
+
+                done = chunk[-1][0] + 1
+                errors += sum(1 for row in rows if row.get('error'))
+                scored_this_run += len(rows)
+                checkpoint.save({
+                    'run': run,
+                    'records': done,
+                    'errors': errors,
+                    'output_bytes': output_file.tell(),
+                })
+
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{done} pairs done ({errors} errors), "
+                    f"{scored_this_run / elapsed if elapsed else 0:.1f} pairs/s"
+                )
+
+        checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f"Scored {done} pairs ({errors} errors) into {output_path}"
+        ))
+
+    def _source(self, record: dict, field: str):
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None
+        value = value.strip()
+        if self.options['paths']:
+            value = os.path.join(self.input_dir, value)
+        return value
+
+    def submit(self, pool, chunk):
+        """Queue every distinct text of a chunk on the pool"""
+        if chunk is None:
+            return None
+        values = set()
+        for _, record in chunk:
+            for field in (self.options['cv_field'], self.options['jd_field']):
+                value = self._source(record, field)
+                if value is not None:
+                    values.add(value)
+        values = list(values)
+        results = pool.map(
+            prepare_text, values, itertools.repeat(self.options['paths']),
+            chunksize=max(1, len(values) // (4 * self.workers))
+        )
+        return chunk, zip(values, results)
+
+    def score_chunk(self, chunk, prepared: dict) -> list:
+        # The workers skip embedding-based skill matching; do it for the
+        # whole chunk in one encode
+        featurised = [(cleaned, features) for cleaned, features, error in prepared.values() if not error]
+        predictor.add_semantic_skills(
+            [cleaned for cleaned, _ in featurised], [features for _, features in featurised]
+        )
+
+        rows = []
+        pairs = []  # (row, cv_text, jd_text, cv_features, jd_features)
+        for number, record in chunk:
+            row = {'id': record.get(self.options['id_field'], number)}
+            rows.append(row)
+
+            sides = []
+            for field in (self.options['cv_field'], self.options['jd_field']):
+                value = self._source(record, field)
+                if value is None:
+                    row['error'] = f"missing {field}"
+                    break
+                cleaned, features, error = prepared[value]
+                if error:
+                    row['error'] = f"{field}: {error}"
+                    break
+                sides.append((cleaned, features))
+
+            if 'error' not in row:
+                (cv_text, cv_features), (jd_text, jd_features) = sides
+                pairs.append((row, cv_text, jd_text, cv_features, jd_features))
+
+        if pairs:
+            # Each distinct text (and experience text) is encoded once
+            texts = set()
+            for _, cv_text, jd_text, cv_features, jd_features in pairs:
+                texts.update((cv_text, jd_text))
+                if cv_features['experience_text'] and jd_features['experience_text']:
+                    texts.update((cv_features['experience_text'], jd_features['experience_text']))
+            texts = list(texts)
+            vectors = dict(zip(texts, predictor.encode_batched(texts, self.options['batch_size'])))
+
+            results = predictor.score_pairs(
+                [pair[1] for pair in pairs], [pair[2] for pair in pairs],
+                [pair[3] for pair in pairs], [pair[4] for pair in pairs],
+                vectors,
+            )
+            for (row, *_), result in zip(pairs, results):
+                row.update(result)
+
+        return rows
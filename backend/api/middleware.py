@@ -0,0 +1,59 @@
+"""
+Request metrics middleware
+
+Counts requests and their latency per route, tracks requests in flight and
+collects the stage timings recorded while the view runs (matcher/ml/metrics.py)
+into a Server-Timing response header. Works for both sync (WSGI) and async
+(ASGI) request handling without forcing an adapter on either.
+"""
+
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from matcher.ml.metrics import (
+    REQUEST_SECONDS, REQUESTS_IN_FLIGHT, REQUESTS_TOTAL, collect_timings
+)
+
+
+def _route(request) -> str:
+    # The URL pattern rather than the path, so ids do not become label values
+    match = getattr(request, 'resolver_match', None)
+    return match.route if match is not None else 'unmatched'
+
+
+def _record(request, response, timings, start: float) -> None:
+    elapsed = time.perf_counter() - start
+    route = _route(request)
+    REQUEST_SECONDS.observe(elapsed, method=request.method, route=route)
+    REQUESTS_TOTAL.inc(method=request.method, route=route, status=response.status_code)
+    response['Server-Timing'] = timings.server_timing(total=elapsed)
+
+
+@sync_and_async_middleware
+def request_metrics_middleware(get_response):
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            start = time.perf_counter()
+            REQUESTS_IN_FLIGHT.inc()
+            try:
+                with collect_timings() as timings:
+                    response = await get_response(request)
+            finally:
+                REQUESTS_IN_FLIGHT.dec()
+            _record(request, response, timings, start)
+            return response
+    else:
+        def middleware(request):
+            start = time.perf_counter()
+            REQUESTS_IN_FLIGHT.inc()
+            try:
+                with collect_timings() as timings:
+                    response = get_response(request)
+            finally:
+                REQUESTS_IN_FLIGHT.dec()
+            _record(request, response, timings, start)
+            return response
+
+    return middleware
@@ -1 +1,27 @@
-# Database models removed - using stateless API only
+from django.db import models
+
+
+class MatchResult(models.Model):
+    """
+    Audit record of one served CV/JD score
+    Written in batches by api/recorder.py, never on the request path. With
+    MATCH_RECORDER_STORE_TEXT off only the SHA-256 hashes of the texts are
+    kept and cv_text/jd_text stay empty.
+    """
+    cv_text = models.TextField()
+    jd_text = models.TextField()
+    cv_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    jd_hash = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    skill_match = models.FloatField()
+    experience_match = models.FloatField()
+    education_match = models.FloatField()
+    semantic_similarity = models.FloatField()
+    overall_match = models.FloatField()
+    scoring_version = models.CharField(max_length=16, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"MatchResult {self.pk}: {self.overall_match}"
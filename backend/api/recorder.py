@@ -0,0 +1,251 @@
+"""
+Write-behind recording of served scores into MatchResult
+
+Views hand each result to record_match(), which only appends it to a bounded
+in-memory queue. A background thread drains the queue and inserts rows with
+bulk_create once batch_size results are waiting or flush_interval seconds
+after the oldest one arrived, so no request waits on the database.
+
+If the database falls behind and the queue fills, record() waits up to
+block_seconds for room (0: not at all) and then drops the result. Drops are
+counted in /api/metrics/ and the audit trail is best effort by design. A
+batch whose insert fails with an OperationalError (e.g. SQLite's "database
+is locked" while another worker writes) is retried write_retries times with
+exponential backoff before it is dropped. The queue is flushed when the
+process exits (atexit, and gunicorn's worker_exit). Rows get their
+created_at when they are inserted, at most flush_interval plus the insert
+time after the score was served.
+"""
+
+import atexit
+import hashlib
+import logging
+import queue
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+
+from matcher.ml.metrics import Counter, Gauge, registry
+
+logger = logging.getLogger(__name__)
+
+RECORDED_TOTAL = registry.register(Counter(
+    'cvmatcher_match_results_recorded_total', 'Match results written to the database.'
+))
+DROPPED_TOTAL = registry.register(Counter(
+    'cvmatcher_match_results_dropped_total', 'Match results not written, by reason.', ('reason',)
+))
+WRITE_RETRIES_TOTAL = registry.register(Counter(
+    'cvmatcher_match_results_write_retries_total', 'Match result batch inserts retried after an error.'
+))
+QUEUE_SIZE = registry.register(Gauge(
+    'cvmatcher_match_results_queued', 'Match results waiting to be written.'
+))
+
+SCORE_FIELDS = (
+    'skill_match', 'experience_match', 'education_match', 'semantic_similarity', 'overall_match'
+)
+
+# Queue markers for the writer thread
+_STOP = object()
+
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class MatchRecorder:
+    """Bounded queue of match results drained by one writer thread"""
+
+    def __init__(self, max_queue: int = 10000, batch_size: int = 500, flush_interval: float = 2.0,
+                 block_seconds: float = 0.0, store_text: bool = True, write_retries: int = 3,
+                 retry_backoff: float = 0.1, max_backoff: float = 2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_seconds = block_seconds
+        self.store_text = store_text
+        self.write_retries = write_retries
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self) -> None:
+        # Started on first use rather than at import, so it is never
+        # created in a process that forks workers afterwards
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='match-recorder', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def record(self, cv_text: str, jd_text: str, result: dict, scoring_version: str = '') -> bool:
+        """Queue one result; returns False if it was dropped"""
+        if self._closed:
+            DROPPED_TOTAL.inc(reason='closed')
+            return False
+        self._ensure_started()
+
+        row = {field: float(result[field]) for field in SCORE_FIELDS}
+        row['scoring_version'] = scoring_version
+        if self.store_text:
+            # Hashed on the writer thread
+            row['cv_text'], row['jd_text'] = cv_text, jd_text
+        else:
+            row['cv_text'] = row['jd_text'] = ''
+            row['cv_hash'], row['jd_hash'] = text_hash(cv_text), text_hash(jd_text)
+
+        try:
+            if self.block_seconds > 0:
+                self._queue.put(row, timeout=self.block_seconds)
+            else:
+                self._queue.put_nowait(row)
+        except queue.Full:
+            DROPPED_TOTAL.inc(reason='queue_full')
+            return False
+        QUEUE_SIZE.inc()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything queued so far; returns False on timeout"""
+        marker = _Flush()
+        # close() sets _closed under the same lock before queueing _STOP, so
+        # a marker queued here is always ahead of it and gets consumed
+        with self._lock:
+            if self._closed or self._thread is None:
+                # After close() the writer has already flushed (or given up)
+                return True
+            try:
+                self._queue.put(marker, timeout=timeout)
+            except queue.Full:
+                return False
+        return marker.done.wait(timeout)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush the queue and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Match recorder queue still full at shutdown; unwritten results are lost")
+            return
+        self._thread.join(timeout)
+
+    # =========================
+    # WRITER THREAD
+    # =========================
+
+    def _run(self) -> None:
+        batch = []
+        deadline = None
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                self._write(batch)
+                return
+            if isinstance(item, _Flush):
+                self._write(batch)
+                batch = []
+                item.done.set()
+                continue
+            if item is not None:
+                QUEUE_SIZE.dec()
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            self._write(batch)
+            batch = []
+
+    def _write(self, batch: list) -> None:
+        if not batch:
+            return
+        from django.db import OperationalError, close_old_connections, connection
+
+        from .models import MatchResult
+
+        for row in batch:
+            if 'cv_hash' not in row:
+                row['cv_hash'], row['jd_hash'] = text_hash(row['cv_text']), text_hash(row['jd_text'])
+
+        # This thread keeps its own connection; drop it if it has gone stale
+        close_old_connections()
+        objects = [MatchResult(**row) for row in batch]
+        for attempt in range(self.write_retries + 1):
+            try:
+                MatchResult.objects.bulk_create(objects, batch_size=self.batch_size)
+                break
+            except OperationalError:
+                # Transient (locked database, dropped connection): back off and retry
+                if attempt == self.write_retries:
+                    logger.exception("Failed to write %d match results after %d attempts",
+                                     len(batch), attempt + 1)
+                    DROPPED_TOTAL.inc(len(batch), reason='write_error')
+                    return
+                WRITE_RETRIES_TOTAL.inc()
+                connection.close()
+                time.sleep(min(self.max_backoff, self.retry_backoff * 2 ** attempt))
+            except Exception:
+                logger.exception("Failed to write %d match results", len(batch))
+                DROPPED_TOTAL.inc(len(batch), reason='write_error')
+                return
+        RECORDED_TOTAL.inc(len(batch))
+
+
+_recorder = None
+_recorder_lock = threading.Lock()
+
+
+def get_match_recorder() -> Optional[MatchRecorder]:
+    """Process-wide recorder configured from settings; None when disabled"""
+    global _recorder
+    if not getattr(settings, 'MATCH_RECORDER_ENABLED', True):
+        return None
+    if _recorder is None:
+        with _recorder_lock:
+            if _recorder is None:
+                _recorder = MatchRecorder(
+                    max_queue=getattr(settings, 'MATCH_RECORDER_MAX_QUEUE', 10000),
+                    batch_size=getattr(settings, 'MATCH_RECORDER_BATCH_SIZE', 500),
+                    flush_interval=getattr(settings, 'MATCH_RECORDER_FLUSH_SECONDS', 2.0),
+                    block_seconds=getattr(settings, 'MATCH_RECORDER_BLOCK_SECONDS', 0.0),
+                    store_text=getattr(settings, 'MATCH_RECORDER_STORE_TEXT', True),
+                    write_retries=getattr(settings, 'MATCH_RECORDER_WRITE_RETRIES', 3),
+                )
+    return _recorder
+
+
+def record_match(cv_text: str, jd_text: str, result: dict, scoring_version: str = '') -> None:
+    """Queue a served score for the audit trail (no-op when recording is off)"""
+    recorder = get_match_recorder()
+    if recorder is not None:
+        recorder.record(cv_text, jd_text, result, scoring_version)
+
+
+def close_match_recorder(timeout: float = 10.0) -> None:
+    if _recorder is not None:
+        _recorder.close(timeout)
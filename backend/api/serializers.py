@@ -68,3 +68,99 @@ class PredictWithFilesSerializer(serializers.Serializer):
             raise serializers.ValidationError("Job description must be at least 10 characters long")
 
         return data
+
+
+class RankRequestSerializer(serializers.Serializer):
+    """Serializer for ranking many CVs against one job description"""
+    MAX_CVS = 500
+
+    jd_file = serializers.FileField(required=False, allow_null=True)
+    jd_text = serializers.CharField(max_length=50000, required=False, allow_blank=True)
+
+    cv_texts = serializers.ListField(
+        child=serializers.CharField(max_length=50000, allow_blank=False),
+        required=False,
+        allow_empty=True
+    )
+    cv_files = serializers.ListField(
+        child=serializers.FileField(),
+        required=False,
+        allow_empty=True
+    )
+
+    top_k = serializers.IntegerField(required=False, min_value=1, allow_null=True)
+
+    def validate(self, data):
+        """Validate that a JD and at least one CV are provided"""
+        jd_file = data.get('jd_file')
+        jd_text = data.get('jd_text', '').strip()
+
+        if not jd_file and not jd_text:
+            raise serializers.ValidationError(
+                "Job Description: Please provide either a file or text"
+            )
+
+        if jd_text and len(jd_text) < 10:
+            raise serializers.ValidationError("Job description must be at least 10 characters long")
+
+        cv_texts = [t.strip() for t in data.get('cv_texts', [])]
+        cv_files = data.get('cv_files', [])
+
+        if not cv_texts and not cv_files:
+            raise serializers.ValidationError(
+                "CVs: Please provide at least one file or text"
+            )
+
+        if len(cv_texts) + len(cv_files) > self.MAX_CVS:
+            raise serializers.ValidationError(
+                f"Too many CVs. Maximum {self.MAX_CVS} per request"
+            )
+
+        for cv_text in cv_texts:
+            if len(cv_text) < 10:
+                raise serializers.ValidationError("CV text must be at least 10 characters long")
+
+        data['cv_texts'] = cv_texts
+        return data
+
+
+class SearchRequestSerializer(serializers.Serializer):
+    """Serializer for searching the CV index with a job description"""
+    jd_file = serializers.FileField(required=False, allow_null=True)
+    jd_text = serializers.CharField(max_length=50000, required=False, allow_blank=True)
+    top_k = serializers.IntegerField(required=False, min_value=1, max_value=1000, default=10)
+
+    def validate(self, data):
+        jd_file = data.get('jd_file')
+        jd_text = data.get('jd_text', '').strip()
+
+        if not jd_file and not jd_text:
+            raise serializers.ValidationError(
+                "Job Description: Please provide either a file or text"
+            )
+
+        if jd_text and len(jd_text) < 10:
+            raise serializers.ValidationError("Job description must be at least 10 characters long")
+
+        return data
+
+
+class IndexCVSerializer(serializers.Serializer):
+    """Serializer for adding a CV to the CV index"""
+    cv_id = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    cv_file = serializers.FileField(required=False, allow_null=True)
+    cv_text = serializers.CharField(max_length=50000, required=False, allow_blank=True)
+
+    def validate(self, data):
+        cv_file = data.get('cv_file')
+        cv_text = data.get('cv_text', '').strip()
+
+        if not cv_file and not cv_text:
+            raise serializers.ValidationError(
+                "CV: Please provide either a file or text"
+            )
+
+        if cv_text and len(cv_text) < 10:
+            raise serializers.ValidationError("CV text must be at least 10 characters long")
+
+        return data
@@ -1,8 +1,23 @@
 from django.urls import path
-from .views import PredictionView, FileUploadPredictionView, supported_formats
+from .views import (
+    PredictionView, FileUploadPredictionView, RankView, SearchView, CVIndexView,
+    supported_formats, cache_stats, encoder_stats, metrics, health, ready
+)
+from .async_views import predict_async, predict_with_files_async
 
 urlpatterns = [
     path('predict/', PredictionView.as_view(), name='predict'),
     path('predict-with-files/', FileUploadPredictionView.as_view(), name='predict-with-files'),
+    path('async/predict/', predict_async, name='predict-async'),
+    path('async/predict-with-files/', predict_with_files_async, name='predict-with-files-async'),
+    path('rank/', RankView.as_view(), name='rank'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('index/', CVIndexView.as_view(), name='cv-index'),
+    path('index/<str:cv_id>/', CVIndexView.as_view(), name='cv-index-detail'),
     path('supported-formats/', supported_formats, name='supported-formats'),
+    path('cache-stats/', cache_stats, name='cache-stats'),
+    path('encoder-stats/', encoder_stats, name='encoder-stats'),
+    path('metrics/', metrics, name='metrics'),
+    path('health/', health, name='health'),
+    path('ready/', ready, name='ready'),
 ]
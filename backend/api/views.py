@@ -3,42 +3,119 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.views import APIView
-from .serializers import PredictRequestSerializer, PredictWithFilesSerializer
-from matcher.ml.predictor import predict_match
-from matcher.ml.file_extractor import FileExtractor, FileExtractionError
+from .recorder import record_match
+from .serializers import (
+    PredictRequestSerializer, PredictWithFilesSerializer, RankRequestSerializer,
+    SearchRequestSerializer, IndexCVSerializer
+)
+from matcher.ml.predictor import (
+    predict_match, rank_matches, scoring_version, embedding_cache, encoder_batcher
+)
+from matcher.ml.result_cache import get_result_cache, make_result_key
+from matcher.ml.cv_index import get_cv_index
+from matcher.ml.model_loader import models
+from matcher.ml.file_extractor import FileExtractor, FileExtractionError, text_cache
+from matcher.ml.normalizer import normalize_document
 from matcher.ml.preprocessor import TextPreprocessor
-import traceback
+from matcher.ml.metrics import registry, stage
+from django.conf import settings
+from django.http import HttpResponse
+import hashlib
+import json
+import logging
+import random
+from typing import Optional
 
+logger = logging.getLogger(__name__)
 
-def _process_prediction(cv_text: str, jd_text: str) -> Response:
+
+def _log_request_sample(view_name: str, data) -> None:
     """
-    Helper function to process prediction after text extraction
+    Log a sampled, size-bounded summary of a request body as one JSON line
+    Text fields are truncated and uploads are reduced to their size.
+    """
+    rate = getattr(settings, 'REQUEST_LOG_SAMPLE_RATE', 0.01)
+    if rate <= 0 or not logger.isEnabledFor(logging.INFO) or random.random() >= rate:
+        return
+
+    max_chars = getattr(settings, 'REQUEST_LOG_MAX_CHARS', 200)
+    fields = {}
+    for name, value in data.items():
+        if isinstance(value, str):
+            fields[name] = {'length': len(value), 'preview': value[:max_chars]}
+        else:
+            fields[name] = {'type': type(value).__name__, 'size': getattr(value, 'size', None)}
+
+    logger.info(json.dumps({'event': 'request_sample', 'view': view_name, 'fields': fields}))
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    # Weak comparison, as for GET conditional requests. "*" is ignored: for a
+    # POST it would mean "fail if a resource exists" (412 under RFC 9110),
+    # which has no meaning for a computed score, and it must never turn an
+    # unseen result into a 304
+    return any(tag.removeprefix('W/') == etag for tag in candidates if tag != '*')
+
+
+def _compute_prediction(cv_text: str, jd_text: str, if_none_match: Optional[str] = None) -> tuple:
+    """
+    Run preprocessing, validation and prediction
+    Returns: (response_data, status_code, headers); shared by the sync and
+    async views. response_data is None for a 304 Not Modified.
     """
     try:
-        # Preprocess texts
-        cv_preprocessed = TextPreprocessor.preprocess_cv(cv_text)
-        jd_preprocessed = TextPreprocessor.preprocess_jd(jd_text)
-        
-        # Validate preprocessed texts
-        cv_valid, cv_error = TextPreprocessor.validate_preprocessed_text(cv_preprocessed)
-        jd_valid, jd_error = TextPreprocessor.validate_preprocessed_text(jd_preprocessed)
+        with stage('preprocess'):
+            # Normalize each text once; preprocessing, stats and the predictor
+            # all reuse the same document
+            cv_document = normalize_document(cv_text)
+            jd_document = normalize_document(jd_text)
+
+            # Preprocess texts
+            cv_preprocessed = TextPreprocessor.preprocess_cv(cv_text, cv_document)
+            jd_preprocessed = TextPreprocessor.preprocess_jd(jd_text, jd_document)
+
+            # Validate preprocessed texts
+            cv_valid, cv_error = TextPreprocessor.validate_preprocessed_text(cv_preprocessed)
+            jd_valid, jd_error = TextPreprocessor.validate_preprocessed_text(jd_preprocessed)
         
         if not cv_valid:
-            return Response(
+            return (
                 {'error': 'CV validation failed', 'details': cv_error},
-                status=status.HTTP_400_BAD_REQUEST
+                status.HTTP_400_BAD_REQUEST,
+                {}
             )
         
         if not jd_valid:
-            return Response(
+            return (
                 {'error': 'JD validation failed', 'details': jd_error},
-                status=status.HTTP_400_BAD_REQUEST
+                status.HTTP_400_BAD_REQUEST,
+                {}
             )
         
+        # Results are keyed on the cleaned texts and the scoring version; the
+        # ETag also covers the raw texts the preprocessing stats come from
+        version = scoring_version()
+        result_key = make_result_key(cv_preprocessed.cleaned, jd_preprocessed.cleaned, version)
+        etag_source = '\0'.join((result_key, cv_text, jd_text)).encode('utf-8')
+        etag = '"%s"' % hashlib.sha256(etag_source).hexdigest()[:32]
+        headers = {'ETag': etag}
+
+        if _etag_matches(if_none_match, etag):
+            return None, status.HTTP_304_NOT_MODIFIED, headers
+        
         # Get prediction from ML model (use cleaned text)
-        result = predict_match(cv_preprocessed['cleaned'], jd_preprocessed['cleaned'])
+        result_cache = get_result_cache()
+        result = result_cache.get(result_key)
+        if result is None:
+            result = predict_match(cv_document, jd_document)
+            result_cache.set(result_key, result)
+        # Queued for the audit trail; written to the database off the request path
+        record_match(cv_text, jd_text, result, version)
         
-        # Return result with preprocessing statistics (no database save)
+        # Return result with preprocessing statistics
         response_data = {
             'skill_match': result['skill_match'],
             'experience_match': result['experience_match'],
@@ -46,23 +123,33 @@ def _process_prediction(cv_text: str, jd_text: str) -> Response:
             'semantic_similarity': result['semantic_similarity'],
             'overall_match': result['overall_match'],
             'preprocessing': {
-                'cv_stats': TextPreprocessor.get_preprocessing_stats(cv_text),
-                'jd_stats': TextPreprocessor.get_preprocessing_stats(jd_text)
+                'cv_stats': TextPreprocessor.get_preprocessing_stats(cv_text, cv_document),
+                'jd_stats': TextPreprocessor.get_preprocessing_stats(jd_text, jd_document)
             }
         }
         
-        return Response(response_data, status=status.HTTP_200_OK)
+        return response_data, status.HTTP_200_OK, headers
     
     except Exception as e:
-        return Response(
+        return (
             {
                 'error': 'Error processing prediction',
                 'details': str(e)
             },
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            status.HTTP_500_INTERNAL_SERVER_ERROR,
+            {}
         )
 
 
+def _process_prediction(cv_text: str, jd_text: str, request=None) -> Response:
+    """
+    Helper function to process prediction after text extraction
+    """
+    if_none_match = request.headers.get('If-None-Match') if request is not None else None
+    response_data, status_code, headers = _compute_prediction(cv_text, jd_text, if_none_match)
+    return Response(response_data, status=status_code, headers=headers)
+
+
 class PredictionView(APIView):
     """
     API endpoint for CV-JD matching predictions (stateless)
@@ -82,7 +169,7 @@ class PredictionView(APIView):
         }
         """
         try:
-            print(f"Received request data: {request.data}")
+            _log_request_sample('predict', request.data)
             serializer = PredictRequestSerializer(data=request.data)
             
             if serializer.is_valid():
@@ -95,12 +182,11 @@ class PredictionView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                return _process_prediction(cv_text, jd_text)
+                return _process_prediction(cv_text, jd_text, request)
             
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
-            print(f"ERROR in PredictionView.post: {str(e)}")
-            print(traceback.format_exc())
+            logger.exception("Error in PredictionView.post")
             return Response(
                 {'error': 'Internal server error', 'details': str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -151,7 +237,7 @@ class FileUploadPredictionView(APIView):
                         status=status.HTTP_400_BAD_REQUEST
                     )
                 
-                return _process_prediction(cv_text, jd_text)
+                return _process_prediction(cv_text, jd_text, request)
                 
             except FileExtractionError as e:
                 return Response(
@@ -173,6 +259,223 @@ class FileUploadPredictionView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class RankView(APIView):
+    """
+    API endpoint for ranking many CVs against one job description (stateless)
+    """
+    parser_classes = (MultiPartParser, FormParser, JSONParser)
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        """
+        Rank CVs by overall match against a single JD
+
+        Expected POST data (JSON or multipart/form-data):
+        - jd_text or jd_file: the job description
+        - cv_texts: (optional) list of plain-text CVs
+        - cv_files: (optional) list of PDF, DOCX, TXT, PPTX files
+        - top_k: (optional) only return the best k CVs
+        """
+        serializer = RankRequestSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            jd_text = serializer.validated_data.get('jd_text', '').strip()
+            jd_file = serializer.validated_data.get('jd_file')
+
+            if jd_file:
+                jd_text = FileExtractor.extract_text(jd_file)
+
+            # Texts first, then files, so "index" refers to this combined order
+            sources = []
+            cv_texts = []
+            for i, cv_text in enumerate(serializer.validated_data.get('cv_texts', [])):
+                sources.append({'type': 'text', 'position': i})
+                cv_texts.append(cv_text)
+
+            for cv_file in serializer.validated_data.get('cv_files', []):
+                sources.append({'type': 'file', 'name': cv_file.name})
+                cv_texts.append(FileExtractor.extract_text(cv_file))
+
+            # Normalized and validated like a single prediction; the
+            # documents are passed on so each text is cleaned only once
+            with stage('preprocess'):
+                jd_document = normalize_document(jd_text)
+                jd_valid, jd_error = TextPreprocessor.validate_preprocessed_text(
+                    TextPreprocessor.preprocess_jd(jd_text, jd_document)
+                )
+                if not jd_valid:
+                    return Response(
+                        {'error': 'JD validation failed', 'details': jd_error},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+
+                cv_documents = []
+                for source, cv_text in zip(sources, cv_texts):
+                    cv_document = normalize_document(cv_text)
+                    cv_valid, cv_error = TextPreprocessor.validate_preprocessed_text(
+                        TextPreprocessor.preprocess_cv(cv_text, cv_document)
+                    )
+                    if not cv_valid:
+                        return Response(
+                            {'error': 'CV validation failed', 'details': cv_error, 'source': source},
+                            status=status.HTTP_400_BAD_REQUEST
+                        )
+                    cv_documents.append(cv_document)
+
+            results = rank_matches(
+                cv_documents,
+                jd_document,
+                top_k=serializer.validated_data.get('top_k')
+            )
+            version = scoring_version()
+            for result in results:
+                result['source'] = sources[result['index']]
+                record_match(cv_texts[result['index']], jd_text, result, version)
+
+            return Response({
+                'count': len(cv_texts),
+                'results': results
+            }, status=status.HTTP_200_OK)
+
+        except FileExtractionError as e:
+            return Response(
+                {
+                    'error': 'File extraction error',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {
+                    'error': 'Error ranking CVs',
+                    'details': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class SearchView(APIView):
+    """
+    API endpoint for finding the best-matching CVs in the CV index for a JD
+    """
+    parser_classes = (MultiPartParser, FormParser, JSONParser)
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        """
+        Search the CV index
+
+        Expected POST data (JSON or multipart/form-data):
+        - jd_text or jd_file: the job description
+        - top_k: (optional) number of CVs to return, default 10
+        """
+        serializer = SearchRequestSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            jd_text = serializer.validated_data.get('jd_text', '').strip()
+            jd_file = serializer.validated_data.get('jd_file')
+
+            if jd_file:
+                jd_text = FileExtractor.extract_text(jd_file)
+
+            index = get_cv_index()
+            results = index.search(jd_text, top_k=serializer.validated_data['top_k'])
+
+            return Response({
+                'indexed': len(index),
+                'results': results
+            }, status=status.HTTP_200_OK)
+
+        except FileExtractionError as e:
+            return Response(
+                {
+                    'error': 'File extraction error',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {
+                    'error': 'Error searching CV index',
+                    'details': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class CVIndexView(APIView):
+    """
+    API endpoint for adding CVs to and removing CVs from the CV index
+    """
+    parser_classes = (MultiPartParser, FormParser, JSONParser)
+    authentication_classes = []
+    permission_classes = []
+
+    def post(self, request):
+        """
+        Add a CV to the index
+
+        Expected POST data (JSON or multipart/form-data):
+        - cv_text or cv_file: the CV
+        - cv_id: (optional) id to store it under, defaults to the text hash
+        """
+        serializer = IndexCVSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            cv_text = serializer.validated_data.get('cv_text', '').strip()
+            cv_file = serializer.validated_data.get('cv_file')
+
+            if cv_file:
+                cv_text = FileExtractor.extract_text(cv_file)
+
+            index = get_cv_index()
+            cv_id = index.add(cv_text, cv_id=serializer.validated_data.get('cv_id') or None)
+
+            return Response({
+                'cv_id': cv_id,
+                'indexed': len(index)
+            }, status=status.HTTP_201_CREATED)
+
+        except FileExtractionError as e:
+            return Response(
+                {
+                    'error': 'File extraction error',
+                    'details': str(e)
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {
+                    'error': 'Error indexing CV',
+                    'details': str(e)
+                },
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+    def delete(self, request, cv_id):
+        """Remove a CV from the index"""
+        if not get_cv_index().remove(cv_id):
+            return Response(
+                {'error': f'CV not found in index: {cv_id}'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 @api_view(['GET'])
 def supported_formats(request):
     """Get list of supported file formats"""
@@ -187,3 +490,53 @@ def supported_formats(request):
         'max_file_size_mb': 10,
         'text_modes': ['text_input', 'file_upload', 'both']
     })
+
+
+@api_view(['GET'])
+def cache_stats(request):
+    """Get hit/miss/eviction counters for the embedding, text and result caches"""
+    return Response({
+        'embedding_cache': embedding_cache.stats(),
+        'extracted_text_cache': text_cache.stats(),
+        'result_cache': get_result_cache().stats()
+    })
+
+
+@api_view(['GET'])
+def encoder_stats(request):
+    """Get queue depth and batch-size histogram for the encoder micro-batcher"""
+    return Response({
+        'micro_batching': encoder_batcher.stats()
+    })
+
+
+@api_view(['GET'])
+def metrics(request):
+    """Request and pipeline stage metrics in the Prometheus text format"""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET'])
+def health(request):
+    """Liveness check with model load state and timings"""
+    return Response({
+        'status': 'ok',
+        'models': models.status()
+    })
+
+
+@api_view(['GET'])
+def ready(request):
+    """
+    Readiness check: 200 only once the models are loaded and warm
+    A probe that finds them cold starts warmup in the background (once), so
+    a process that skipped post_worker_init and MODEL_WARMUP_ON_READY still
+    becomes ready without waiting for a first real request.
+    """
+    if not models.is_ready:
+        models.warmup_in_background()
+    model_status = models.status()
+    return Response(
+        {'ready': model_status['ready'], 'models': model_status},
+        status=status.HTTP_200_OK if model_status['ready'] else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
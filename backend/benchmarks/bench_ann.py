@@ -0,0 +1,196 @@
+#!/usr/bin/env python
+"""
+Benchmark for the IVF approximate nearest-neighbour index (matcher/ml/ann_index.py)
+
+For each pool size, builds an IVFIndex over synthetic 384-dim unit vectors.
+Reports build time and index size, then recall@k against exact search and
+single-query queries/sec for every nprobe. Exact search is timed the way
+CVIndex does it (one matrix-vector product over the pool per query), so the
+rows give the recall/latency operating points directly.
+
+The vectors are clustered and have a low intrinsic dimension, like sentence
+embeddings of CVs, and are generated chunk by chunk. The exact ground truth
+is computed while streaming, so the raw pool never has to fit in memory
+(only the index does: 5M vectors take ~7.7 GB as float32 IVF-Flat, half
+that with --dtype float16 at a slower scan, or ~280 MB with --pq-m 48).
+With PQ the scores are approximate, but CVIndex re-scores its shortlist
+exactly: --refine R searches R * k neighbours and counts how many of the
+true top k are among them, which is the recall after that re-scoring.
+Run from the backend directory:
+
+    python -m benchmarks.bench_ann
+    python -m benchmarks.bench_ann --sizes 100000 1000000 --nprobe 4 16 64
+    python -m benchmarks.bench_ann --sizes 5000000 --pq-m 48 --refine 5 --output ann.json
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from matcher.ml.ann_index import IVFIndex
+
+CHUNK = 100000
+
+
+class EmbeddingStream:
+    """
+    Deterministic unit vectors, produced in chunks
+    Points are drawn around random topic centres in a low-dimensional latent
+    space and projected to dim dimensions with a little isotropic noise.
+    Like real sentence embeddings, they have a low intrinsic dimension, so
+    neighbours are meaningful (uniform random vectors are all equidistant).
+    """
+
+    def __init__(self, dim: int, latent_dim: int, topics: int, spread: float, seed: int):
+        self.dim = dim
+        self.spread = spread
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.topics = rng.standard_normal((topics, latent_dim)).astype(np.float32)
+        self.projection = (rng.standard_normal((latent_dim, dim)) / np.sqrt(latent_dim)).astype(np.float32)
+        self.noise = 0.1 * np.sqrt(latent_dim / dim)
+
+    def _sample(self, count: int, rng) -> np.ndarray:
+        latent = self.topics[rng.integers(0, len(self.topics), count)]
+        latent += self.spread * rng.standard_normal(latent.shape, dtype=np.float32)
+        vectors = latent @ self.projection
+        vectors += self.noise * rng.standard_normal(vectors.shape, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    def chunks(self, total: int):
+        for number, start in enumerate(range(0, total, CHUNK)):
+            rng = np.random.default_rng((self.seed, number))
+            yield start, self._sample(min(CHUNK, total - start), rng)
+
+    def queries(self, count: int) -> np.ndarray:
+        return self._sample(count, np.random.default_rng((self.seed, 2 ** 32 - 1)))
+
+
+def default_nlist(size: int) -> int:
+    # ~4 * sqrt(N), rounded to a power of two
+    return int(2 ** round(np.log2(4 * np.sqrt(size))))
+
+
+def merge_top_k(best_scores, best_ids, scores, ids, k: int):
+    scores = np.concatenate([best_scores, scores], axis=1)
+    ids = np.concatenate([best_ids, ids], axis=1)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return np.take_along_axis(scores, top, 1), np.take_along_axis(ids, top, 1)
+
+
+def bench_size(size: int, args, stream: EmbeddingStream) -> dict:
+    queries = stream.queries(args.queries)
+    nlist = args.nlist or default_nlist(size)
+    index = IVFIndex(args.dim, nlist, pq_m=args.pq_m, dtype=args.dtype)
+
+    # The chunks are i.i.d., so the leading ones are a fair training sample
+    sample_size = min(size, args.train_sample or max(64 * nlist, 65536 if args.pq_m else 0))
+    sample = np.concatenate([chunk for _, chunk in stream.chunks(sample_size)])
+    start = time.perf_counter()
+    index.train(sample, iterations=args.iterations, seed=args.seed)
+    train_seconds = time.perf_counter() - start
+    del sample
+
+    k = args.k
+    true_scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+    true_ids = np.full((len(queries), k), -1, dtype=np.int64)
+    add_seconds = exact_seconds = 0.0
+    timed = queries[:args.exact_queries]
+    for offset, chunk in stream.chunks(size):
+        start = time.perf_counter()
+        index.add(chunk, np.arange(offset, offset + len(chunk)))
+        add_seconds += time.perf_counter() - start
+
+        # Exact search as served: one matrix-vector product per query
+        start = time.perf_counter()
+        for query in timed:
+            scores = chunk @ query
+            np.argpartition(-scores, k - 1)[:k]
+        exact_seconds += time.perf_counter() - start
+
+        scores = queries @ chunk.T
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        true_scores, true_ids = merge_top_k(
+            true_scores, true_ids, np.take_along_axis(scores, top, 1), top + offset, k
+        )
+
+    result = {
+        'size': size,
+        'nlist': nlist,
+        'pq_m': args.pq_m,
+        'dtype': args.dtype,
+        'train_seconds': round(train_seconds, 2),
+        'add_seconds': round(add_seconds, 2),
+        'index_mb': round(index.nbytes / 1e6, 1),
+        'exact_qps': round(len(timed) / exact_seconds, 1),
+        'operating_points': [],
+    }
+
+    for nprobe in args.nprobe:
+        if nprobe > nlist:
+            continue
+        found = np.empty((len(queries), k * args.refine), dtype=np.int64)
+        start = time.perf_counter()
+        for qi, query in enumerate(queries):
+            found[qi] = index.search(query, k * args.refine, nprobe=nprobe)[1][0]
+        elapsed = time.perf_counter() - start
+        recall = np.mean([
+            len(np.intersect1d(found[qi], true_ids[qi])) / k for qi in range(len(queries))
+        ])
+        result['operating_points'].append({
+            'nprobe': nprobe,
+            'recall': round(float(recall), 4),
+            'qps': round(len(queries) / elapsed, 1),
+            'speedup': round(len(queries) / elapsed / result['exact_qps'], 1),
+        })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000, 5000000])
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64, 128])
+    parser.add_argument('--k', type=int, default=10, help='neighbours per query (recall@k)')
+    parser.add_argument('--refine', type=int, default=1,
+                        help='neighbours searched per true neighbour, as re-scored by CVIndex')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--exact-queries', type=int, default=5, help='queries timed against exact search')
+    parser.add_argument('--nlist', type=int, help='inverted lists (default: ~4 * sqrt(size))')
+    parser.add_argument('--pq-m', type=int, default=0, help='PQ bytes per vector (default: 0, IVF-Flat)')
+    parser.add_argument('--dtype', choices=('float32', 'float16'), default='float32',
+                        help='IVF-Flat storage dtype')
+    parser.add_argument('--train-sample', type=int, help='training vectors (default: 64 per list)')
+    parser.add_argument('--iterations', type=int, default=10, help='k-means iterations')
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--latent-dim', type=int, default=32, help='intrinsic dimension of the synthetic data')
+    parser.add_argument('--topics', type=int, default=2000, help='clusters in the synthetic data')
+    parser.add_argument('--spread', type=float, default=1.0,
+                        help='spread of vectors around their topic (higher is harder)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='also write the results as JSON')
+    args = parser.parse_args()
+
+    stream = EmbeddingStream(args.dim, args.latent_dim, args.topics, args.spread, args.seed)
+    results = []
+    for size in args.sizes:
+        result = bench_size(size, args, stream)
+        results.append(result)
+        print(
+            f"\n{size:,} vectors  nlist={result['nlist']} pq_m={result['pq_m']} "
+            f"train {result['train_seconds']}s  add {result['add_seconds']}s  "
+            f"index {result['index_mb']} MB  exact {result['exact_qps']} q/s"
+        )
+        print(f"{'nprobe':>8} {f'recall@{args.k}':>10} {'q/s':>9} {'speedup':>8}")
+        for point in result['operating_points']:
+            print(f"{point['nprobe']:>8} {point['recall']:>10} {point['qps']:>9} {point['speedup']:>7}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+"""
+Benchmark and parity check for the encoder backends (torch, onnx, onnx-int8)
+
+Each backend runs in its own subprocess so peak RSS is measured per backend.
+Reports load time, single-text latency, batch throughput and peak RSS, then
+checks that every ONNX embedding agrees with the torch embedding of the same
+text to at least --min-cosine. Exits non-zero if parity fails.
+Run from the backend directory:
+
+    python -m benchmarks.bench_encoders
+    python -m benchmarks.bench_encoders --backends torch onnx-int8 --min-cosine 0.98
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+WORDS = (
+    "python developer machine learning engineer experience years team sql docker "
+    "kubernetes cloud aws data analysis project management communication bachelor "
+    "master degree university built deployed production systems internship role "
+    "responsible leadership agile scrum react django rest api design testing"
+).split()
+
+
+def synthetic_texts(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 400)))
+        for _ in range(count)
+    ]
+
+
+def load_encoder(backend: str):
+    from matcher.ml.model_loader import BASE_DIR, BERT_MODEL_NAME
+
+    if backend == 'torch':
+        from sentence_transformers import SentenceTransformer
+        return SentenceTransformer(BERT_MODEL_NAME)
+
+    from matcher.ml.onnx_encoder import OnnxEncoder
+    return OnnxEncoder(os.path.join(BASE_DIR, 'onnx_model'), quantized=(backend == 'onnx-int8'))
+
+
+def run_worker(backend: str, count: int, output: str) -> None:
+    """Measure one backend and save its embeddings for the parity check"""
+    texts = synthetic_texts(count)
+
+    start = time.perf_counter()
+    encoder = load_encoder(backend)
+    load_seconds = time.perf_counter() - start
+
+    encoder.encode(texts[:4])  # warm up
+
+    latencies = []
+    for text in texts[:50]:
+        start = time.perf_counter()
+        encoder.encode([text])
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    embeddings = np.asarray(encoder.encode(texts, batch_size=32), dtype=np.float32)
+    batch_seconds = time.perf_counter() - start
+
+    np.save(output, embeddings)
+    print(json.dumps({
+        'backend': backend,
+        'load_seconds': round(load_seconds, 3),
+        'latency_p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 2),
+        'latency_p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 2),
+        'throughput_texts_per_sec': round(count / batch_seconds, 1),
+        # ru_maxrss is KiB on Linux
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument('--texts', type=int, default=256)
+    parser.add_argument('--min-cosine', type=float, default=0.98,
+                        help='minimum per-text cosine agreement with the torch backend')
+    parser.add_argument('--worker', choices=BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.texts, args.output)
+        return 0
+
+    backends = list(args.backends)
+    if 'torch' not in backends:
+        backends.insert(0, 'torch')  # reference for parity
+
+    results = {}
+    embeddings = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for backend in backends:
+            output = os.path.join(temp_dir, f"{backend}.npy")
+            completed = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_encoders', '--worker', backend,
+                 '--texts', str(args.texts), '--output', output],
+                capture_output=True, text=True, check=True,
+            )
+            results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+            embeddings[backend] = np.load(output)
+
+    print(f"{'backend':>10} {'load s':>8} {'p50 ms':>8} {'p95 ms':>8} {'texts/s':>9} {'RSS MB':>8}")
+    for backend, r in results.items():
+        print(
+            f"{backend:>10} {r['load_seconds']:>8} {r['latency_p50_ms']:>8} "
+            f"{r['latency_p95_ms']:>8} {r['throughput_texts_per_sec']:>9} {r['peak_rss_mb']:>8}"
+        )
+
+    reference = embeddings['torch']
+    reference = reference / np.linalg.norm(reference, axis=1, keepdims=True)
+    failed = False
+    for backend in backends:
+        if backend == 'torch':
+            continue
+        other = embeddings[backend] / np.linalg.norm(embeddings[backend], axis=1, keepdims=True)
+        cosines = (reference * other).sum(axis=1)
+        ok = cosines.min() >= args.min_cosine
+        failed |= not ok
+        print(
+            f"parity {backend}: min cosine {cosines.min():.4f}, mean {cosines.mean():.4f} "
+            f"-> {'PASS' if ok else 'FAIL'} (threshold {args.min_cosine})"
+        )
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark suite for the matcher hot paths, with regression thresholds
+
+Covers predict_match, skill extraction (exact, and with the semantic stage
+on whatever SKILL_SEMANTIC_MATCHING is set to), extract_experience_years,
+TextPreprocessor.preprocess_cv/preprocess_jd, get_preprocessing_stats and
+every FileExtractor format over synthetic inputs (1 KB to 50 KB of text,
+1 to 300 pages). Needs no network: the sentence encoder and the regression
+model are replaced by deterministic stubs, so predict_match measures the
+matcher's own work. Run from the backend directory:
+
+    python -m benchmarks.bench_hot_paths --save-baseline
+    python -m benchmarks.bench_hot_paths --threshold 10 --output results.json
+
+Results are written as JSON. Runs compare against benchmarks/baseline.json
+by default (committed, with the host it was measured on). The run fails
+(exit status 1) when a case's median is more than --threshold percent
+slower than its baseline median, or when a case was skipped in one of the
+two runs but not the other (e.g. a parser library missing on one side), or
+is not in the baseline at all. Generate the baseline with every library in
+requirements.txt installed.
+
+Timings depend on the host: when it differs from the baseline's (CPU
+model, core count, architecture, OS or Python version), slowdowns are only
+reported as warnings. Regenerate the baseline with --save-baseline on the
+machine that runs the check (the CI runner), and commit it with the change
+that moves it.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import DOCUMENT_GENERATORS, synthetic_cv, synthetic_jd
+from matcher.ml.testing import install_stub_models
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+TEXT_SIZES = (1024, 10 * 1024, 50 * 1024)
+PAGE_COUNTS = (1, 30, 300)
+
+
+def size_label(size: int) -> str:
+    return f"{size // 1024}kb"
+
+
+def text_cases() -> list:
+    from matcher.ml.normalizer import normalize_document
+    from matcher.ml.predictor import (
+        embedding_cache, extract_experience_years, extract_skills, phrase_cache,
+        predict_match, skill_normalizer
+    )
+    from matcher.ml.preprocessor import TextPreprocessor
+
+    def predict_uncached(cv, jd):
+        # Every call reaches the (stub) encoder, as for a new pair
+        embedding_cache.clear()
+        phrase_cache.clear()
+        return predict_match(cv, jd)
+
+    def skills_semantic(text):
+        # The semantic stage is off by default; time it regardless, with
+        # every candidate phrase reaching the (stub) encoder
+        phrase_cache.clear()
+        return skill_normalizer.find_many([text], semantic=True)
+
+    cases = []
+    for size in TEXT_SIZES:
+        label = size_label(size)
+        cv, jd = synthetic_cv(size, seed=size), synthetic_jd(size, seed=size + 1)
+        cv_match = normalize_document(cv).match_text
+        cases += [
+            (f"preprocess_cv.{label}", lambda cv=cv: TextPreprocessor.preprocess_cv(cv)),
+            (f"preprocess_jd.{label}", lambda jd=jd: TextPreprocessor.preprocess_jd(jd)),
+            (f"preprocessing_stats.{label}", lambda cv=cv: TextPreprocessor.get_preprocessing_stats(cv)),
+            (f"extract_skills.{label}", lambda text=cv_match: extract_skills(text)),
+            (f"extract_skills_semantic.{label}", lambda text=cv_match: skills_semantic(text)),
+            (f"extract_experience_years.{label}", lambda text=cv_match: extract_experience_years(text)),
+            (f"predict_match.{label}", lambda cv=cv, jd=jd: predict_uncached(cv, jd)),
+        ]
+    return cases
+
+
+def selected(name: str, only: list) -> bool:
+    return not only or any(pattern in name for pattern in only)
+
+
+def extraction_cases(only: list) -> list:
+    from matcher.ml.file_extractor import FileExtractor
+
+    cases = []
+    for ext, method_name in FileExtractor.EXTRACTORS.items():
+        extractor = getattr(FileExtractor, method_name)
+        for pages in PAGE_COUNTS:
+            name = f"extract{ext}.{pages}p"
+            # Large documents are slow to generate, so skip unselected ones early
+            if not selected(name, only):
+                continue
+            try:
+                data = DOCUMENT_GENERATORS[ext](pages)
+            except ImportError as e:
+                cases.append((name, None, f"generator unavailable: {e}"))
+                continue
+            # No char/page budget, so the parser's own cost is measured
+            cases.append((name, lambda data=data, extractor=extractor: extractor(data, None, None)))
+    return cases
+
+
+def measure(func, rounds: int, min_round_seconds: float) -> dict:
+    """Median and best seconds per call over several calibrated rounds"""
+    func()  # warm up
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_round_seconds or number >= 1000:
+            break
+        number *= 2
+
+    per_call = [elapsed / number]
+    for _ in range(rounds - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        per_call.append((time.perf_counter() - start) / number)
+
+    return {
+        'median_ms': round(statistics.median(per_call) * 1000, 4),
+        'min_ms': round(min(per_call) * 1000, 4),
+        'calls_per_round': number,
+        'rounds': rounds,
+    }
+
+
+def run_suite(only: list, rounds: int, min_round_seconds: float) -> dict:
+    results = {}
+    for case in text_cases() + extraction_cases(only):
+        name, func = case[0], case[1]
+        if not selected(name, only):
+            continue
+        if func is None:
+            results[name] = {'skipped': case[2]}
+            continue
+        try:
+            results[name] = measure(func, rounds, min_round_seconds)
+        except Exception as e:
+            # A missing parser library only skips that format
+            results[name] = {'skipped': f"{type(e).__name__}: {e}"}
+    return results
+
+
+def host_info() -> dict:
+    """What the timings depend on, recorded with the results"""
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith('model name'):
+                    cpu = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+    return {
+        'cpu': cpu,
+        'cpus': os.cpu_count(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'python': platform.python_version(),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> tuple:
+    """
+    Compare results with the baseline's
+    Returns: (regressions, mismatches): cases whose median regressed by more
+    than threshold percent, and cases that ran in only one of the two runs
+    """
+    regressions, mismatches = [], []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            mismatches.append(name)
+            result['baseline'] = 'missing'
+            continue
+        if ('skipped' in result) != ('skipped' in before):
+            mismatches.append(name)
+            result['baseline'] = 'skipped' if 'skipped' in before else 'ran'
+            continue
+        if 'skipped' in result:
+            continue
+        change = (result['median_ms'] / before['median_ms'] - 1) * 100
+        result['baseline_median_ms'] = before['median_ms']
+        result['change_pct'] = round(change, 2)
+        if change > threshold:
+            regressions.append(name)
+    return regressions, mismatches
+
+
+def print_table(results: dict) -> None:
+    print(f"{'case':<34} {'median ms':>11} {'baseline ms':>12} {'change':>9}")
+    for name, result in results.items():
+        if 'skipped' in result:
+            note = " (ran in the baseline)" if result.get('baseline') == 'ran' else ""
+            print(f"{name:<34} {'skipped':>11}   {result['skipped']}{note}")
+            continue
+        if 'baseline' in result:
+            print(f"{name:<34} {result['median_ms']:>11.3f} {result['baseline']:>12}")
+            continue
+        baseline = result.get('baseline_median_ms')
+        change = result.get('change_pct')
+        print(
+            f"{name:<34} {result['median_ms']:>11.3f} "
+            f"{baseline if baseline is not None else '-':>12} "
+            f"{f'{change:+.1f}%' if change is not None else '-':>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', action='store_true', help='write these results as the baseline')
+    parser.add_argument('--threshold', type=float, default=15.0,
+                        help='allowed slowdown in percent before a case fails')
+    parser.add_argument('--output', help='also write the JSON results to this file')
+    parser.add_argument('--only', nargs='*', default=[], help='run only cases containing these substrings')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--min-round-seconds', type=float, default=0.05)
+    args = parser.parse_args()
+
+    install_stub_models()
+    results = run_suite(args.only, args.rounds, args.min_round_seconds)
+
+    host = host_info()
+    regressions, mismatches, same_host = [], [], True
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions, mismatches = compare(results, baseline['results'], args.threshold)
+        same_host = baseline.get('host') == host
+    elif not args.save_baseline:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+
+    report = {
+        'host': host,
+        'threshold_pct': args.threshold,
+        'results': results,
+        'regressions': regressions,
+        'mismatches': mismatches,
+    }
+
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.save_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        print(f"Baseline written to {args.baseline}")
+
+    failed = bool(mismatches)
+    if mismatches:
+        print(f"\nRan in only one of this run and the baseline: {', '.join(mismatches)}", file=sys.stderr)
+    if regressions:
+        print(f"\nRegressed by more than {args.threshold}%: {', '.join(regressions)}", file=sys.stderr)
+        if same_host:
+            failed = True
+        else:
+            print(
+                "Warning only: the baseline was measured on a different host "
+                f"({baseline.get('host')}); regenerate it on this one to enforce the threshold",
+                file=sys.stderr,
+            )
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+Memory benchmark: per-document footprint of preprocessed CVs and JDs
+
+Builds a batch of documents with the previous dict representation (original,
+cleaned and lowercased copies plus copied section strings) and with
+PreprocessedDocument (one cleaned buffer, sections as spans), and reports
+the bytes each keeps alive per document as measured by tracemalloc.
+Run from the backend directory:
+
+    python -m benchmarks.bench_preprocessed_memory
+"""
+
+import argparse
+import gc
+import random
+import tracemalloc
+
+from matcher.ml.normalizer import normalize_document
+from matcher.ml.preprocessor import TextPreprocessor
+
+
+def synthetic_document(chars: int, seed: int) -> str:
+    rng = random.Random(seed)
+    headers = ['Experience', 'Skills', 'Education', 'Certifications', 'Requirements', 'Responsibilities']
+    filler = [
+        'built', 'python', 'services', 'team', 'delivered', 'django', 'years',
+        'cloud', 'data', 'pipelines', 'with', 'and', 'the', 'university',
+    ]
+    lines = []
+    size = 0
+    while size < chars:
+        if rng.random() < 0.05:
+            line = rng.choice(headers)
+        else:
+            line = ' '.join(rng.choice(filler) for _ in range(rng.randint(5, 15)))
+        lines.append(line)
+        size += len(line) + 1
+    return '\n'.join(lines)[:chars]
+
+
+def legacy_preprocess(text: str, document) -> dict:
+    """The dict built before PreprocessedDocument: every form is its own copy"""
+    cleaned = document.cleaned
+    normalized = cleaned.lower()
+    sections = {
+        'experience': "",
+        'skills': "",
+        'education': "",
+        'certifications': "",
+        'full_text': cleaned,
+    }
+    # The old section builder appended to one section at a time; on cleaned
+    # text the whole document lands in the first matching section
+    current_section = 'full_text'
+    for line in cleaned.split('\n'):
+        line_lower = line.lower()
+        for section_key, keywords in TextPreprocessor.CV_SECTIONS.items():
+            if any(keyword in line_lower for keyword in keywords):
+                if section_key in sections:
+                    current_section = section_key
+                break
+        if current_section != 'full_text':
+            sections[current_section] += line + " "
+    for key in sections:
+        if key != 'full_text':
+            sections[key] = sections[key].strip()
+    return {
+        'original': text,
+        'cleaned': cleaned,
+        'normalized': normalized,
+        'sections': sections,
+        'length': len(cleaned),
+        'word_count': len(cleaned.split()),
+    }
+
+
+def retained_bytes(build, texts: list) -> int:
+    """Bytes still allocated after build() ran over every text"""
+    gc.collect()
+    tracemalloc.start()
+    kept = [build(text) for text in texts]
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--docs', type=int, default=50, help='documents per batch')
+    args = parser.parse_args()
+
+    def legacy(text):
+        document = normalize_document(text)
+        return legacy_preprocess(text, document)
+
+    def compact(text):
+        # Sections are sliced and cleaned on each read and never kept, so
+        # only the spans count towards what a document holds
+        return TextPreprocessor.preprocess_cv(text)
+
+    print(f"{'chars':>8} {'dict KiB/doc':>14} {'slots KiB/doc':>15} {'ratio':>7}")
+    for chars in (2000, 10000, 50000):
+        texts = [synthetic_document(chars, seed) for seed in range(args.docs)]
+        before = retained_bytes(legacy, texts) / args.docs
+        after = retained_bytes(compact, texts) / args.docs
+        print(f"{chars:>8} {before / 1024:>14.1f} {after / 1024:>15.1f} {before / after:>6.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Micro-benchmark: skill extraction cost as the taxonomy grows
+
+Compares the compiled SkillMatcher against the old per-skill substring scan
+on the same document while the skill list grows from 100 to 10,000 entries.
+Run from the backend directory:
+
+    python -m benchmarks.bench_skill_matcher
+"""
+
+import argparse
+import random
+import string
+import timeit
+
+from matcher.ml.skill_matcher import SkillMatcher
+
+
+def synthetic_skills(count: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    skills = set()
+    while len(skills) < count:
+        words = [
+            ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 9)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        skills.add(' '.join(words))
+    return sorted(skills)
+
+
+def synthetic_document(skills: list, words: int, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    filler = [
+        'experience', 'team', 'delivered', 'project', 'with', 'and', 'the',
+        'responsible', 'for', 'building', 'systems', 'using', 'years',
+    ]
+    tokens = []
+    while len(tokens) < words:
+        if rng.random() < 0.05:
+            tokens.extend(rng.choice(skills).split())
+        else:
+            tokens.append(rng.choice(filler))
+    return ' '.join(tokens)
+
+
+def substring_scan(skills: list, text: str) -> set:
+    return set(skill for skill in skills if skill in text)
+
+
+def time_call(func, repeat: int) -> float:
+    """Best-of-5 average seconds per call"""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=5, number=repeat)) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, default=1500, help='document length in words')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    base = synthetic_skills(100)
+    document = synthetic_document(base, args.words)
+
+    print(f"Document: {len(document)} chars, {args.words} words")
+    print(f"{'skills':>8} {'matcher ms':>12} {'substring ms':>14} {'build ms':>10}")
+
+    baseline = None
+    for count in (100, 1000, 10000):
+        skills = base + synthetic_skills(count - len(base), seed=count)[:count - len(base)]
+
+        build = time_call(lambda: SkillMatcher(skills), 1)
+        matcher = SkillMatcher(skills)
+        matched = time_call(lambda: matcher.find(document), args.repeat)
+        scanned = time_call(lambda: substring_scan(skills, document), args.repeat)
+
+        baseline = baseline or matched
+        print(
+            f"{count:>8} {matched * 1000:>12.3f} {scanned * 1000:>14.3f} {build * 1000:>10.1f}"
+            f"   (matcher x{matched / baseline:.2f} vs 100 skills)"
+        )
+
+
+if __name__ == '__main__':
+    main()
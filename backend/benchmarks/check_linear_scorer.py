@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Parity check and timing: LinearScorer against the scikit-learn regression
+
+Loads the regression pickle with joblib, extracts a LinearScorer from it and
+compares both on random feature rows in the scoring range (0-100) plus the
+edge rows the predictor produces (all zeros, all 100). The JSON artifact is
+round-tripped too. Exits 1 if any prediction differs by more than --tolerance.
+Run from the backend directory:
+
+    python -m benchmarks.check_linear_scorer
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import joblib
+import numpy as np
+
+from matcher.ml.linear_scorer import LinearScorer
+from matcher.ml.model_loader import MODEL_PATH
+
+
+def per_call_seconds(fn, rows, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for row in rows:
+            fn(row)
+        best = min(best, time.perf_counter() - start)
+    return best / len(rows)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default=MODEL_PATH, help='regression pickle (default: the bundled model)')
+    parser.add_argument('--rows', type=int, default=100000, help='random feature rows compared')
+    parser.add_argument('--tolerance', type=float, default=1e-9, help='largest allowed absolute difference')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model)
+    scorer = LinearScorer.from_model(model)
+
+    fd, artifact_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    try:
+        scorer.save(artifact_path)
+        reloaded = LinearScorer.load(artifact_path)
+    finally:
+        os.remove(artifact_path)
+
+    rng = np.random.default_rng(args.seed)
+    X = rng.uniform(0, 100, size=(args.rows, scorer.n_features))
+    X = np.vstack([X, np.zeros(scorer.n_features), np.full(scorer.n_features, 100.0)])
+
+    expected = model.predict(X)
+    results = {
+        'predict': scorer.predict(X),
+        'predict (artifact)': reloaded.predict(X),
+        'score_row': np.array([scorer.score_row(row) for row in X.tolist()]),
+    }
+
+    failed = False
+    for name, actual in results.items():
+        diff = float(np.max(np.abs(actual - expected)))
+        ok = diff <= args.tolerance
+        failed |= not ok
+        print(f"{name:<20} max |diff| {diff:.3e}  {'ok' if ok else 'MISMATCH'}")
+
+    sample = X[:2000]
+    sklearn_seconds = per_call_seconds(lambda row: model.predict(row[None, :]), sample)
+    scorer_seconds = per_call_seconds(scorer.score_row, sample.tolist())
+    print(f"single row: sklearn {sklearn_seconds * 1e6:.1f} us, "
+          f"LinearScorer.score_row {scorer_seconds * 1e6:.2f} us "
+          f"({sklearn_seconds / scorer_seconds:.0f}x)")
+
+    start = time.perf_counter()
+    model.predict(X)
+    sklearn_batch = time.perf_counter() - start
+    start = time.perf_counter()
+    scorer.predict(X)
+    scorer_batch = time.perf_counter() - start
+    print(f"{len(X)} rows: sklearn {sklearn_batch * 1e3:.2f} ms, LinearScorer.predict {scorer_batch * 1e3:.2f} ms")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Deterministic synthetic CVs, job descriptions and documents for benchmarks
+
+Text generators target an approximate size in bytes; document generators
+target a page (or slide) count. Everything is seeded, so the same arguments
+always produce the same input and timings stay comparable between runs.
+"""
+
+import io
+import random
+
+SKILLS = [
+    'python', 'django', 'sql', 'docker', 'kubernetes', 'aws', 'react', 'machine learning',
+    'pandas', 'tensorflow', 'rest api', 'git', 'linux', 'excel', 'tableau', 'java',
+]
+
+FILLER = [
+    'built', 'designed', 'delivered', 'services', 'team', 'platform', 'customers',
+    'pipelines', 'with', 'and', 'the', 'for', 'production', 'systems', 'improved',
+    'latency', 'reporting', 'stakeholders', 'owned', 'migration', 'data', 'cloud',
+]
+
+CV_HEADERS = ['Professional Summary', 'Work Experience', 'Technical Skills', 'Education', 'Certifications']
+JD_HEADERS = ['About Us', 'Responsibilities', 'Requirements', 'Qualifications', 'Benefits']
+
+# Characters of body text per page in generated documents
+PAGE_CHARS = 3000
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(FILLER) for _ in range(rng.randint(6, 14))]
+    for _ in range(rng.randint(0, 2)):
+        words.insert(rng.randrange(len(words)), rng.choice(SKILLS))
+    if rng.random() < 0.2:
+        words.append(f"{rng.randint(1, 12)} years of experience")
+    return ' '.join(words).capitalize() + '.'
+
+
+def _document(headers: list, size: int, seed: int, preamble: list) -> str:
+    rng = random.Random(seed)
+    lines = list(preamble)
+    total = sum(len(line) + 1 for line in lines)
+    while total < size:
+        line = rng.choice(headers) if rng.random() < 0.06 else _sentence(rng)
+        lines.append(line)
+        total += len(line) + 1
+    return '\n'.join(lines)[:size]
+
+
+def synthetic_cv(size: int, seed: int = 0) -> str:
+    """CV text of about size bytes with contact details and section headers"""
+    preamble = [
+        'Jane Doe',
+        'jane.doe@example.com | +1 555 010 2030 | https://linkedin.com/in/janedoe',
+        'Work Experience',
+        "Bachelor's degree in Computer Science",
+    ]
+    return _document(CV_HEADERS, size, seed, preamble)
+
+
+def synthetic_jd(size: int, seed: int = 0) -> str:
+    """Job description text of about size bytes"""
+    preamble = [
+        'Senior Backend Engineer',
+        'Requirements',
+        "Bachelor's degree and 5+ years of experience required.",
+    ]
+    return _document(JD_HEADERS, size, seed, preamble)
+
+
+def _page_lines(pages: int, seed: int) -> list:
+    """Body lines for each page"""
+    text = synthetic_cv(pages * PAGE_CHARS, seed)
+    return [
+        text[page * PAGE_CHARS:(page + 1) * PAGE_CHARS].splitlines()
+        for page in range(pages)
+    ]
+
+
+def _pdf_escape(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def synthetic_pdf(pages: int, seed: int = 0) -> bytes:
+    """
+    Minimal text PDF with the given number of pages
+
+    Written by hand (standard Helvetica font, one content stream per page)
+    so no PDF authoring library is needed.
+    """
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    next_id = 4
+    for lines in _page_lines(pages, seed):
+        # Lines are wrapped at 90 chars so they stay on the page
+        wrapped = [line[i:i + 90] for line in lines for i in range(0, max(len(line), 1), 90)]
+        ops = ["BT /F1 9 Tf 11 TL 40 800 Td"]
+        ops.extend(f"({_pdf_escape(line)}) '" for line in wrapped)
+        ops.append("ET")
+        stream = '\n'.join(ops).encode('latin-1', errors='replace')
+
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        kids.append(f"{page_id} 0 R")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode('ascii')
+        objects[content_id] = b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream)
+
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode('ascii')
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = output.tell()
+        output.write(b"%d 0 obj\n%s\nendobj\n" % (object_id, objects[object_id]))
+
+    xref = output.tell()
+    size = max(objects) + 1
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+    for object_id in range(1, size):
+        output.write(b"%010d 00000 n \n" % offsets[object_id])
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref))
+    return output.getvalue()
+
+
+def synthetic_docx(pages: int, seed: int = 0) -> bytes:
+    """DOCX with a page break after each page of paragraphs (needs python-docx)"""
+    from docx import Document
+    from docx.enum.text import WD_BREAK
+
+    document = Document()
+    for lines in _page_lines(pages, seed):
+        for line in lines:
+            paragraph = document.add_paragraph(line)
+        paragraph.add_run().add_break(WD_BREAK.PAGE)
+
+    output = io.BytesIO()
+    document.save(output)
+    return output.getvalue()
+
+
+def synthetic_pptx(pages: int, seed: int = 0) -> bytes:
+    """PPTX with one text slide per page (needs python-pptx)"""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # blank
+    for lines in _page_lines(pages, seed):
+        slide = presentation.slides.add_slide(layout)
+        box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(6.5))
+        box.text_frame.text = '\n'.join(lines)
+
+    output = io.BytesIO()
+    presentation.save(output)
+    return output.getvalue()
+
+
+def synthetic_txt(pages: int, seed: int = 0) -> bytes:
+    """Plain UTF-8 text of pages * PAGE_CHARS characters"""
+    return '\n'.join('\n'.join(lines) for lines in _page_lines(pages, seed)).encode('utf-8')
+
+
+# Extension -> generator, matching FileExtractor.EXTRACTORS (.doc files are
+# parsed as DOCX)
+DOCUMENT_GENERATORS = {
+    '.pdf': synthetic_pdf,
+    '.docx': synthetic_docx,
+    '.doc': synthetic_docx,
+    '.txt': synthetic_txt,
+    '.pptx': synthetic_pptx,
+}
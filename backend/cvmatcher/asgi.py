@@ -1,11 +1,79 @@
 """
 ASGI config for cvmatcher project.
+
+Run with e.g. `uvicorn cvmatcher.asgi:application`; the async prediction
+endpoints live under /api/async/.
 """
 
+import asyncio
 import os
 
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cvmatcher.settings')
 
-application = get_asgi_application()
+
+class DisconnectCancellationMiddleware:
+    """
+    Cancel the request handler when the client disconnects
+
+    Django 4.2 reads the whole body up front and never listens for
+    http.disconnect afterwards, so abandoned requests would run to
+    completion. Once the body is consumed this wrapper keeps listening and
+    cancels the handler task on disconnect, unless the final response body
+    has already been sent (the handler is then only finishing up, e.g.
+    running request_finished handlers, and must not be interrupted).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        body_done = asyncio.Event()
+        disconnected = False
+        response_sent = False
+
+        async def tracking_receive():
+            nonlocal disconnected
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                disconnected = True
+                body_done.set()
+            elif not message.get('more_body', False):
+                body_done.set()
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_sent
+            if message['type'] == 'http.response.body' and not message.get('more_body', False):
+                # Set first: a disconnect while the last body is going out
+                # must not cancel the send itself
+                response_sent = True
+            await send(message)
+
+        handler = asyncio.ensure_future(self.app(scope, tracking_receive, tracking_send))
+
+        async def watch_disconnect():
+            nonlocal disconnected
+            await body_done.wait()
+            while not disconnected:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    disconnected = True
+            if not response_sent:
+                handler.cancel()
+
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected or response_sent:
+                raise
+        finally:
+            watcher.cancel()
+
+
+application = DisconnectCancellationMiddleware(get_asgi_application())
@@ -23,6 +23,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.request_metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -54,8 +55,7 @@ DATABASES = {
     }
 }
 
-# Database no longer needed - using stateless API only
-# Keeping configuration for potential future use
+# Served scores are recorded to MatchResult in the background (api/recorder.py)
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -100,3 +100,107 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 100,
 }
+
+# Embedding cache (matcher/ml/embedding_cache.py)
+EMBEDDING_CACHE_MAX_ENTRIES = config('EMBEDDING_CACHE_MAX_ENTRIES', default=10000, cast=int)
+EMBEDDING_CACHE_MAX_BYTES = config('EMBEDDING_CACHE_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+# Set to a directory to persist embeddings across restarts
+EMBEDDING_CACHE_DIR = config('EMBEDDING_CACHE_DIR', default='') or None
+# Byte budget of that directory (0 = unbounded); least recently used files go first
+EMBEDDING_CACHE_DISK_MAX_BYTES = config('EMBEDDING_CACHE_DISK_MAX_BYTES', default=1024 * 1024 * 1024, cast=int)
+
+# CV index (matcher/ml/cv_index.py)
+CV_INDEX_DIR = config('CV_INDEX_DIR', default=str(BASE_DIR / 'cv_index'))
+# float16 halves the on-disk/mapped size at a small precision cost
+CV_INDEX_DTYPE = config('CV_INDEX_DTYPE', default='float32')
+# Inverted lists scanned per search once an ANN index is built
+# (manage.py build_ann_index); higher is more accurate and slower
+CV_INDEX_NPROBE = config('CV_INDEX_NPROBE', default=16, cast=int)
+
+# Model loading (matcher/ml/model_loader.py)
+# Models load lazily on first use. Set to True to start warming them in a
+# background thread as soon as Django is ready (gunicorn.conf.py warms
+# workers in post_worker_init instead). Otherwise the first /api/ready/
+# probe starts the warmup and the probe reports 503 until it is done.
+MODEL_WARMUP_ON_READY = config('MODEL_WARMUP_ON_READY', default=False, cast=bool)
+
+# Encoder backend: 'torch' (SentenceTransformer), 'onnx' (ONNX Runtime, fp32)
+# or 'onnx-int8' (ONNX Runtime, dynamically quantized). The ONNX model is
+# exported to ONNX_MODEL_DIR on first use if it is not already there.
+ENCODER_BACKEND = config('ENCODER_BACKEND', default='torch')
+ONNX_MODEL_DIR = config('ONNX_MODEL_DIR', default=str(BASE_DIR / 'onnx_model'))
+ONNX_THREADS = config('ONNX_THREADS', default=0, cast=int)
+
+# Micro-batching of concurrent encode calls (matcher/ml/batching.py). Useful
+# with threaded workers; each call may wait up to ENCODER_BATCH_MAX_WAIT_MS
+# for other requests to share its forward pass.
+ENCODER_MICRO_BATCHING = config('ENCODER_MICRO_BATCHING', default=False, cast=bool)
+ENCODER_BATCH_MAX_SIZE = config('ENCODER_BATCH_MAX_SIZE', default=64, cast=int)
+ENCODER_BATCH_MAX_WAIT_MS = config('ENCODER_BATCH_MAX_WAIT_MS', default=5.0, cast=float)
+
+# Async views (api/async_views.py, served through cvmatcher/asgi.py)
+# Threads for extraction/encoding (0 = one per CPU) and the cap on requests
+# queued for them (requests beyond ASYNC_MAX_PENDING get 503 with Retry-After)
+ASYNC_CPU_WORKERS = config('ASYNC_CPU_WORKERS', default=0, cast=int)
+ASYNC_MAX_PENDING = config('ASYNC_MAX_PENDING', default=256, cast=int)
+
+# Sandboxed document extraction (matcher/ml/extraction_pool.py)
+# Set EXTRACTION_POOL_SIZE to 0 to parse inline in the request thread
+EXTRACTION_POOL_SIZE = config('EXTRACTION_POOL_SIZE', default=2, cast=int)
+EXTRACTION_TIMEOUT_SECONDS = config('EXTRACTION_TIMEOUT_SECONDS', default=30.0, cast=float)
+EXTRACTION_MEMORY_LIMIT_MB = config('EXTRACTION_MEMORY_LIMIT_MB', default=512, cast=int)
+EXTRACTION_MAX_JOBS_PER_WORKER = config('EXTRACTION_MAX_JOBS_PER_WORKER', default=50, cast=int)
+# Extraction budgets: stop parsing once this much text (or this many
+# PDF pages / PPTX slides) has been read
+EXTRACTION_MAX_CHARS = config('EXTRACTION_MAX_CHARS', default=50000, cast=int)
+EXTRACTION_MAX_PAGES = config('EXTRACTION_MAX_PAGES', default=100, cast=int)
+
+# Extracted-text cache keyed by upload content hash (matcher/ml/text_cache.py)
+TEXT_CACHE_MAX_ENTRIES = config('TEXT_CACHE_MAX_ENTRIES', default=1000, cast=int)
+TEXT_CACHE_MAX_BYTES = config('TEXT_CACHE_MAX_BYTES', default=64 * 1024 * 1024, cast=int)
+TEXT_CACHE_DIR = config('TEXT_CACHE_DIR', default='') or None
+# Byte budget of that directory (0 = unbounded); least recently used files go first
+TEXT_CACHE_DISK_MAX_BYTES = config('TEXT_CACHE_DISK_MAX_BYTES', default=1024 * 1024 * 1024, cast=int)
+
+# Prediction result cache (matcher/ml/result_cache.py): 'local' (in-process
+# LRU), 'django' (the RESULT_CACHE_ALIAS entry of CACHES) or 'none'
+RESULT_CACHE_BACKEND = config('RESULT_CACHE_BACKEND', default='local')
+RESULT_CACHE_MAX_ENTRIES = config('RESULT_CACHE_MAX_ENTRIES', default=10000, cast=int)
+RESULT_CACHE_ALIAS = config('RESULT_CACHE_ALIAS', default='default')
+RESULT_CACHE_TIMEOUT = config('RESULT_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Sampled request logging (api/views.py): fraction of requests logged and
+# how many characters of each text field are kept
+REQUEST_LOG_SAMPLE_RATE = config('REQUEST_LOG_SAMPLE_RATE', default=0.01, cast=float)
+REQUEST_LOG_MAX_CHARS = config('REQUEST_LOG_MAX_CHARS', default=200, cast=int)
+
+# Regression coefficients cached from the pickle (matcher/ml/linear_scorer.py);
+# defaults to overall_match_regression_model.scorer.json beside the pickle
+REGRESSION_SCORER_PATH = config('REGRESSION_SCORER_PATH', default='') or None
+
+# Skill normalisation (matcher/ml/skill_normalizer.py): phrases that are not
+# a skill or alias are embedded and mapped to the most similar skill when the
+# cosine similarity reaches the threshold. Off by default: it adds an encoder
+# batch per document and can change which skills existing scores were based on
+SKILL_SEMANTIC_MATCHING = config('SKILL_SEMANTIC_MATCHING', default=False, cast=bool)
+SKILL_SEMANTIC_THRESHOLD = config('SKILL_SEMANTIC_THRESHOLD', default=0.7, cast=float)
+SKILL_SEMANTIC_MAX_CANDIDATES = config('SKILL_SEMANTIC_MAX_CANDIDATES', default=512, cast=int)
+# Where the skill embedding matrix is cached as .npy (default: the backend directory)
+SKILL_EMBEDDINGS_DIR = config('SKILL_EMBEDDINGS_DIR', default='') or None
+SKILL_PHRASE_CACHE_MAX_ENTRIES = config('SKILL_PHRASE_CACHE_MAX_ENTRIES', default=50000, cast=int)
+SKILL_PHRASE_CACHE_MAX_BYTES = config('SKILL_PHRASE_CACHE_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+
+# Write-behind audit trail of served scores (api/recorder.py). Results are
+# queued in memory and inserted in batches of MATCH_RECORDER_BATCH_SIZE or
+# every MATCH_RECORDER_FLUSH_SECONDS. When the queue is full a request waits
+# up to MATCH_RECORDER_BLOCK_SECONDS for room, then the result is dropped.
+MATCH_RECORDER_ENABLED = config('MATCH_RECORDER_ENABLED', default=True, cast=bool)
+MATCH_RECORDER_MAX_QUEUE = config('MATCH_RECORDER_MAX_QUEUE', default=10000, cast=int)
+MATCH_RECORDER_BATCH_SIZE = config('MATCH_RECORDER_BATCH_SIZE', default=500, cast=int)
+MATCH_RECORDER_FLUSH_SECONDS = config('MATCH_RECORDER_FLUSH_SECONDS', default=2.0, cast=float)
+MATCH_RECORDER_BLOCK_SECONDS = config('MATCH_RECORDER_BLOCK_SECONDS', default=0.0, cast=float)
+# False stores only SHA-256 hashes of the CV and JD texts
+MATCH_RECORDER_STORE_TEXT = config('MATCH_RECORDER_STORE_TEXT', default=True, cast=bool)
+# Retries (with backoff from 0.1s, doubling up to 2s) for a batch whose insert
+# hits a transient database error, e.g. SQLite's "database is locked"
+MATCH_RECORDER_WRITE_RETRIES = config('MATCH_RECORDER_WRITE_RETRIES', default=3, cast=int)
@@ -0,0 +1,41 @@
+"""
+Gunicorn configuration for cvmatcher
+
+Usage: gunicorn -c gunicorn.conf.py cvmatcher.wsgi
+"""
+
+from decouple import config
+
+bind = config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = config('GUNICORN_WORKERS', default=2, cast=int)
+threads = config('GUNICORN_THREADS', default=4, cast=int)
+# A worker only starts heartbeating once post_worker_init returns, so timeout
+# must also cover model warmup (tens of seconds on a cold CPU, longer when
+# the ONNX model has to be exported first), not just the slowest request
+timeout = config('GUNICORN_TIMEOUT', default=180, cast=int)
+
+# Only used on shutdown and reload: how long a worker may finish in-flight
+# requests and flush the match recorder before it is killed
+graceful_timeout = config('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+
+
+def post_worker_init(worker):
+    """
+    Load and warm the models before the worker accepts connections
+    With MODEL_WARMUP_ON_WORKER_INIT off, the first /api/ready/ probe starts
+    warmup instead and reports 503 until it finishes.
+    """
+    if not config('MODEL_WARMUP_ON_WORKER_INIT', default=True, cast=bool):
+        return
+
+    from matcher.ml.model_loader import models
+
+    models.warmup()
+    worker.log.info("Models warm: %s", models.status()['timings'])
+
+
+def worker_exit(server, worker):
+    """Write the queued match results before the worker goes away"""
+    from api.recorder import close_match_recorder
+
+    close_match_recorder()
@@ -0,0 +1,435 @@
+"""
+Approximate nearest-neighbour search over CV embeddings (pure NumPy)
+
+IVFIndex is an inverted-file index for inner-product search over
+L2-normalised embeddings, so scores are cosine similarities. A spherical
+k-means over a sample of the vectors gives nlist centroids. Every vector is
+stored in the inverted list of its nearest centroid. A query scans only the
+nprobe lists whose centroids score highest, so nprobe trades recall for
+latency: nprobe == nlist is an exact search.
+
+Lists hold either the raw vectors (IVF-Flat) or, with pq_m > 0, product-
+quantised residuals (IVF-PQ): each vector minus its centroid is split into
+pq_m sub-vectors, and each sub-vector is stored as one byte, the index of
+its nearest of 256 sub-centroids. That shrinks a 384-dim float32 vector from
+1536 bytes to pq_m bytes, at the cost of approximate scores.
+
+Vectors can be added after training, and removed by id. Ids are
+non-negative integers; an array indexed by id records the list holding each
+one, so removing an id only scans its own list (keep ids dense: the array
+has one slot per id up to the largest). save() writes a directory of .npy
+files that load() memory-maps, so opening a large index is cheap and lists
+are copied into memory only when they grow. The saved path is a symlink to
+the directory of one save; a new save fills a fresh directory and swaps the
+link with one rename, so a reader sees either the old index or the new one.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .vectors import normalize_rows
+
+# Bump when the on-disk layout changes
+INDEX_FORMAT = 1
+
+# Sub-centroids per product-quantiser subspace (codes are one byte)
+PQ_CENTROIDS = 256
+
+# Rows per matrix product while training and assigning, to bound memory
+ASSIGN_CHUNK = 65536
+
+
+class IVFIndexError(Exception):
+    """Custom exception for ANN index errors"""
+    pass
+
+
+def _assign(data: np.ndarray, centroids: np.ndarray, inner_product: bool) -> np.ndarray:
+    """Nearest centroid of every row, in chunks"""
+    # For L2, argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+    bias = None if inner_product else -0.5 * np.einsum('ij,ij->i', centroids, centroids)
+    assignments = np.empty(len(data), dtype=np.int64)
+    for start in range(0, len(data), ASSIGN_CHUNK):
+        scores = data[start:start + ASSIGN_CHUNK] @ centroids.T
+        if bias is not None:
+            scores += bias
+        assignments[start:start + ASSIGN_CHUNK] = scores.argmax(axis=1)
+    return assignments
+
+
+def kmeans(data: np.ndarray, k: int, iterations: int = 20, spherical: bool = False,
+           seed: int = 0) -> np.ndarray:
+    """
+    Lloyd's k-means; spherical keeps centroids unit-length and assigns by
+    inner product. Empty clusters are re-seeded from random rows.
+    """
+    data = np.ascontiguousarray(data, dtype=np.float32)
+    if len(data) < k:
+        raise IVFIndexError(f"Need at least {k} training vectors, got {len(data)}")
+
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(len(data), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = _assign(data, centroids, inner_product=spherical)
+        order = np.argsort(assignments, kind='stable')
+        counts = np.bincount(assignments, minlength=k)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+        filled = counts > 0
+        sums = np.add.reduceat(data[order], starts[filled], axis=0)
+        centroids[filled] = sums if spherical else sums / counts[filled, None]
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = data[rng.choice(len(data), len(empty), replace=False)]
+        if spherical:
+            centroids = normalize_rows(centroids)
+    return centroids
+
+
+class IVFIndex:
+    """Inverted-file index with optional product quantisation"""
+
+    HEADER_FILE = 'ivf.json'
+
+    def __init__(self, dim: int = 384, nlist: int = 1024, nprobe: int = 16,
+                 pq_m: int = 0, dtype: str = 'float32'):
+        if pq_m and dim % pq_m:
+            raise IVFIndexError(f"pq_m ({pq_m}) must divide the dimension ({dim})")
+        if dtype not in ('float32', 'float16'):
+            raise IVFIndexError(f"Unsupported index dtype: {dtype}")
+
+        self.dim = dim
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.pq_m = pq_m
+        self.dtype = np.dtype(dtype)
+
+        self.centroids: Optional[np.ndarray] = None
+        self.codebooks: Optional[np.ndarray] = None  # (pq_m, 256, dim / pq_m)
+        self.label = None  # saved with the index, for callers to check what it matches
+        self._next_id = 0
+        self._reset_lists()
+
+    def _reset_lists(self) -> None:
+        row_shape = (self.pq_m,) if self.pq_m else (self.dim,)
+        row_dtype = np.uint8 if self.pq_m else self.dtype
+        self._ids: List[np.ndarray] = [np.empty(0, dtype=np.int64) for _ in range(self.nlist)]
+        self._data: List[np.ndarray] = [np.empty((0,) + row_shape, dtype=row_dtype) for _ in range(self.nlist)]
+        self._sizes = np.zeros(self.nlist, dtype=np.int64)
+        # List number of every id, -1 where absent
+        self._list_of = np.full(0, -1, dtype=np.int32)
+
+    def _lists_of(self, ids: np.ndarray) -> np.ndarray:
+        lists = np.full(len(ids), -1, dtype=np.int32)
+        known = ids < len(self._list_of)
+        lists[known] = self._list_of[ids[known]]
+        return lists
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    @property
+    def ntotal(self) -> int:
+        return int(self._sizes.sum())
+
+    def __len__(self) -> int:
+        return self.ntotal
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the stored vectors/codes and their ids"""
+        row_bytes = self.pq_m if self.pq_m else self.dim * self.dtype.itemsize
+        return self.ntotal * (row_bytes + 8)
+
+    # =========================
+    # TRAINING
+    # =========================
+
+    def train(self, vectors: np.ndarray, iterations: int = 20, sample_size: Optional[int] = None,
+              seed: int = 0) -> None:
+        """
+        Learn the coarse centroids (and PQ codebooks) from a sample of vectors
+        The default sample is 64 vectors per list (plus 256 per PQ centroid),
+        which is plenty for the centroids to settle.
+        """
+        vectors = np.asarray(vectors)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise IVFIndexError(f"Expected an N x {self.dim} matrix, got shape {vectors.shape}")
+        if self.ntotal:
+            raise IVFIndexError("Index already holds vectors; train a new index instead")
+
+        sample_size = sample_size or max(64 * self.nlist, 256 * PQ_CENTROIDS if self.pq_m else 0)
+        rng = np.random.default_rng(seed)
+        if len(vectors) > sample_size:
+            sample = vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))]
+        else:
+            sample = vectors
+        sample = normalize_rows(sample)
+
+        centroids = kmeans(sample, self.nlist, iterations, spherical=True, seed=seed)
+        if self.pq_m:
+            residuals = sample - centroids[_assign(sample, centroids, inner_product=True)]
+            dsub = self.dim // self.pq_m
+            self.codebooks = np.stack([
+                kmeans(residuals[:, m * dsub:(m + 1) * dsub], PQ_CENTROIDS, iterations, seed=seed + m)
+                for m in range(self.pq_m)
+            ])
+        self.centroids = centroids
+
+    def _encode(self, residuals: np.ndarray) -> np.ndarray:
+        dsub = self.dim // self.pq_m
+        codes = np.empty((len(residuals), self.pq_m), dtype=np.uint8)
+        for m in range(self.pq_m):
+            sub = np.ascontiguousarray(residuals[:, m * dsub:(m + 1) * dsub])
+            codes[:, m] = _assign(sub, self.codebooks[m], inner_product=False)
+        return codes
+
+    # =========================
+    # ADD / REMOVE
+    # =========================
+
+    def _append(self, list_no: int, ids: np.ndarray, rows: np.ndarray) -> None:
+        size = self._sizes[list_no]
+        needed = size + len(ids)
+        current = self._ids[list_no]
+        # Memory-mapped lists from load() are read-only; the first append copies them
+        if needed > len(current) or not current.flags.writeable:
+            capacity = max(needed, 2 * len(current), 16)
+            grown_ids = np.empty(capacity, dtype=np.int64)
+            grown_ids[:size] = current[:size]
+            data = self._data[list_no]
+            grown_data = np.empty((capacity,) + data.shape[1:], dtype=data.dtype)
+            grown_data[:size] = data[:size]
+            self._ids[list_no], self._data[list_no] = grown_ids, grown_data
+        self._ids[list_no][size:needed] = ids
+        self._data[list_no][size:needed] = rows
+        self._sizes[list_no] = needed
+
+    def add(self, vectors: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Add vectors (normalised here) under the given non-negative int64 ids,
+        or under consecutive ids after the largest one handed out so far
+        An id that is already stored is replaced. Returns the ids.
+        """
+        if not self.is_trained:
+            raise IVFIndexError("Index must be trained before vectors are added")
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape[1] != self.dim:
+            raise IVFIndexError(f"Expected an N x {self.dim} matrix, got shape {vectors.shape}")
+        if ids is None:
+            ids = np.arange(self._next_id, self._next_id + len(vectors), dtype=np.int64)
+        else:
+            ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+            if len(ids) != len(vectors):
+                raise IVFIndexError("ids must match vectors in length")
+        if not len(ids):
+            return ids
+        if ids.min() < 0:
+            raise IVFIndexError("ids must be non-negative")
+        self.remove(ids)
+        self._next_id = max(self._next_id, int(ids.max()) + 1)
+        if self._next_id > len(self._list_of):
+            grown = np.full(max(self._next_id, 2 * len(self._list_of)), -1, dtype=np.int32)
+            grown[:len(self._list_of)] = self._list_of
+            self._list_of = grown
+
+        for start in range(0, len(vectors), ASSIGN_CHUNK):
+            chunk = normalize_rows(vectors[start:start + ASSIGN_CHUNK])
+            chunk_ids = ids[start:start + ASSIGN_CHUNK]
+            lists = _assign(chunk, self.centroids, inner_product=True)
+            rows = self._encode(chunk - self.centroids[lists]) if self.pq_m else chunk.astype(self.dtype)
+
+            order = np.argsort(lists, kind='stable')
+            bounds = np.flatnonzero(np.diff(lists[order])) + 1
+            for group in np.split(order, bounds):
+                self._append(int(lists[group[0]]), chunk_ids[group], rows[group])
+            self._list_of[chunk_ids] = lists
+        return ids
+
+    def remove(self, ids) -> int:
+        """Remove every vector stored under the given ids; returns how many"""
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        ids = ids[ids >= 0]
+        lists = self._lists_of(ids)
+        ids, lists = ids[lists >= 0], lists[lists >= 0]
+        removed = 0
+        for list_no in np.unique(lists):
+            size = self._sizes[list_no]
+            keep = ~np.isin(self._ids[list_no][:size], ids[lists == list_no])
+            kept = int(keep.sum())
+            if kept == size:
+                continue
+            # Boolean indexing copies, which also detaches memory-mapped lists
+            self._ids[list_no] = self._ids[list_no][:size][keep]
+            self._data[list_no] = self._data[list_no][:size][keep]
+            self._sizes[list_no] = kept
+            removed += size - kept
+        self._list_of[ids] = -1
+        return removed
+
+    # =========================
+    # SEARCH
+    # =========================
+
+    def search(self, queries: np.ndarray, k: int = 10,
+               nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k inner-product search for each query row
+        Returns (scores, ids), both nq x k and best first; slots beyond the
+        vectors found are filled with -inf and -1.
+        """
+        if not self.is_trained:
+            raise IVFIndexError("Index must be trained before it can be searched")
+        queries = normalize_rows(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+
+        coarse = queries @ self.centroids.T
+        if nprobe < self.nlist:
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.nlist), coarse.shape)
+
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        for qi, query in enumerate(queries):
+            lists = [int(l) for l in probes[qi] if self._sizes[l]]
+            if not lists:
+                continue
+            if self.pq_m:
+                # Inner products of each query sub-vector with every sub-centroid;
+                # a code's score is then a sum of pq_m table lookups
+                table = np.einsum('md,mcd->mc', query.reshape(self.pq_m, -1), self.codebooks)
+                offsets = np.arange(self.pq_m) * PQ_CENTROIDS
+                table = table.ravel()
+            candidate_scores = []
+            for l in lists:
+                data = self._data[l][:self._sizes[l]]
+                if self.pq_m:
+                    candidate_scores.append(coarse[qi, l] + table[data + offsets].sum(axis=1))
+                else:
+                    candidate_scores.append(data.astype(np.float32, copy=False) @ query)
+            candidate_scores = np.concatenate(candidate_scores)
+            candidate_ids = np.concatenate([self._ids[l][:self._sizes[l]] for l in lists])
+
+            top = min(k, len(candidate_scores))
+            best = np.argpartition(-candidate_scores, top - 1)[:top]
+            best = best[np.argsort(-candidate_scores[best], kind='stable')]
+            scores[qi, :top] = candidate_scores[best]
+            ids[qi, :top] = candidate_ids[best]
+        return scores, ids
+
+    # =========================
+    # PERSISTENCE
+    # =========================
+
+    def save(self, path: str) -> None:
+        """
+        Write the index as a JSON header plus .npy files with the lists
+        concatenated, into a fresh directory next to path; path then becomes
+        a symlink to it in one rename and the previous directory is removed
+        """
+        if not self.is_trained:
+            raise IVFIndexError("Cannot save an untrained index")
+        path = os.path.abspath(path)
+        parent, name = os.path.split(path)
+        os.makedirs(parent, exist_ok=True)
+        target = tempfile.mkdtemp(dir=parent, prefix=f'.{name}-')
+
+        offsets = np.concatenate(([0], np.cumsum(self._sizes))).astype(np.int64)
+        row_shape = self._data[0].shape[1:]
+        arrays = {
+            'centroids.npy': (self.centroids.dtype, self.centroids.shape, [self.centroids]),
+            'offsets.npy': (offsets.dtype, offsets.shape, [offsets]),
+            'ids.npy': (np.int64, (self.ntotal,), [
+                self._ids[l][:self._sizes[l]] for l in range(self.nlist)
+            ]),
+            'data.npy': (self._data[0].dtype, (self.ntotal,) + row_shape, [
+                self._data[l][:self._sizes[l]] for l in range(self.nlist)
+            ]),
+        }
+        if self.pq_m:
+            arrays['codebooks.npy'] = (self.codebooks.dtype, self.codebooks.shape, [self.codebooks])
+
+        for file_name, (dtype, shape, parts) in arrays.items():
+            # Written part by part, so saving never holds a second copy in memory
+            out = np.lib.format.open_memmap(
+                os.path.join(target, file_name), mode='w+', dtype=dtype, shape=shape
+            )
+            position = 0
+            for part in parts:
+                out[position:position + len(part)] = part
+                position += len(part)
+            out.flush()
+            del out
+
+        with open(os.path.join(target, self.HEADER_FILE), 'w', encoding='utf-8') as header_file:
+            json.dump({
+                'format': INDEX_FORMAT,
+                'dim': self.dim,
+                'nlist': self.nlist,
+                'nprobe': self.nprobe,
+                'pq_m': self.pq_m,
+                'dtype': self.dtype.name,
+                'ntotal': self.ntotal,
+                'next_id': self._next_id,
+                'label': self.label,
+            }, header_file)
+
+        previous = os.path.realpath(path) if os.path.islink(path) else None
+        link = f'{target}.link'
+        os.symlink(os.path.basename(target), link)
+        os.replace(link, path)
+        if previous is not None and previous != target:
+            # Readers that already mapped the old files keep them
+            shutil.rmtree(previous, ignore_errors=True)
+
+    @classmethod
+    def delete(cls, path: str) -> None:
+        """Remove a saved index (the symlink and the directory it points at)"""
+        if not os.path.lexists(path):
+            return
+        target = os.path.realpath(path)
+        if os.path.islink(path):
+            os.remove(path)
+        shutil.rmtree(target, ignore_errors=True)
+
+    @classmethod
+    def exists(cls, path: str) -> bool:
+        return os.path.exists(os.path.join(path, cls.HEADER_FILE))
+
+    @classmethod
+    def load(cls, path: str) -> 'IVFIndex':
+        """Open a saved index; the lists stay memory-mapped until modified"""
+        # Resolved once, so every file comes from the same save
+        path = os.path.realpath(path)
+        with open(os.path.join(path, cls.HEADER_FILE), 'r', encoding='utf-8') as header_file:
+            header = json.load(header_file)
+        if header.get('format') != INDEX_FORMAT:
+            raise IVFIndexError(f"Unsupported ANN index format: {header.get('format')}")
+
+        index = cls(header['dim'], header['nlist'], header['nprobe'], header['pq_m'], header['dtype'])
+        index._next_id = header['next_id']
+        index.label = header['label']
+        index.centroids = np.load(os.path.join(path, 'centroids.npy'))
+        if index.pq_m:
+            index.codebooks = np.load(os.path.join(path, 'codebooks.npy'))
+
+        offsets = np.load(os.path.join(path, 'offsets.npy'))
+        if len(offsets) != index.nlist + 1 or offsets[-1] != header['ntotal']:
+            raise IVFIndexError(f"ANN index at {path} is inconsistent with its header")
+        ids = np.load(os.path.join(path, 'ids.npy'), mmap_mode='r')
+        data = np.load(os.path.join(path, 'data.npy'), mmap_mode='r')
+        for l in range(index.nlist):
+            start, end = offsets[l], offsets[l + 1]
+            index._ids[l] = ids[start:end]
+            index._data[l] = data[start:end]
+        index._sizes = np.diff(offsets)
+        index._list_of = np.full(index._next_id, -1, dtype=np.int32)
+        index._list_of[ids] = np.repeat(np.arange(index.nlist, dtype=np.int32), index._sizes)
+        return index
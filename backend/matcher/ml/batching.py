@@ -0,0 +1,150 @@
+"""
+Dynamic micro-batching for the sentence encoder
+
+Concurrent callers submit texts; a single background thread gathers them for
+up to max_wait_ms (or until max_batch_size texts are queued), sorts by length
+to minimise padding, runs one forward pass and hands each caller its vectors
+through a Future.
+"""
+
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List
+
+import numpy as np
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class _Request:
+    __slots__ = ('texts', 'future', 'enqueued_at')
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class MicroBatcher:
+    """Coalesces concurrent encode calls into batched forward passes"""
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self._queued_texts = 0
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+        self.errors = 0
+        self.batch_size_counts = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self.total_wait_seconds = 0.0
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Blocking encode through the batcher"""
+        return self.submit(texts).result()
+
+    def submit(self, texts: List[str]) -> Future:
+        self._ensure_started()
+        request = _Request(list(texts))
+        with self._stats_lock:
+            self._queued_texts += len(request.texts)
+        self._queue.put(request)
+        return request.future
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='encoder-batcher', daemon=True
+                )
+                self._thread.start()
+
+    def _collect(self) -> List[_Request]:
+        """Block for the first request, then gather more until full or the wait expires"""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            texts = [text for request in batch for text in request.texts]
+            started = time.perf_counter()
+
+            with self._stats_lock:
+                self._queued_texts -= len(texts)
+                self.batches += 1
+                self.requests += len(batch)
+                self.texts += len(texts)
+                self.batch_size_counts[bisect.bisect_left(BATCH_SIZE_BUCKETS, len(texts))] += 1
+                self.total_wait_seconds += sum(started - r.enqueued_at for r in batch)
+
+            try:
+                # Length-sorted batch keeps padding small; results are put back
+                # in submission order before being split between callers
+                order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+                encoded = np.asarray(self.encode_fn([texts[i] for i in order]))
+                vectors = np.empty_like(encoded)
+                vectors[order] = encoded
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += 1
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            offset = 0
+            for request in batch:
+                count = len(request.texts)
+                request.future.set_result(vectors[offset:offset + count])
+                offset += count
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            # Cumulative buckets, Prometheus-style
+            histogram = {}
+            cumulative = 0
+            for bound, count in zip(BATCH_SIZE_BUCKETS, self.batch_size_counts):
+                cumulative += count
+                histogram[f"le_{bound}"] = cumulative
+            histogram['le_inf'] = cumulative + self.batch_size_counts[-1]
+            return {
+                'queue_depth': self._queue.qsize(),
+                'queued_texts': self._queued_texts,
+                'batches': self.batches,
+                'requests': self.requests,
+                'texts': self.texts,
+                'errors': self.errors,
+                'mean_batch_size': self.texts / self.batches if self.batches else 0.0,
+                'mean_wait_ms': (
+                    self.total_wait_seconds / self.requests * 1000 if self.requests else 0.0
+                ),
+                'batch_size_histogram': histogram,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+            }
@@ -0,0 +1,105 @@
+"""
+Worker functions for offline bulk jobs (the score_pairs and ingest_resumes
+management commands)
+
+Everything here runs inside process pools, so the functions are module
+level and only take and return picklable values. Workers never load the
+encoder: features come without the embedding-based skills, which the
+calling command adds per batch with predictor.add_semantic_skills.
+Per-document failures are returned as error strings rather than raised, so
+one bad input never takes down a batch.
+"""
+
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from .file_extractor import FileExtractor, FileExtractionError
+
+
+def make_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """Process pool for bulk jobs"""
+    # spawn: never fork a process that may hold torch/threads state
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context('spawn'),
+    )
+
+
+def read_document(source, name: str) -> str:
+    """
+    Extract text from a path or raw bytes, choosing the extractor by the
+    extension of name. Uses the same char/page budgets as uploads.
+    """
+    ext = os.path.splitext(name.lower())[1]
+    method_name = FileExtractor.EXTRACTORS.get(ext)
+    if method_name is None:
+        raise FileExtractionError(f"Unsupported file format: {ext or name}")
+    text = getattr(FileExtractor, method_name)(source)
+    if not text or len(text.strip()) < 10:
+        raise FileExtractionError("Extracted text is too short or empty")
+    return text
+
+
+def prepare_text(value: str, is_path: bool = False) -> Tuple[Optional[str], Optional[dict], Optional[str]]:
+    """
+    Normalize and clean one text (or the document at a path) and extract its
+    scoring features, as ingest_document does
+    Returns: (cleaned_text, features, error); error is None on success
+    """
+    from . import predictor
+    from .normalizer import normalize_document
+
+    try:
+        text = read_document(value, value) if is_path else value
+        cleaned = predictor.clean_text(normalize_document(text))
+        return cleaned, predictor.extract_features(cleaned, semantic=False), None
+    except (FileExtractionError, OSError) as e:
+        return None, None, str(e)
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
+
+
+# Zip archives opened by this worker, so the central directory is read once
+# per process rather than once per member
+_archives = {}
+
+
+def _archive(path: str) -> zipfile.ZipFile:
+    archive = _archives.get(path)
+    if archive is None:
+        archive = _archives[path] = zipfile.ZipFile(path)
+    return archive
+
+
+def ingest_document(path: str, member: Optional[str] = None) -> Tuple[Optional[str], Optional[dict], Optional[str]]:
+    """
+    Extract, normalise and featurise one resume: the file at path, or a
+    member of the zip archive at path
+    Returns: (cleaned_text, features, error); error is None on success
+    """
+    from . import predictor
+    from .normalizer import normalize_document
+    from .preprocessor import TextPreprocessor
+
+    try:
+        if member is None:
+            text = read_document(path, path)
+        else:
+            text = read_document(_archive(path).read(member), member)
+
+        document = normalize_document(text)
+        is_valid, error = TextPreprocessor.validate_preprocessed_text(
+            TextPreprocessor.preprocess_cv(text, document)
+        )
+        if not is_valid:
+            return None, None, error
+
+        cleaned = predictor.clean_text(document)
+        return cleaned, predictor.extract_features(cleaned, semantic=False), None
+    except (FileExtractionError, OSError, zipfile.BadZipFile) as e:
+        return None, None, str(e)
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}"
@@ -0,0 +1,18 @@
+"""
+Settings access for the matcher package
+
+The ML modules can run inside Django (settings come from cvmatcher/settings.py)
+or standalone from scripts and benchmarks, in which case defaults are used.
+"""
+
+
+def get_setting(name: str, default=None):
+    """Return a Django setting if settings are configured, else the default"""
+    try:
+        from django.conf import settings
+    except ImportError:
+        return default
+
+    if not settings.configured:
+        return default
+    return getattr(settings, name, default)
@@ -0,0 +1,577 @@
+"""
+Persistent index of candidate CVs for top-k search against a job description
+
+Each CV's embedding lives in a memory-mapped matrix on disk (vectors.bin,
+raw rows of dim values); the features needed for full scoring (skills,
+degree, experience) are kept in a JSON snapshot (meta.json) plus an
+append-only journal of the changes made since. A search does one
+matrix-vector product over the pool, takes a shortlist with argpartition and
+runs predict_match-style scoring on the shortlist only.
+
+Several processes (gunicorn workers, the ingest command) can share one index
+directory. Every change takes an exclusive fcntl lock on index.lock, first
+catches up with the journal, writes its vectors into the shared matrix and
+appends its records to the journal; the matrix grows in place, so every
+process keeps mapping the same file. Readers notice a longer journal or a
+new snapshot with a stat() call and catch up under a shared lock.
+compact() folds the journal into a new snapshot; save() does so once the
+journal has COMPACT_AFTER records. Without fcntl (Windows) the lock is
+per process only, so only one process may write.
+
+Once the pool is large, build_ann() adds an IVF index (ann_index.py) next
+to the matrix. The shortlist then comes from the nprobe nearest inverted
+lists instead of a scan over the whole pool, and its similarities are
+re-computed exactly from the matrix. The IVF index is only written by
+build_ann() and compaction; changes since are replayed from the journal on
+top of it in memory.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from . import predictor
+from .ann_index import IVFIndex
+from .conf import get_setting
+from .normalizer import normalize_document
+from .vectors import normalize_rows
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class CVIndexError(Exception):
+    """Custom exception for CV index errors"""
+    pass
+
+
+class CVIndex:
+    """Memory-mapped embedding matrix plus per-CV scoring features"""
+
+    VECTORS_FILE = 'vectors.bin'
+    META_FILE = 'meta.json'
+    JOURNAL_FILE = 'journal-{generation}.jsonl'
+    LOCK_FILE = 'index.lock'
+    ANN_DIR = 'ann'
+    INITIAL_CAPACITY = 1024
+    COMPACT_AFTER = 10000
+
+    def __init__(self, path: str, dim: int = 384, dtype: str = 'float32'):
+        if dtype not in ('float32', 'float16'):
+            raise CVIndexError(f"Unsupported index dtype: {dtype}")
+
+        self.path = path
+        self.dim = dim
+        self.dtype = np.dtype(dtype)
+
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._meta: List[Optional[dict]] = []
+        # Whether each row holds a CV (False for tombstones); may be longer
+        # than _ids, rows past it are always False
+        self._live = np.zeros(0, dtype=bool)
+        self._vectors = None
+        self._ann: Optional[IVFIndex] = None
+
+        # What has been read from disk: the snapshot (by inode and mtime),
+        # its generation and how far into its journal
+        self._snapshot_key = None
+        self._generation = 0
+        self._journal_offset = 0
+        self._journal_records = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = None
+        self._lock_pid = None
+        with self._locked():
+            self._sync()
+
+    # =========================
+    # LOCKING
+    # =========================
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """
+        Thread lock plus, on the outermost call, an fcntl lock on index.lock
+        Nested calls reuse the lock already held, so a shared lock must not
+        be upgraded from inside (writers always take the exclusive one).
+        """
+        with self._lock:
+            outermost = self._lock_depth == 0
+            if outermost and self._lock_pid != os.getpid():
+                # flock locks belong to the open file, which a forked child
+                # would share with its parent; every process opens its own
+                self._lock_file = open(os.path.join(self.path, self.LOCK_FILE), 'a+b')
+                self._lock_pid = os.getpid()
+            if outermost and HAS_FCNTL:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if outermost and HAS_FCNTL:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # =========================
+    # PERSISTENCE
+    # =========================
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, self.VECTORS_FILE)
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, self.META_FILE)
+
+    @property
+    def _journal_path(self) -> str:
+        return os.path.join(self.path, self.JOURNAL_FILE.format(generation=self._generation))
+
+    @property
+    def _ann_path(self) -> str:
+        return os.path.join(self.path, self.ANN_DIR)
+
+    @property
+    def _row_bytes(self) -> int:
+        return self.dim * self.dtype.itemsize
+
+    def _stat_snapshot(self):
+        try:
+            stat = os.stat(self._meta_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _changed_on_disk(self) -> bool:
+        if self._stat_snapshot() != self._snapshot_key:
+            return True
+        try:
+            return os.path.getsize(self._journal_path) != self._journal_offset
+        except FileNotFoundError:
+            return self._journal_offset != 0
+
+    def _refresh(self) -> None:
+        """Catch up with changes other processes made"""
+        if self._changed_on_disk():
+            with self._locked(exclusive=False):
+                self._sync()
+
+    def _sync(self) -> None:
+        # Callers hold the file lock
+        snapshot_key = self._stat_snapshot()
+        if snapshot_key != self._snapshot_key:
+            self._load_snapshot()
+            self._snapshot_key = snapshot_key
+        # Writers grow the file before journaling rows, so mapping it as it
+        # is now covers every row the journal can mention
+        self._map_vectors(len(self._ids))
+        self._replay_journal()
+
+    def _load_snapshot(self) -> None:
+        self._ids, self._rows, self._meta = [], {}, []
+        self._live = np.zeros(0, dtype=bool)
+        self._generation = 0
+        self._journal_offset = self._journal_records = 0
+        self._ann = None
+        if not os.path.exists(self._meta_path):
+            return
+
+        with open(self._meta_path, 'r', encoding='utf-8') as meta_file:
+            stored = json.load(meta_file)
+        if stored['dim'] != self.dim or stored['dtype'] != self.dtype.name:
+            raise CVIndexError(
+                f"Index at {self.path} was built with dim={stored['dim']}, "
+                f"dtype={stored['dtype']}"
+            )
+        self._generation = stored['generation']
+        for row, entry in enumerate(stored['entries']):
+            if entry is not None:
+                entry['skills'] = set(entry['skills'])
+                self._rows[entry['id']] = row
+            self._ids.append(entry['id'] if entry else None)
+            self._meta.append(entry)
+        self._live = np.fromiter((entry is not None for entry in self._meta), dtype=bool,
+                                 count=len(self._meta))
+
+        if IVFIndex.exists(self._ann_path):
+            ann = IVFIndex.load(self._ann_path)
+            # An ANN index saved out of step with the snapshot (e.g. a crash
+            # between the two writes) is ignored; search falls back to a scan
+            if (ann.dim == self.dim and ann.ntotal == len(self._rows)
+                    and ann.label == self._generation):
+                self._ann = ann
+
+    def _replay_journal(self) -> None:
+        try:
+            journal = open(self._journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with journal:
+            journal.seek(self._journal_offset)
+            data = journal.read()
+
+        # A record is only complete once its newline is written; a torn
+        # tail (a writer crashed mid-append) is truncated by the next writer
+        complete = data[:data.rfind(b'\n') + 1]
+        records = [json.loads(line) for line in complete.splitlines()]
+        self._apply(records)
+        self._journal_records += len(records)
+        self._journal_offset += len(complete)
+
+    def _apply(self, records: List[dict]) -> None:
+        """Apply journal records to the in-memory state and the ANN index"""
+        for record in records:
+            row = record['row']
+            while len(self._ids) <= row:
+                self._ids.append(None)
+                self._meta.append(None)
+            if len(self._live) <= row:
+                live = np.zeros(max(2 * len(self._live), row + 1, self.INITIAL_CAPACITY), dtype=bool)
+                live[:len(self._live)] = self._live
+                self._live = live
+
+            old_id = self._ids[row]
+            if old_id is not None and self._rows.get(old_id) == row:
+                del self._rows[old_id]
+
+            entry = record.get('entry')
+            if entry is not None:
+                entry['skills'] = set(entry['skills'])
+                self._ids[row] = entry['id']
+                self._rows[entry['id']] = row
+            else:
+                self._ids[row] = None
+            self._meta[row] = entry
+            self._live[row] = entry is not None
+
+        if self._ann is not None and records:
+            # The ANN index on disk is as of the snapshot; journaled changes
+            # are applied on top of it in memory. Their vectors are already
+            # in the shared matrix, and re-applying a change is harmless.
+            rows = np.unique([record['row'] for record in records])
+            self._ann.remove(rows)
+            live = rows[self._live[rows]]
+            if len(live):
+                self._ann.add(np.asarray(self._vectors[live], dtype=np.float32), live)
+
+    def _append_journal(self, records: List[dict]) -> None:
+        # Callers hold the exclusive lock and have synced
+        with open(self._journal_path, 'ab') as journal:
+            if journal.tell() != self._journal_offset:
+                journal.truncate(self._journal_offset)
+                journal.seek(self._journal_offset)
+            data = b''.join(
+                json.dumps(record).encode('utf-8') + b'\n' for record in records
+            )
+            journal.write(data)
+            journal.flush()
+            os.fsync(journal.fileno())
+        self._journal_offset += len(data)
+        self._journal_records += len(records)
+
+    @staticmethod
+    def _record(row: int, entry: Optional[dict]) -> dict:
+        if entry is None:
+            return {'row': row, 'entry': None}
+        return {'row': row, 'entry': dict(entry, skills=sorted(entry['skills']))}
+
+    def _map_vectors(self, needed: int) -> None:
+        """
+        Map the matrix with room for at least needed rows
+        The file only ever grows in place (doubling), so other processes'
+        mappings of the rows they know about stay valid.
+        """
+        try:
+            size = os.path.getsize(self._vectors_path)
+        except FileNotFoundError:
+            size = 0
+        capacity = size // self._row_bytes
+
+        if capacity < needed or capacity == 0:
+            capacity = max(capacity, self.INITIAL_CAPACITY)
+            while capacity < needed:
+                capacity *= 2
+            with open(self._vectors_path, 'ab') as vectors_file:
+                vectors_file.truncate(capacity * self._row_bytes)
+
+        if self._vectors is None or self._vectors.shape[0] != capacity:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=self.dtype, mode='r+', shape=(capacity, self.dim)
+            )
+
+    def save(self) -> None:
+        """
+        Flush vectors to disk; compact the journal once it has grown
+        Every change is already journaled, so this only bounds replay time.
+        """
+        with self._locked():
+            self._sync()
+            self._vectors.flush()
+            if self._journal_records >= self.COMPACT_AFTER:
+                self._compact()
+
+    def compact(self) -> None:
+        """Fold the journal into a new metadata snapshot"""
+        with self._locked():
+            self._sync()
+            self._vectors.flush()
+            self._compact()
+
+    def _compact(self) -> None:
+        entries = [
+            dict(entry, skills=sorted(entry['skills'])) if entry else None
+            for entry in self._meta
+        ]
+        generation = self._generation + 1
+        fd, temp_path = tempfile.mkstemp(dir=self.path, suffix='.json')
+        with os.fdopen(fd, 'w', encoding='utf-8') as meta_file:
+            json.dump({
+                'dim': self.dim,
+                'dtype': self.dtype.name,
+                'generation': generation,
+                'entries': entries,
+            }, meta_file)
+            meta_file.flush()
+            os.fsync(meta_file.fileno())
+        if self._ann is not None:
+            # Rewritten only here: between compactions the journal is its delta
+            self._ann.label = generation
+            self._ann.save(self._ann_path)
+        os.replace(temp_path, self._meta_path)
+
+        self._generation = generation
+        self._snapshot_key = self._stat_snapshot()
+        self._journal_offset = self._journal_records = 0
+        # Journals of older generations are folded into the snapshot
+        for path in glob.glob(os.path.join(self.path, self.JOURNAL_FILE.format(generation='*'))):
+            if path != self._journal_path:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    # =========================
+    # ADD / REMOVE
+    # =========================
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._rows)
+
+    def __contains__(self, cv_id: str) -> bool:
+        self._refresh()
+        return cv_id in self._rows
+
+    @staticmethod
+    def text_hash(cleaned_text: str) -> str:
+        return hashlib.sha256(cleaned_text.encode('utf-8')).hexdigest()
+
+    def add(self, cv_text: str, cv_id: Optional[str] = None, save: bool = True) -> str:
+        """Add (or replace) one CV; returns its id"""
+        return self.add_many([cv_text], [cv_id] if cv_id else None, save=save)[0]
+
+    def add_many(self, cv_texts: List[str], cv_ids: Optional[List[str]] = None,
+                 batch_size: int = 64, save: bool = True) -> List[str]:
+        """
+        Add CVs in bulk: texts are normalized and cleaned like
+        bulk.ingest_document does, features extracted and embeddings computed
+        in encoder batches. Ids default to the cleaned-text hash.
+        """
+        if cv_ids is not None and len(cv_ids) != len(cv_texts):
+            raise CVIndexError("cv_ids must match cv_texts in length")
+
+        cleaned = [predictor.clean_text(normalize_document(t)) for t in cv_texts]
+        vectors = normalize_rows(predictor.encode_batched(cleaned, batch_size))
+
+        entries = [predictor.extract_features(text, semantic=False) for text in cleaned]
+        predictor.add_semantic_skills(cleaned, entries)
+        for i, (text, features) in enumerate(zip(cleaned, entries)):
+            text_hash = self.text_hash(text)
+            features['id'] = cv_ids[i] if cv_ids else text_hash
+            features['text_hash'] = text_hash
+
+        return self.add_features(entries, vectors, save=save)
+
+    def add_features(self, entries: List[dict], vectors: np.ndarray, save: bool = True) -> List[str]:
+        """
+        Add precomputed entries (as produced by predictor.extract_features plus
+        'id' and 'text_hash') with their L2-normalised embeddings
+        """
+        with self._locked():
+            self._sync()
+            rows, records, added = [], [], {}
+            for entry in entries:
+                cv_id = entry['id']
+                row = self._rows.get(cv_id, added.get(cv_id))
+                if row is None:
+                    row = added[cv_id] = len(self._ids) + len(added)
+                rows.append(row)
+                records.append(self._record(row, entry))
+
+            if rows:
+                self._map_vectors(max(rows) + 1)
+                self._vectors[rows] = vectors
+                self._vectors.flush()
+                # Readers only see the rows once the journal names them
+                self._append_journal(records)
+                self._apply(records)
+
+            if save:
+                self.save()
+
+        return [entry['id'] for entry in entries]
+
+    def remove(self, cv_id: str, save: bool = True) -> bool:
+        """Remove a CV; its row is zeroed and left as a tombstone"""
+        with self._locked():
+            self._sync()
+            row = self._rows.get(cv_id)
+            if row is None:
+                return False
+            self._vectors[row] = 0
+            record = self._record(row, None)
+            self._append_journal([record])
+            self._apply([record])
+            if save:
+                self.save()
+            return True
+
+    # =========================
+    # ANN
+    # =========================
+
+    @property
+    def ann(self) -> Optional[IVFIndex]:
+        return self._ann
+
+    def build_ann(self, nlist: Optional[int] = None, nprobe: int = 16, pq_m: int = 0,
+                  iterations: int = 20, chunk_size: int = 100000) -> IVFIndex:
+        """
+        (Re)build the IVF index over every live CV and save it
+        nlist defaults to ~4 * sqrt(pool size). With pq_m > 0 the lists hold
+        PQ codes; the shortlist is re-scored exactly either way.
+        """
+        with self._locked():
+            self._sync()
+            live = np.flatnonzero(self._live[:len(self._ids)])
+            if not len(live):
+                raise CVIndexError("Cannot build an ANN index over an empty pool")
+            nlist = nlist or max(1, min(len(live), int(4 * np.sqrt(len(live)))))
+
+            ann = IVFIndex(self.dim, nlist, nprobe, pq_m, self.dtype.name)
+            rng = np.random.default_rng(0)
+            sample = np.sort(rng.choice(live, min(len(live), 64 * nlist), replace=False))
+            ann.train(np.asarray(self._vectors[sample], dtype=np.float32), iterations=iterations)
+            for start in range(0, len(live), chunk_size):
+                rows = live[start:start + chunk_size]
+                ann.add(np.asarray(self._vectors[rows], dtype=np.float32), rows)
+
+            self._ann = ann
+            # A new snapshot makes the other processes reload, index included
+            self._compact()
+            return ann
+
+    def drop_ann(self) -> None:
+        """Remove the IVF index; searches go back to a full scan"""
+        with self._locked():
+            self._sync()
+            self._ann = None
+            IVFIndex.delete(self._ann_path)
+            self._compact()
+
+    # =========================
+    # SEARCH
+    # =========================
+
+    def search(self, jd_text: str, top_k: int = 10, shortlist: Optional[int] = None,
+               nprobe: Optional[int] = None) -> List[dict]:
+        """
+        Return the top_k CVs for a JD, scored like predict_match
+        The shortlist (default 5 * top_k, at least 50) is chosen by semantic
+        similarity; only those CVs go through full feature scoring. With an
+        ANN index the shortlist is approximate: nprobe (default: the
+        CV_INDEX_NPROBE setting) trades recall for latency.
+        """
+        jd = predictor.clean_text(normalize_document(jd_text))
+        jd_features = predictor.extract_features(jd)
+        jd_exp = jd_features['experience_text']
+        jd_vectors = predictor.encode_texts([jd] + ([jd_exp] if jd_exp else []))
+        jd_vec = normalize_rows(jd_vectors[0])[0]
+        jd_exp_vec = jd_vectors[1] if jd_exp else None
+
+        self._refresh()
+        with self._lock:
+            used = len(self._ids)
+            if not self._rows:
+                return []
+
+            size = min(shortlist or max(5 * top_k, 50), len(self._rows))
+            if self._ann is not None:
+                nprobe = nprobe or get_setting('CV_INDEX_NPROBE', None)
+                candidates = self._ann.search(jd_vec, size, nprobe=nprobe)[1][0]
+                candidates = np.sort(candidates[candidates >= 0])
+                if not len(candidates):
+                    return []
+                # Exact similarities for the shortlist (PQ scores are approximate)
+                sims = np.asarray(self._vectors[candidates], dtype=np.float32) @ jd_vec
+            else:
+                sims = self._vectors[:used] @ jd_vec.astype(self.dtype)
+                sims = sims.astype(np.float32)
+                # Tombstones are zero vectors; push them below any live row
+                live = self._live[:used]
+                sims[~live] = -np.inf
+
+                if size < used:
+                    candidates = np.argpartition(-sims, size - 1)[:size]
+                else:
+                    candidates = np.flatnonzero(live)
+                sims = sims[candidates]
+
+            meta = [self._meta[row] for row in candidates]
+
+        semantic = sims * 100
+        exp_semantic = predictor.experience_semantic_batch(meta, jd_features, jd_exp_vec)
+        X = np.array([
+            predictor.feature_row(meta[i], jd_features, semantic[i], exp_semantic[i])
+            for i in range(len(meta))
+        ], dtype=float)
+
+        overall = predictor.score_feature_matrix(X)
+        results = predictor.format_ranked(X, overall, top_k)
+        for result in results:
+            entry = meta[result.pop('index')]
+            result['cv_id'] = entry['id']
+            result['text_hash'] = entry['text_hash']
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_cv_index() -> CVIndex:
+    """Process-wide CV index configured from settings"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CVIndex(
+                    get_setting('CV_INDEX_DIR', os.path.join(predictor.BASE_DIR, 'cv_index')),
+                    dtype=get_setting('CV_INDEX_DTYPE', 'float32'),
+                )
+    return _index
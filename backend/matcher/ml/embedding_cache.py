@@ -0,0 +1,51 @@
+"""
+Content-addressed cache for sentence embeddings
+Keys are a hash of (model name, cleaned text); entries are evicted LRU once
+either the entry or byte budget is exceeded. An optional directory acts as a
+write-through disk tier, bounded by max_disk_bytes, so a restarted worker
+starts warm (see lru_cache.py).
+"""
+
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+from .lru_cache import LRUCache, atomic_write
+
+
+class EmbeddingCache(LRUCache):
+    """Thread-safe LRU cache of embedding vectors"""
+
+    DISK_SUFFIX = '.npy'
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, max_disk_bytes: int = 1024 * 1024 * 1024):
+        super().__init__(max_entries, max_bytes, disk_dir, max_disk_bytes)
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        """Content address for a text encoded by a given model"""
+        digest = hashlib.sha256()
+        digest.update(model_name.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(text.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _prepare(self, vector: np.ndarray) -> np.ndarray:
+        # A private copy: the caller's array (often a row of a batch) may be
+        # a view that is later written to, or keep the whole batch alive
+        vector = np.array(vector, dtype=np.float32, copy=True)
+        vector.setflags(write=False)
+        return vector
+
+    def _size(self, vector: np.ndarray) -> int:
+        return vector.nbytes
+
+    def _read(self, path: str) -> np.ndarray:
+        vector = np.load(path, allow_pickle=False)
+        vector.setflags(write=False)
+        return vector
+
+    def _write(self, path: str, vector: np.ndarray) -> int:
+        return atomic_write(path, lambda out: np.save(out, vector, allow_pickle=False))
@@ -0,0 +1,219 @@
+"""
+Sandboxed process pool for document extraction
+
+Each parse runs in a separate worker process with an address-space cap
+(RLIMIT_AS) and a wall-clock timeout. A worker that times out or dies is
+killed and replaced without affecting other jobs, and every worker is
+recycled after a fixed number of jobs to bound memory growth from parser
+leaks.
+"""
+
+import multiprocessing
+import queue
+import threading
+from typing import Optional
+
+from .conf import get_setting
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+
+class ExtractionTimeout(Exception):
+    pass
+
+
+class ExtractionMemoryError(Exception):
+    pass
+
+
+class ExtractionWorkerError(Exception):
+    """Raised in the parent with the message of an error raised in a worker"""
+    pass
+
+
+def _worker_main(conn, memory_limit_bytes: Optional[int]) -> None:
+    """Worker loop: receive (method_name, args), reply ('ok', text) or an error"""
+    if memory_limit_bytes and HAS_RESOURCE:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit_bytes, memory_limit_bytes))
+
+    from .file_extractor import FileExtractor
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        method_name, args = job
+        try:
+            text = getattr(FileExtractor, method_name)(*args)
+            conn.send(('ok', text))
+        except MemoryError:
+            conn.send(('oom', 'Document exceeded the extraction memory limit'))
+        except Exception as e:
+            # Extractors wrap MemoryError in FileExtractionError; report it as OOM
+            kind = 'oom' if isinstance(e.__context__, MemoryError) else 'error'
+            conn.send((kind, str(e)))
+
+
+class _Worker:
+    __slots__ = ('process', 'conn', 'jobs')
+
+    def __init__(self, context, memory_limit_bytes):
+        parent_conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit_bytes), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.conn = parent_conn
+        self.jobs = 0
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        self.kill()
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=1)
+        self.conn.close()
+
+
+class ExtractionPool:
+    """Fixed-size pool of sandboxed extraction workers"""
+
+    def __init__(self, size: int = 2, timeout: float = 30.0,
+                 memory_limit_mb: Optional[int] = 512, max_jobs_per_worker: int = 50):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.max_jobs_per_worker = max_jobs_per_worker
+
+        # spawn: never fork a process that may hold torch/threads state
+        self._context = multiprocessing.get_context('spawn')
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._spawned = 0
+
+        self.jobs = 0
+        self.timeouts = 0
+        self.ooms = 0
+        self.recycled = 0
+
+    def _acquire(self) -> _Worker:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._spawned < self.size:
+                self._spawned += 1
+                spawn = True
+            else:
+                spawn = False
+        if spawn:
+            try:
+                return _Worker(self._context, self.memory_limit_bytes)
+            except Exception:
+                with self._lock:
+                    self._spawned -= 1
+                raise
+        return self._idle.get()
+
+    def _discard(self, worker: _Worker, kill: bool) -> None:
+        if kill:
+            worker.kill()
+        else:
+            worker.stop()
+        with self._lock:
+            self._spawned -= 1
+
+    def run(self, method_name: str, *args) -> str:
+        """Run FileExtractor.<method_name>(*args) in a worker and return its text"""
+        worker = self._acquire()
+        try:
+            worker.conn.send((method_name, args))
+            if not worker.conn.poll(self.timeout):
+                self.timeouts += 1
+                self._discard(worker, kill=True)
+                worker = None
+                raise ExtractionTimeout(
+                    f"Document extraction timed out after {self.timeout:.0f} seconds"
+                )
+            kind, payload = worker.conn.recv()
+        except (EOFError, OSError):
+            # The worker died mid-job, most likely killed for exceeding memory
+            if worker is not None:
+                self.ooms += 1
+                self._discard(worker, kill=True)
+                worker = None
+            raise ExtractionMemoryError("Extraction worker terminated while parsing the document")
+        finally:
+            if worker is not None:
+                self.jobs += 1
+                worker.jobs += 1
+                if worker.jobs >= self.max_jobs_per_worker:
+                    self.recycled += 1
+                    self._discard(worker, kill=False)
+                else:
+                    self._idle.put(worker)
+
+        if kind == 'oom':
+            self.ooms += 1
+            raise ExtractionMemoryError(payload)
+        if kind == 'error':
+            raise ExtractionWorkerError(payload)
+        return payload
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(worker, kill=False)
+
+    def stats(self) -> dict:
+        return {
+            'size': self.size,
+            'workers': self._spawned,
+            'jobs': self.jobs,
+            'timeouts': self.timeouts,
+            'ooms': self.ooms,
+            'recycled': self.recycled,
+            'timeout_seconds': self.timeout,
+            'memory_limit_bytes': self.memory_limit_bytes,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_extraction_pool() -> Optional[ExtractionPool]:
+    """Process-wide pool configured from settings; None when EXTRACTION_POOL_SIZE is 0"""
+    global _pool
+    size = get_setting('EXTRACTION_POOL_SIZE', 2)
+    if not size:
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ExtractionPool(
+                    size=size,
+                    timeout=get_setting('EXTRACTION_TIMEOUT_SECONDS', 30.0),
+                    memory_limit_mb=get_setting('EXTRACTION_MEMORY_LIMIT_MB', 512),
+                    max_jobs_per_worker=get_setting('EXTRACTION_MAX_JOBS_PER_WORKER', 50),
+                )
+    return _pool
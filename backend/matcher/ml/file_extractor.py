@@ -3,10 +3,19 @@ File extraction utilities for handling different file types
 Supports: PDF, DOCX, TXT, DOC
 """
 
+import io
 import os
 import re
 import tempfile
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from .conf import get_setting
+from .extraction_pool import (
+    ExtractionMemoryError, ExtractionTimeout, ExtractionWorkerError, get_extraction_pool
+)
+from .metrics import stage
+from .text_cache import ExtractedTextCache
 
 try:
     import PyPDF2
@@ -33,11 +42,36 @@ except ImportError:
     HAS_PPTX = False
 
 
+text_cache = ExtractedTextCache(
+    max_entries=get_setting('TEXT_CACHE_MAX_ENTRIES', 1000),
+    max_bytes=get_setting('TEXT_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+    disk_dir=get_setting('TEXT_CACHE_DIR', None),
+    max_disk_bytes=get_setting('TEXT_CACHE_DISK_MAX_BYTES', 1024 * 1024 * 1024),
+)
+
+
 class FileExtractionError(Exception):
     """Custom exception for file extraction errors"""
     pass
 
 
+# Extractors accept a file path, raw bytes or a readable binary file object
+Source = Union[str, bytes, BinaryIO]
+
+
+@contextmanager
+def open_source(source: Source):
+    """Yield a binary stream for a source without copying in-memory data"""
+    if isinstance(source, str):
+        with open(source, 'rb') as file:
+            yield file
+    elif isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    else:
+        source.seek(0)
+        yield source
+
+
 class FileExtractor:
     """Extract text from various file formats"""
 
@@ -51,81 +85,145 @@ class FileExtractor:
 
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
 
+    # Extension -> extractor method; these run in the sandboxed extraction
+    # pool when one is configured
+    EXTRACTORS = {
+        '.pdf': 'extract_pdf',
+        '.docx': 'extract_docx',
+        '.doc': 'extract_doc',
+        '.txt': 'extract_txt',
+        '.pptx': 'extract_pptx',
+    }
+
+    # Bump whenever extraction output changes so cached text is not reused
+    EXTRACTOR_VERSION = 2
+
+    # Extraction budgets; the serializers cap text at 50,000 characters, so
+    # parsing beyond that is wasted work
+    MAX_TEXT_CHARS = 50000
+    MAX_PAGES = 100
+
     @staticmethod
-    def extract_pdf(file_path: str) -> str:
-        """Extract text from PDF file"""
+    def assemble(chunks: Iterator[str], max_chars: Optional[int] = None) -> str:
+        """
+        Join chunks in linear time, stopping once max_chars have been collected
+        Closing the generator early releases the parser without reading the rest
+        """
+        parts = []
+        total = 0
+        try:
+            for chunk in chunks:
+                parts.append(chunk)
+                total += len(chunk)
+                if max_chars and total >= max_chars:
+                    break
+        finally:
+            chunks.close()
+        return "".join(parts)[:max_chars].strip() if max_chars else "".join(parts).strip()
+
+    @staticmethod
+    def iter_pdf(source: Source, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Yield PDF text page by page"""
         if not HAS_PYPDF:
             raise FileExtractionError(
                 "PyPDF2 not installed. Install with: pip install PyPDF2"
             )
 
-        try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text += page.extract_text()
-            return text.strip()
-        except Exception as e:
-            raise FileExtractionError(f"Error extracting PDF: {str(e)}")
+        with open_source(source) as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            page_count = len(pdf_reader.pages)
+            if max_pages:
+                page_count = min(page_count, max_pages)
+            for page_num in range(page_count):
+                yield pdf_reader.pages[page_num].extract_text()
 
     @staticmethod
-    def extract_docx(file_path: str) -> str:
-        """Extract text from DOCX file"""
+    def iter_docx(source: Source) -> Iterator[str]:
+        """Yield DOCX text paragraph by paragraph, then table row by table row"""
         if not HAS_DOCX:
             raise FileExtractionError(
                 "python-docx not installed. Install with: pip install python-docx"
             )
 
+        with open_source(source) as file:
+            doc = Document(file)
+
+        for para in doc.paragraphs:
+            yield para.text + "\n"
+
+        # Extract from tables
+        for table in doc.tables:
+            for row in table.rows:
+                yield "".join(cell.text + " " for cell in row.cells) + "\n"
+
+    @staticmethod
+    def iter_pptx(source: Source, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Yield PPTX text shape by shape; max_pages limits the number of slides"""
+        if not HAS_PPTX:
+            raise FileExtractionError(
+                "python-pptx not installed. Install with: pip install python-pptx"
+            )
+
+        with open_source(source) as file:
+            prs = Presentation(file)
+
+        for slide_num, slide in enumerate(prs.slides):
+            if max_pages and slide_num >= max_pages:
+                break
+            for shape in slide.shapes:
+                if hasattr(shape, "text"):
+                    yield shape.text + "\n"
+
+    @staticmethod
+    def extract_pdf(source: Source, max_chars: Optional[int] = MAX_TEXT_CHARS,
+                    max_pages: Optional[int] = MAX_PAGES) -> str:
+        """Extract text from PDF file"""
+        try:
+            return FileExtractor.assemble(FileExtractor.iter_pdf(source, max_pages), max_chars)
+        except FileExtractionError:
+            raise
+        except Exception as e:
+            raise FileExtractionError(f"Error extracting PDF: {str(e)}")
+
+    @staticmethod
+    def extract_docx(source: Source, max_chars: Optional[int] = MAX_TEXT_CHARS,
+                     max_pages: Optional[int] = None) -> str:
+        """Extract text from DOCX file (DOCX has no pages; only max_chars applies)"""
         try:
-            doc = Document(file_path)
-            text = ""
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            
-            # Extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    for cell in row.cells:
-                        text += cell.text + " "
-                    text += "\n"
-            
-            return text.strip()
+            return FileExtractor.assemble(FileExtractor.iter_docx(source), max_chars)
+        except FileExtractionError:
+            raise
         except Exception as e:
             raise FileExtractionError(f"Error extracting DOCX: {str(e)}")
 
     @staticmethod
-    def extract_doc(file_path: str) -> str:
+    def extract_doc(source: Source, max_chars: Optional[int] = MAX_TEXT_CHARS,
+                    max_pages: Optional[int] = None) -> str:
         """Extract text from DOC file using python-docx (modern .doc files)"""
         # Modern .doc files are often handled by python-docx
-        return FileExtractor.extract_docx(file_path)
+        return FileExtractor.extract_docx(source, max_chars, max_pages)
 
     @staticmethod
-    def extract_txt(file_path: str) -> str:
+    def extract_txt(source: Source, max_chars: Optional[int] = MAX_TEXT_CHARS,
+                    max_pages: Optional[int] = None) -> str:
         """Extract text from TXT file"""
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-                return file.read().strip()
+            with open_source(source) as file:
+                # UTF-8 needs at most 4 bytes per character
+                data = file.read(max_chars * 4) if max_chars else file.read()
+            text = data.decode('utf-8', errors='ignore')
+            return (text[:max_chars] if max_chars else text).strip()
         except Exception as e:
             raise FileExtractionError(f"Error extracting TXT: {str(e)}")
 
     @staticmethod
-    def extract_pptx(file_path: str) -> str:
+    def extract_pptx(source: Source, max_chars: Optional[int] = MAX_TEXT_CHARS,
+                     max_pages: Optional[int] = MAX_PAGES) -> str:
         """Extract text from PPTX file"""
-        if not HAS_PPTX:
-            raise FileExtractionError(
-                "python-pptx not installed. Install with: pip install python-pptx"
-            )
-
         try:
-            prs = Presentation(file_path)
-            text = ""
-            for slide in prs.slides:
-                for shape in slide.shapes:
-                    if hasattr(shape, "text"):
-                        text += shape.text + "\n"
-            return text.strip()
+            return FileExtractor.assemble(FileExtractor.iter_pptx(source, max_pages), max_chars)
+        except FileExtractionError:
+            raise
         except Exception as e:
             raise FileExtractionError(f"Error extracting PPTX: {str(e)}")
 
@@ -153,54 +251,94 @@ class FileExtractor:
 
         return True, ""
 
+    @staticmethod
+    def _uses_pool(method_name: str) -> bool:
+        return method_name != 'extract_txt' and get_extraction_pool() is not None
+
+    @classmethod
+    def _run_extractor(cls, method_name: str, *args) -> str:
+        """Run an extractor in the sandboxed pool, or inline when it is disabled"""
+        if not cls._uses_pool(method_name):
+            return getattr(cls, method_name)(*args)
+
+        pool = get_extraction_pool()
+
+        try:
+            return pool.run(method_name, *args)
+        except ExtractionTimeout as e:
+            raise FileExtractionError(f"{e}. The document may be too complex to parse.")
+        except ExtractionMemoryError as e:
+            raise FileExtractionError(f"{e}. The document may be too large to parse.")
+        except ExtractionWorkerError as e:
+            raise FileExtractionError(str(e))
+
     @classmethod
     def extract_text(cls, file) -> str:
         """
         Main method to extract text from file
         Automatically detects file type
         """
+        with stage('extraction'):
+            return cls._extract_text(file)
+
+    @classmethod
+    def _extract_text(cls, file) -> str:
         # Validate file
         is_valid, error_msg = cls.validate_file(file)
         if not is_valid:
             raise FileExtractionError(error_msg)
 
-        # Save file to system temporary directory (cross-platform)
-        temp_dir = tempfile.gettempdir()
-        temp_path = os.path.join(temp_dir, file.name)
-        try:
-            # Save uploaded file
-            with open(temp_path, 'wb') as temp_file:
-                for chunk in file.chunks():
-                    temp_file.write(chunk)
-
-            # Extract based on file type
-            file_ext = os.path.splitext(file.name.lower())[1]
-
-            if file_ext == '.pdf':
-                text = cls.extract_pdf(temp_path)
-            elif file_ext == '.docx':
-                text = cls.extract_docx(temp_path)
-            elif file_ext == '.doc':
-                text = cls.extract_doc(temp_path)
-            elif file_ext == '.txt':
-                text = cls.extract_txt(temp_path)
-            elif file_ext == '.pptx':
-                text = cls.extract_pptx(temp_path)
-            else:
-                raise FileExtractionError(f"Unknown file format: {file_ext}")
-
-            if not text or len(text.strip()) < 10:
-                raise FileExtractionError(
-                    "Extracted text is too short or empty. "
-                    "Please provide a document with meaningful content."
-                )
+        # Extract based on file type
+        file_ext = os.path.splitext(file.name.lower())[1]
+        method_name = cls.EXTRACTORS.get(file_ext)
+        if method_name is None:
+            raise FileExtractionError(f"Unknown file format: {file_ext}")
 
+        max_chars = get_setting('EXTRACTION_MAX_CHARS', cls.MAX_TEXT_CHARS)
+        max_pages = get_setting('EXTRACTION_MAX_PAGES', cls.MAX_PAGES)
+
+        # Identical uploads skip parsing entirely
+        cache_key = ExtractedTextCache.make_key(
+            ExtractedTextCache.hash_upload(file),
+            cls.EXTRACTOR_VERSION, file_ext, max_chars, max_pages
+        )
+        text = text_cache.get(cache_key)
+        if text is not None:
             return text
 
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                try:
-                    os.remove(temp_path)
-                except:
-                    pass
+        with cls._upload_source(file, for_pool=cls._uses_pool(method_name)) as source:
+            text = cls._run_extractor(method_name, source, max_chars, max_pages)
+
+        if not text or len(text.strip()) < 10:
+            raise FileExtractionError(
+                "Extracted text is too short or empty. "
+                "Please provide a document with meaningful content."
+            )
+
+        text_cache.put(cache_key, text)
+        return text
+
+    @staticmethod
+    @contextmanager
+    def _upload_source(file, for_pool: bool = False):
+        """
+        Source to parse an upload from, without writing it to disk
+        - TemporaryUploadedFile: the path Django already wrote it to
+        - InMemoryUploadedFile: its in-memory buffer (raw bytes when the
+          parse runs in another process)
+        - anything else: an anonymous spooled temp file
+        """
+        if hasattr(file, 'temporary_file_path'):
+            yield file.temporary_file_path()
+            return
+
+        buffer = getattr(file, 'file', None)
+        if isinstance(buffer, io.BytesIO):
+            yield buffer.getvalue() if for_pool else buffer
+            return
+
+        with tempfile.SpooledTemporaryFile(max_size=FileExtractor.MAX_FILE_SIZE) as spooled:
+            for chunk in file.chunks():
+                spooled.write(chunk)
+            spooled.seek(0)
+            yield spooled.read() if for_pool else spooled
@@ -0,0 +1,130 @@
+"""
+Dependency-free scorer for the overall-match linear regression
+
+The regression pickle is a scikit-learn LinearRegression over four features
+(skill, experience, education, semantic). Unpickling it needs scikit-learn
+and joblib, and its predict() validates and copies its input on every call,
+all for one dot product. load_linear_scorer() reads the pickle once,
+keeps only the coefficients and intercept, and caches them as a small JSON
+artifact tagged with the pickle's SHA-256. Later loads read the JSON and
+never import scikit-learn, and a replaced pickle invalidates the cache.
+"""
+
+import json
+import os
+import tempfile
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Bump when the JSON layout changes
+ARTIFACT_FORMAT = 1
+
+
+class LinearScorerError(Exception):
+    """Custom exception for linear scorer loading errors"""
+    pass
+
+
+class LinearScorer:
+    """y = X @ coef + intercept, for one row or a whole feature matrix"""
+
+    def __init__(self, coef: Sequence[float], intercept: float, source_sha256: str = ''):
+        self.coef = np.asarray(coef, dtype=np.float64).reshape(-1)
+        self.intercept = float(intercept)
+        self.source_sha256 = source_sha256
+        # Plain floats make the single-row path a few multiplications
+        self._coef_list = [float(c) for c in self.coef]
+
+    @property
+    def n_features(self) -> int:
+        return len(self._coef_list)
+
+    def score_row(self, row: Sequence[float]) -> float:
+        """Score one feature row without allocating an array"""
+        if len(row) != len(self._coef_list):
+            raise ValueError(f"Expected {len(self._coef_list)} features, got {len(row)}")
+        return self.intercept + sum(c * x for c, x in zip(self._coef_list, row))
+
+    def predict(self, X) -> np.ndarray:
+        """Score an N x n_features matrix (same contract as sklearn's predict)"""
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim != 2 or X.shape[1] != len(self._coef_list):
+            raise ValueError(f"Expected an N x {len(self._coef_list)} matrix, got shape {X.shape}")
+        return X @ self.coef + self.intercept
+
+    # =========================
+    # ARTIFACT
+    # =========================
+
+    @classmethod
+    def from_model(cls, model, source_sha256: str = '') -> 'LinearScorer':
+        """Extract the parameters of a fitted scikit-learn linear model"""
+        coef = getattr(model, 'coef_', None)
+        intercept = getattr(model, 'intercept_', None)
+        if coef is None or intercept is None:
+            raise LinearScorerError(
+                f"{type(model).__name__} is not a linear model (no coef_/intercept_)"
+            )
+        coef = np.asarray(coef, dtype=np.float64)
+        if coef.ndim != 1 and coef.shape[0] != 1:
+            raise LinearScorerError("Only single-output linear models are supported")
+        return cls(coef.reshape(-1), float(np.asarray(intercept).reshape(-1)[0]), source_sha256)
+
+    def to_dict(self) -> dict:
+        return {
+            'format': ARTIFACT_FORMAT,
+            'source_sha256': self.source_sha256,
+            'coef': self._coef_list,
+            'intercept': self.intercept,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LinearScorer':
+        if data.get('format') != ARTIFACT_FORMAT:
+            raise LinearScorerError(f"Unsupported scorer artifact format: {data.get('format')}")
+        return cls(data['coef'], data['intercept'], data.get('source_sha256', ''))
+
+    def save(self, path: str) -> None:
+        """Write the artifact atomically"""
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as artifact:
+            json.dump(self.to_dict(), artifact, indent=2)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LinearScorer':
+        with open(path, 'r', encoding='utf-8') as artifact:
+            return cls.from_dict(json.load(artifact))
+
+
+def load_linear_scorer(model_path: str, source_sha256: str,
+                       cache_path: Optional[str] = None) -> LinearScorer:
+    """
+    Scorer for the pickle at model_path
+    Served from the JSON artifact at cache_path when its recorded digest
+    matches source_sha256; otherwise the pickle is loaded once (this is the
+    only place joblib/scikit-learn are imported) and the artifact rewritten.
+    """
+    if cache_path and os.path.exists(cache_path):
+        try:
+            scorer = LinearScorer.load(cache_path)
+            if scorer.source_sha256 == source_sha256:
+                return scorer
+        except (OSError, ValueError, KeyError, LinearScorerError):
+            # Stale or unreadable artifact; rebuild it from the pickle
+            pass
+
+    import joblib
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model file not found at {model_path}")
+    scorer = LinearScorer.from_model(joblib.load(model_path), source_sha256)
+
+    if cache_path:
+        try:
+            scorer.save(cache_path)
+        except OSError:
+            # The artifact is an optimisation; a read-only deploy still works
+            pass
+    return scorer
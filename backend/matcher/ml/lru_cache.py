@@ -0,0 +1,255 @@
+"""
+Thread-safe LRU cache with an optional write-through disk tier
+
+Shared by the embedding, extracted-text and local result caches. Entries
+are evicted least recently used once either the entry or the byte budget is
+exceeded. The disk tier keeps one file per key, sharded by key prefix and
+written through a temp file and a rename, so a restarted worker starts warm
+and readers never see partial data. It has its own byte budget: once this
+process estimates it is exceeded, a background scan deletes the least
+recently used files (by mtime, which a disk hit refreshes) down to
+DISK_PRUNE_TO of the budget. Workers sharing the directory each prune by
+the same rule.
+
+Subclasses say how big a value is and how one is read from and written to
+a file.
+"""
+
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+# Fraction of max_disk_bytes a prune brings the disk tier down to
+DISK_PRUNE_TO = 0.9
+
+
+def atomic_write(path: str, write: Callable, mode: str = 'wb', **open_kwargs) -> int:
+    """
+    Write path through a temp file in the same directory and rename it into
+    place; write(file) produces the content. Returns the size written.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as temp_file:
+            write(temp_file)
+        size = os.path.getsize(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    return size
+
+
+class LRUCache:
+    """LRU cache bounded by entry count and byte size, plus an optional disk tier"""
+
+    # Extension of the disk tier's files
+    DISK_SUFFIX = '.bin'
+
+    def __init__(self, max_entries: int, max_bytes: Optional[int] = None,
+                 disk_dir: Optional[str] = None, max_disk_bytes: int = 0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes  # None: bounded by count only
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes  # 0: unbounded
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Estimated disk tier size: None until the first scan
+        self._disk_bytes = None
+        self._pruning = False
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # Value hooks for subclasses
+
+    def _prepare(self, value: Any) -> Any:
+        """The value as stored, e.g. a private copy of what the caller passed"""
+        return value
+
+    def _export(self, value: Any) -> Any:
+        """The value as returned to callers"""
+        return value
+
+    def _size(self, value: Any) -> int:
+        return 0
+
+    def _read(self, path: str) -> Any:
+        """Load one value from the disk tier; OSError or ValueError count as a miss"""
+        raise NotImplementedError
+
+    def _write(self, path: str, value: Any) -> int:
+        """Write one value to the disk tier (see atomic_write); returns its size"""
+        raise NotImplementedError
+
+    # Public API
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._export(entry[0])
+
+        value = self._load_from_disk(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._insert(key, value)
+        return self._export(value)
+
+    def put(self, key: str, value: Any) -> None:
+        value = self._prepare(value)
+        with self._lock:
+            self._insert(key, value)
+        self._save_to_disk(key, value)
+
+    def clear(self) -> None:
+        """Drop the in-memory tier (the disk tier is left untouched)"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'disk_enabled': bool(self.disk_dir),
+                'disk_bytes': self._disk_bytes,
+                'max_disk_bytes': self.max_disk_bytes,
+                'disk_evictions': self.disk_evictions,
+            }
+
+    # Internal helpers (callers hold self._lock)
+
+    def _insert(self, key: str, value: Any) -> None:
+        size = self._size(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous[1]
+
+        self._entries[key] = (value, size)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or (
+            self.max_bytes is not None and self._bytes > self.max_bytes
+        ):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    # Disk tier
+
+    def _disk_path(self, key: str) -> str:
+        # Shard by prefix so a large cache does not end up in one directory
+        return os.path.join(self.disk_dir, key[:2], f"{key}{self.DISK_SUFFIX}")
+
+    def _load_from_disk(self, key: str) -> Optional[Any]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            value = self._read(path)
+        except (OSError, ValueError):
+            return None
+        try:
+            # Recency for pruning
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def _save_to_disk(self, key: str, value: Any) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            return
+        try:
+            written = self._write(path, value)
+        except OSError:
+            # The disk tier is best-effort; the in-memory entry is still valid
+            return
+        self._account_disk(written)
+
+    def _account_disk(self, written: int) -> None:
+        if not self.max_disk_bytes:
+            return
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += written
+            if self._pruning or (self._disk_bytes is not None and self._disk_bytes <= self.max_disk_bytes):
+                return
+            self._pruning = True
+        threading.Thread(target=self._prune_disk, name='cache-prune', daemon=True).start()
+
+    def _prune_disk(self) -> None:
+        """Delete the least recently used files until the tier fits DISK_PRUNE_TO of the budget"""
+        try:
+            files = []
+            total = 0
+            for shard in os.scandir(self.disk_dir):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    if not entry.name.endswith(self.DISK_SUFFIX):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            removed = 0
+            if total > self.max_disk_bytes:
+                target = self.max_disk_bytes * DISK_PRUNE_TO
+                files.sort()
+                for _, size, path in files:
+                    if total <= target:
+                        break
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        continue
+                    total -= size
+                    removed += 1
+        except OSError:
+            return
+        finally:
+            with self._lock:
+                self._pruning = False
+        with self._lock:
+            self._disk_bytes = total
+            self.disk_evictions += removed
@@ -0,0 +1,182 @@
+"""
+Lazy, thread-safe loading of the regression and sentence-embedding models
+
+Nothing heavy (torch, sentence-transformers) is imported until a model is
+first needed, so management commands and migrations start fast. The
+regression is served by a LinearScorer, so scikit-learn is only imported
+when its cached coefficients have to be rebuilt from the pickle.
+warmup() loads everything and runs a dummy encode; status() reports load
+state and timings for the health/readiness endpoints.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from .conf import get_setting
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODEL_PATH = os.path.join(BASE_DIR, "overall_match_regression_model.pkl")
+# Coefficients extracted from MODEL_PATH (see linear_scorer.py)
+SCORER_PATH = os.path.join(BASE_DIR, "overall_match_regression_model.scorer.json")
+BERT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# Encoder backends selectable with the ENCODER_BACKEND setting
+ENCODER_BACKENDS = ('torch', 'onnx', 'onnx-int8')
+
+
+class ModelLoader:
+    """Process-wide holder for the ML models"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reg_model = None
+        self._bert_model = None
+        self._warm = False
+        # Last failure of each load step, cleared when the step next succeeds
+        self._errors: Dict[str, str] = {}
+        self._timings = {}
+        self._regression_digest = None
+        self._warmup_hooks = []
+        # Not self._lock, which is held while a model loads
+        self._warmup_lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+        self._warmup_thread_lock = threading.Lock()
+
+    def _timed(self, name: str, loader):
+        start = time.perf_counter()
+        try:
+            value = loader()
+        except Exception as e:
+            self._errors[name] = str(e)
+            raise
+        self._errors.pop(name, None)
+        self._timings[name] = round(time.perf_counter() - start, 4)
+        return value
+
+    def get_reg_model(self):
+        if self._reg_model is None:
+            with self._lock:
+                if self._reg_model is None:
+                    self._reg_model = self._timed('regression_load_seconds', self._load_reg_model)
+        return self._reg_model
+
+    def get_bert_model(self):
+        if self._bert_model is None:
+            with self._lock:
+                if self._bert_model is None:
+                    self._bert_model = self._timed('encoder_load_seconds', self._load_bert_model)
+        return self._bert_model
+
+    def _load_reg_model(self):
+        from .linear_scorer import load_linear_scorer
+
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
+        return load_linear_scorer(
+            MODEL_PATH,
+            self.regression_digest,
+            cache_path=get_setting('REGRESSION_SCORER_PATH', None) or SCORER_PATH,
+        )
+
+    @property
+    def regression_digest(self) -> str:
+        """SHA-256 of the regression pickle, used to version cached results"""
+        if self._regression_digest is None:
+            digest = hashlib.sha256()
+            with open(MODEL_PATH, 'rb') as model_file:
+                for block in iter(lambda: model_file.read(1024 * 1024), b''):
+                    digest.update(block)
+            self._regression_digest = digest.hexdigest()
+        return self._regression_digest
+
+    @property
+    def encoder_backend(self) -> str:
+        backend = get_setting('ENCODER_BACKEND', 'torch')
+        if backend not in ENCODER_BACKENDS:
+            raise ValueError(
+                f"Unknown ENCODER_BACKEND '{backend}'. Choose from: {', '.join(ENCODER_BACKENDS)}"
+            )
+        return backend
+
+    @property
+    def encoder_id(self) -> str:
+        """Model name plus backend, so vectors from different backends never mix in caches"""
+        backend = self.encoder_backend
+        return BERT_MODEL_NAME if backend == 'torch' else f"{BERT_MODEL_NAME}:{backend}"
+
+    def _load_bert_model(self):
+        backend = self.encoder_backend
+        if backend == 'torch':
+            from sentence_transformers import SentenceTransformer
+
+            return SentenceTransformer(BERT_MODEL_NAME)
+
+        from .onnx_encoder import OnnxEncoder
+
+        return OnnxEncoder(
+            get_setting('ONNX_MODEL_DIR', os.path.join(BASE_DIR, 'onnx_model')),
+            quantized=(backend == 'onnx-int8'),
+            threads=get_setting('ONNX_THREADS', 0),
+        )
+
+    def warmup(self) -> None:
+        """
+        Load both models and run one encode so the first request is not cold
+        Concurrent calls (post_worker_init and the ready probe) run it once;
+        the later ones wait for the first to finish.
+        """
+        if self._warm:
+            return
+        with self._warmup_lock:
+            if self._warm:
+                return
+            start = time.perf_counter()
+            self.get_reg_model()
+            encoder = self.get_bert_model()
+            self._timed('warmup_encode_seconds', lambda: encoder.encode(["warmup"]))
+            for name, hook in self._warmup_hooks:
+                self._timed(name, hook)
+            self._timings['warmup_total_seconds'] = round(time.perf_counter() - start, 4)
+            self._warm = True
+
+    def add_warmup_hook(self, name: str, hook) -> None:
+        """Run hook at the end of warmup(); its duration is reported as name"""
+        self._warmup_hooks.append((name, hook))
+
+    def warmup_in_background(self) -> threading.Thread:
+        """Start warmup on a thread, unless one is already running"""
+        def run():
+            try:
+                self.warmup()
+            except Exception:
+                # Recorded in self._errors and surfaced through status()
+                pass
+
+        with self._warmup_thread_lock:
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                return self._warmup_thread
+            thread = threading.Thread(target=run, name='model-warmup', daemon=True)
+            thread.start()
+            self._warmup_thread = thread
+        return thread
+
+    @property
+    def is_ready(self) -> bool:
+        return self._warm
+
+    def status(self) -> dict:
+        return {
+            'ready': self._warm,
+            'regression_loaded': self._reg_model is not None,
+            'encoder_loaded': self._bert_model is not None,
+            'encoder_model': BERT_MODEL_NAME,
+            'encoder_backend': get_setting('ENCODER_BACKEND', 'torch'),
+            'timings': dict(self._timings),
+            'error': '; '.join(f"{name}: {error}" for name, error in self._errors.items()) or None,
+        }
+
+
+models = ModelLoader()
@@ -0,0 +1,127 @@
+"""
+Text normalization shared by the preprocessor, views and predictor
+
+normalize_document() runs the precompiled cleaning regexes once per document
+and returns a NormalizedDocument that every stage of the request path reads
+from, so no stage re-cleans text another stage already cleaned.
+"""
+
+import re
+
+# Whitespace runs (collapsed before the removals so patterns see single spaces)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Removed in this order. The removals are not fused into one alternation:
+# deleting a tag or URL can join text that a later pattern then matches, and
+# cleaned output must not change.
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+URL_PATTERN = re.compile(r'http\S+|www\S+')
+EMAIL_ADDRESS_PATTERN = re.compile(r'\S+@\S+')
+PHONE_PATTERN = re.compile(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}')
+
+# Runs of characters outside the kept set; whitespace is outside it too, so
+# replacing each run with one space also collapses whitespace
+DISALLOWED_RUN_PATTERN = re.compile(r'[^a-zA-Z0-9.,\-()]+')
+
+# For the matcher form: anything but lowercase letters and digits
+NON_ALNUM_RUN_PATTERN = re.compile(r'[^a-z0-9]+')
+
+
+def has_email_like(text: str) -> bool:
+    """
+    Same answer as re.search(r'[^@]+@[^@]+\.[^@]+', text), in linear time
+    (that regex backtracks quadratically on long text without a match): some
+    '@' has a non-'@' character before it and a '.' strictly inside the run
+    of non-'@' characters after it
+    """
+    parts = text.split('@')
+    return any(parts[i - 1] and '.' in parts[i][1:-1] for i in range(1, len(parts)))
+
+
+def clean_text(text: str) -> str:
+    """
+    Clean and normalize text
+    - Remove HTML tags, URLs, email addresses and phone numbers
+    - Replace characters other than letters, digits and . , - ( ) with spaces
+    - Collapse whitespace
+    """
+    if not text:
+        return ""
+    text = WHITESPACE_PATTERN.sub(' ', text)
+    # Substring checks are far cheaper than a regex pass that finds nothing
+    if '<' in text:
+        text = HTML_TAG_PATTERN.sub('', text)
+    if 'http' in text or 'www' in text:
+        text = URL_PATTERN.sub('', text)
+    if '@' in text:
+        text = EMAIL_ADDRESS_PATTERN.sub('', text)
+    text = PHONE_PATTERN.sub('', text)
+    return DISALLOWED_RUN_PATTERN.sub(' ', text).strip()
+
+
+def match_text(cleaned: str) -> str:
+    """Lowercase alphanumeric form of cleaned text used by the predictor"""
+    return NON_ALNUM_RUN_PATTERN.sub(' ', cleaned.lower()).strip()
+
+
+class NormalizedDocument:
+    """
+    Result of normalizing one CV or JD
+
+    Only the original and cleaned buffers are held; the lowercase and
+    predictor forms are derived on first access and kept.
+    """
+    __slots__ = ('original', 'cleaned', 'stats', '_normalized', '_match_text')
+
+    def __init__(self, original: str, cleaned: str, stats: dict):
+        self.original = original
+        self.cleaned = cleaned
+        self.stats = stats
+        self._normalized = None
+        self._match_text = None
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            self._normalized = self.cleaned.lower()
+        return self._normalized
+
+    @property
+    def match_text(self) -> str:
+        if self._match_text is None:
+            self._match_text = match_text(self.cleaned)
+        return self._match_text
+
+    @property
+    def length(self) -> int:
+        return len(self.cleaned)
+
+    @property
+    def word_count(self) -> int:
+        return self.stats['word_count']
+
+
+def normalize_document(text: str) -> NormalizedDocument:
+    """Clean text once and compute the statistics from that result"""
+    text = text or ""
+    cleaned = clean_text(text)
+
+    word_count = 0
+    total_word_length = 0
+    unique_words = set()
+    for word in cleaned.split():
+        word_count += 1
+        total_word_length += len(word)
+        unique_words.add(word)
+
+    stats = {
+        'original_length': len(text),
+        'cleaned_length': len(cleaned),
+        'word_count': word_count,
+        'average_word_length': total_word_length / word_count if word_count else 0,
+        'unique_words': len(unique_words),
+        'has_contact_info': has_email_like(text),
+        'has_phone': bool(PHONE_PATTERN.search(text)),
+    }
+
+    return NormalizedDocument(original=text, cleaned=cleaned, stats=stats)
@@ -0,0 +1,188 @@
+"""
+ONNX Runtime encoder backend for all-MiniLM-L6-v2
+
+Exports the transformer to ONNX (optionally with dynamic int8 weight
+quantization) and reproduces SentenceTransformer.encode: tokenize, run the
+transformer, mean-pool over the attention mask and L2-normalise.
+
+The first encoder created in a model directory exports the model; workers
+starting at the same time wait on an fcntl lock in that directory. Every
+file is written under a temporary name and moved into place with
+os.replace, the model file last, so a model file is only ever complete.
+"""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import List
+
+import numpy as np
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+HF_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_SEQ_LENGTH = 256  # matches SentenceTransformer("all-MiniLM-L6-v2").max_seq_length
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+EXPORT_LOCK_FILE = "export.lock"
+
+
+class OnnxEncoderError(Exception):
+    """Custom exception for ONNX encoder errors"""
+    pass
+
+
+@contextmanager
+def export_lock(output_dir: str):
+    """Exclusive lock on output_dir for exporting (per process without fcntl)"""
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, EXPORT_LOCK_FILE), "a+b") as lock_file:
+        if HAS_FCNTL:
+            # Released when the file is closed
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+
+def export_onnx(output_dir: str, quantize: bool = True) -> str:
+    """
+    Export the MiniLM transformer and tokenizer to output_dir
+    Returns the path of the model file to load (int8 when quantize is set).
+    Concurrent exports to one directory should hold export_lock.
+    """
+    try:
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+    except ImportError:
+        raise OnnxEncoderError(
+            "torch and transformers are required to export the ONNX model"
+        )
+
+    os.makedirs(output_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(dir=output_dir, prefix=".export-")
+    try:
+        temp_fp32 = os.path.join(temp_dir, FP32_FILE)
+
+        tokenizer = AutoTokenizer.from_pretrained(HF_MODEL_ID)
+        model = AutoModel.from_pretrained(HF_MODEL_ID)
+        model.eval()
+
+        dummy = tokenizer(["export"], return_tensors="pt")
+        inputs = (dummy["input_ids"], dummy["attention_mask"], dummy["token_type_ids"])
+        dynamic = {0: "batch", 1: "sequence"}
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                inputs,
+                temp_fp32,
+                input_names=["input_ids", "attention_mask", "token_type_ids"],
+                output_names=["last_hidden_state"],
+                dynamic_axes={
+                    "input_ids": dynamic,
+                    "attention_mask": dynamic,
+                    "token_type_ids": dynamic,
+                    "last_hidden_state": dynamic,
+                },
+                opset_version=14,
+            )
+
+        if quantize:
+            try:
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+            except ImportError:
+                raise OnnxEncoderError(
+                    "onnxruntime not installed. Install with: pip install onnxruntime"
+                )
+            quantize_dynamic(temp_fp32, os.path.join(temp_dir, INT8_FILE), weight_type=QuantType.QInt8)
+
+        # Tokenizer files first: the model file is what marks an export complete
+        tokenizer_dir = os.path.join(temp_dir, "tokenizer")
+        tokenizer.save_pretrained(tokenizer_dir)
+        for name in os.listdir(tokenizer_dir):
+            os.replace(os.path.join(tokenizer_dir, name), os.path.join(output_dir, name))
+
+        model_files = [FP32_FILE, INT8_FILE] if quantize else [FP32_FILE]
+        for name in model_files:
+            os.replace(os.path.join(temp_dir, name), os.path.join(output_dir, name))
+        return os.path.join(output_dir, model_files[-1])
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class OnnxEncoder:
+    """Drop-in replacement for SentenceTransformer.encode on CPU"""
+
+    def __init__(self, model_dir: str, quantized: bool = True, threads: int = 0):
+        try:
+            import onnxruntime as ort
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise OnnxEncoderError(
+                "onnxruntime not installed. Install with: pip install onnxruntime"
+            )
+
+        model_path = os.path.join(model_dir, INT8_FILE if quantized else FP32_FILE)
+        if not os.path.exists(model_path):
+            with export_lock(model_dir):
+                # Another worker may have exported it while this one waited
+                if not os.path.exists(model_path):
+                    export_onnx(model_dir, quantize=quantized)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+
+        self.model_path = model_path
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        self.session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._input_names = {i.name for i in self.session.get_inputs()}
+        # Hidden size from the graph; symbolic dimensions are read off the first batch
+        dim = self.session.get_outputs()[0].shape[-1]
+        self.dim = dim if isinstance(dim, int) else None
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        if isinstance(texts, str):
+            texts = [texts]
+
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+
+        # Sort by length so each batch pads as little as possible
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        output = None
+
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            batch = self.tokenizer(
+                [texts[i] for i in rows],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np",
+            )
+            feeds = {
+                name: batch[name].astype(np.int64)
+                for name in ("input_ids", "attention_mask", "token_type_ids")
+                if name in self._input_names
+            }
+            hidden = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real tokens, then L2 normalisation
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            if output is None:
+                self.dim = pooled.shape[1]
+                output = np.empty((len(texts), self.dim), dtype=np.float32)
+            output[rows] = pooled
+
+        return output
@@ -1,22 +1,21 @@
-import joblib
+import hashlib
 import re
 import numpy as np
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-import os
+
+from .batching import MicroBatcher
+from .conf import get_setting
+from .embedding_cache import EmbeddingCache
+from .metrics import stage
+from .normalizer import NormalizedDocument, match_text
+from .model_loader import BASE_DIR, models
+from .skill_normalizer import SkillNormalizer
+from .vectors import normalize_rows
 
 # =========================
-# LOAD MODELS (GLOBAL)
+# MODELS
 # =========================
-
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-MODEL_PATH = os.path.join(BASE_DIR, "overall_match_regression_model.pkl")
-
-try:
-    reg_model = joblib.load(MODEL_PATH)
-    bert_model = SentenceTransformer("all-MiniLM-L6-v2")
-except FileNotFoundError:
-    raise FileNotFoundError(f"Model file not found at {MODEL_PATH}")
+# Loaded lazily on first use (see model_loader); call models.warmup() to
+# load them ahead of the first request.
 
 # =========================
 # CONSTANTS
@@ -92,6 +91,44 @@ SKILLS = [
     "decision making", "adaptability", "negotiation"
 ]
 
+# Other spellings of SKILLS entries, matched exactly before any embedding
+# lookup (see skill_normalizer)
+SKILL_ALIASES = {
+    # IT / Data
+    "postgres": "sql", "postgresql": "sql", "mysql": "sql", "sqlite": "sql",
+    "mssql": "sql", "ms sql": "sql", "tsql": "sql", "t sql": "sql", "plsql": "sql", "pl sql": "sql",
+    "ml": "machine learning", "ml engineer": "machine learning", "ml engineering": "machine learning",
+    "dl": "deep learning", "natural language processing": "nlp",
+    "data analytics": "data analysis", "data analyst": "data analysis",
+    "data engineer": "data engineering", "data viz": "data visualization",
+    "powerbi": "power bi", "pyspark": "spark", "apache spark": "spark", "apache hadoop": "hadoop",
+    "amazon web services": "aws", "microsoft azure": "azure",
+    "google cloud": "gcp", "google cloud platform": "gcp",
+    "k8s": "kubernetes", "kube": "kubernetes",
+    "cicd": "ci cd", "continuous integration": "ci cd", "continuous delivery": "ci cd",
+    "gitlab": "git", "restful api": "rest api", "restful apis": "rest api", "rest apis": "rest api",
+    "microservice": "microservices", "micro services": "microservices",
+    "pentesting": "penetration testing", "pen testing": "penetration testing",
+
+    # Software / Engineering
+    "software engineer": "software development", "software engineering": "software development",
+    "front end": "frontend development", "frontend": "frontend development",
+    "back end": "backend development", "backend": "backend development",
+    "full stack": "full stack development", "fullstack": "full stack development",
+    "reactjs": "react", "angularjs": "angular", "vuejs": "vue", "springboot": "spring boot",
+    "oop": "object oriented programming",
+
+    # Marketing / Sales / Design
+    "search engine optimization": "seo", "salesforce": "crm",
+    "customer relationship management": "crm",
+    "ux": "ui ux design", "ux design": "ui ux design", "ui design": "ui ux design",
+    "user experience design": "ui ux design",
+    "photoshop": "adobe photoshop", "illustrator": "adobe illustrator",
+
+    # Operations
+    "qa": "quality assurance",
+}
+
 DEGREE_RANK = {"Other": 0, "Bachelor": 1, "Master": 2, "PhD": 3}
 
 # =========================
@@ -102,18 +139,159 @@ SKILL_MIN = 20          # %
 SEMANTIC_MIN = 40       # %
 MAX_MISMATCH_SCORE = 45 # %
 
+# =========================
+# VERSIONING
+# =========================
+
+def scoring_version():
+    """
+    Identifies everything that can change a score for the same inputs: the
+    regression pickle, the encoder, the skill taxonomy and the guardrails
+    """
+    parts = [
+        models.regression_digest,
+        models.encoder_id,
+        hashlib.sha256(repr(skill_normalizer.config).encode("utf-8")).hexdigest(),
+        repr(semantic_skills_enabled()),
+        repr((SKILL_MIN, SEMANTIC_MIN, MAX_MISMATCH_SCORE)),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
 # =========================
 # PREPROCESSING
 # =========================
 
 def clean_text(text):
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9 ]', ' ', text)
-    return re.sub(r'\s+', ' ', text).strip()
+    # A NormalizedDocument already carries this form
+    if isinstance(text, NormalizedDocument):
+        return text.match_text
+    return match_text(text)
 
 
 def extract_skills(text):
-    return list(set(skill for skill in SKILLS if skill in text))
+    """Skills spelled out in text (exact or alias); see extract_skills_many"""
+    return list(skill_normalizer.find(text))
+
+# =========================
+# ENCODING
+# =========================
+
+embedding_cache = EmbeddingCache(
+    max_entries=get_setting("EMBEDDING_CACHE_MAX_ENTRIES", 10000),
+    max_bytes=get_setting("EMBEDDING_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+    disk_dir=get_setting("EMBEDDING_CACHE_DIR", None),
+    max_disk_bytes=get_setting("EMBEDDING_CACHE_DISK_MAX_BYTES", 1024 * 1024 * 1024),
+)
+
+# Coalesces encode calls from concurrent requests into shared forward passes
+# (enabled with the ENCODER_MICRO_BATCHING setting)
+encoder_batcher = MicroBatcher(
+    lambda texts: models.get_bert_model().encode(texts),
+    max_batch_size=get_setting("ENCODER_BATCH_MAX_SIZE", 64),
+    max_wait_ms=get_setting("ENCODER_BATCH_MAX_WAIT_MS", 5.0),
+)
+
+
+def _encode_uncached(texts):
+    if get_setting("ENCODER_MICRO_BATCHING", False):
+        return encoder_batcher.encode(texts)
+    return models.get_bert_model().encode(texts)
+
+
+def encode_texts(texts, cache=None):
+    """
+    Encode a list of texts in a single batched forward pass
+    Texts already in the embedding cache (or the given cache) are served
+    from it; only the remaining unique texts reach the encoder.
+    """
+    if cache is None:
+        cache = embedding_cache
+    texts = list(texts)
+    encoder_id = models.encoder_id
+    keys = [EmbeddingCache.make_key(encoder_id, t) for t in texts]
+
+    vectors = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in vectors or key in pending:
+            continue
+        cached = cache.get(key)
+        if cached is not None:
+            vectors[key] = cached
+        else:
+            pending[key] = text
+
+    if pending:
+        with stage("encode"):
+            encoded = _encode_uncached(list(pending.values()))
+        for key, vector in zip(pending, encoded):
+            cache.put(key, vector)
+            vectors[key] = vector
+
+    return np.array([vectors[key] for key in keys])
+
+
+def cosine_similarity(a, b):
+    """Pairwise cosine similarity matrix of the rows of a and b"""
+    return normalize_rows(a, dtype=float) @ normalize_rows(b, dtype=float).T
+
+
+def cosine_score(a, b):
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    norms = float(np.linalg.norm(a) * np.linalg.norm(b))
+    return float(a @ b) / norms if norms else 0.0
+
+# =========================
+# SKILLS
+# =========================
+
+# Skill-candidate phrases are short and numerous; a separate cache keeps them
+# from evicting document embeddings
+phrase_cache = EmbeddingCache(
+    max_entries=get_setting("SKILL_PHRASE_CACHE_MAX_ENTRIES", 50000),
+    max_bytes=get_setting("SKILL_PHRASE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+)
+
+skill_normalizer = SkillNormalizer(
+    SKILLS, SKILL_ALIASES,
+    encode=lambda texts: encode_texts(texts, cache=phrase_cache),
+    encoder_id=lambda: models.encoder_id,
+    threshold=get_setting("SKILL_SEMANTIC_THRESHOLD", 0.7),
+    max_candidates=get_setting("SKILL_SEMANTIC_MAX_CANDIDATES", 512),
+    cache_dir=get_setting("SKILL_EMBEDDINGS_DIR", None) or BASE_DIR,
+)
+
+# Embed the taxonomy while the models warm up, not on the first request
+models.add_warmup_hook(
+    "skill_matrix_seconds",
+    lambda: skill_normalizer.skill_matrix() if semantic_skills_enabled() else None,
+)
+
+
+def semantic_skills_enabled():
+    return get_setting("SKILL_SEMANTIC_MATCHING", False)
+
+
+def extract_skills_many(texts):
+    """
+    Skills of several cleaned texts, as sets
+    Exact and alias hits, plus (when SKILL_SEMANTIC_MATCHING is on) the
+    skills their other phrases embed close to: one batched encode and one
+    matrix product for all the texts together.
+    """
+    return skill_normalizer.find_many(texts, semantic=semantic_skills_enabled())
+
+
+def add_semantic_skills(texts, features_list):
+    """
+    Complete features built with extract_features(text, semantic=False),
+    e.g. in worker processes that do not load the encoder
+    """
+    if not semantic_skills_enabled():
+        return
+    for features, skills in zip(features_list, extract_skills_many(texts)):
+        features["skills"] |= skills
 
 # =========================
 # EXPERIENCE
@@ -136,29 +314,39 @@ def extract_experience_years(text):
     return 0.0
 
 
-def experience_semantic_score(cv_text, jd_text):
-    keywords = ["experience", "intern", "internship", "worked", "employment", "job", "role"]
+EXPERIENCE_KEYWORDS = ["experience", "intern", "internship", "worked", "employment", "job", "role"]
 
-    def filter_exp(text):
-        return " ".join([w for w in text.split() if w in keywords])
 
-    cv_exp = filter_exp(cv_text)
-    jd_exp = filter_exp(jd_text)
+def filter_experience_text(text):
+    return " ".join([w for w in text.split() if w in EXPERIENCE_KEYWORDS])
+
+
+def experience_semantic_score(cv_text, jd_text, cv_vec=None, jd_vec=None):
+    cv_exp = filter_experience_text(cv_text)
+    jd_exp = filter_experience_text(jd_text)
 
     if not cv_exp or not jd_exp:
         return 0.3
 
-    cv_vec = bert_model.encode([cv_exp])
-    jd_vec = bert_model.encode([jd_exp])
-    return float(cosine_similarity(cv_vec, jd_vec)[0][0])
+    # Vectors may be supplied by a caller that already batch-encoded the
+    # filtered texts (see predict_match)
+    if cv_vec is None or jd_vec is None:
+        cv_vec, jd_vec = encode_texts([cv_exp, jd_exp])
+    return cosine_score(cv_vec, jd_vec)
 
 
-def experience_score(cv_text, jd_text):
+def experience_score(cv_text, jd_text, semantic_score=None):
     cv_years = extract_experience_years(cv_text)
     jd_years = extract_experience_years(jd_text)
 
+    if semantic_score is None:
+        semantic_score = experience_semantic_score(cv_text, jd_text)
+
+    return experience_score_from_years(cv_years, jd_years, semantic_score)
+
+
+def experience_score_from_years(cv_years, jd_years, semantic_score):
     numeric_score = min(cv_years / max(jd_years, 0.5), 1.0)
-    semantic_score = experience_semantic_score(cv_text, jd_text)
 
     rule_boost = 0.9 if cv_years <= 1 and jd_years <= 1 else 0.5
 
@@ -201,36 +389,60 @@ def apply_domain_guardrail(skill, semantic, overall):
 
     return overall
 
+
+def apply_domain_guardrail_batch(skill, semantic, overall):
+    """Vectorized apply_domain_guardrail over arrays of scores"""
+    skill = np.asarray(skill, dtype=float)
+    semantic = np.asarray(semantic, dtype=float)
+    overall = np.asarray(overall, dtype=float)
+
+    extreme = (skill == 0) & (semantic < 30)
+    mismatch = (skill < SKILL_MIN) & (semantic < SEMANTIC_MIN)
+
+    result = np.where(extreme, np.minimum(overall, 30), overall)
+    # Strong domain mismatch takes precedence, as in the scalar version
+    return np.where(mismatch, np.minimum(overall, MAX_MISMATCH_SCORE), result)
+
 # =========================
 # MAIN PREDICTOR
 # =========================
 
 def predict_match(cv_text, jd_text):
-    cv = clean_text(cv_text)
-    jd = clean_text(jd_text)
+    """Score one CV/JD pair; each side may be a string or a NormalizedDocument"""
+    with stage("features"):
+        cv = clean_text(cv_text)
+        jd = clean_text(jd_text)
+
+        # Skills
+        cv_skills, jd_skills = extract_skills_many([cv, jd])
+        skill_pct = (len(cv_skills & jd_skills) / len(jd_skills) if jd_skills else 0) * 100
 
-    # Skills
-    cv_skills = extract_skills(cv)
-    jd_skills = extract_skills(jd)
-    skill_pct = (len(set(cv_skills) & set(jd_skills)) / len(jd_skills) if jd_skills else 0) * 100
+        # Collect every text this prediction needs and encode them in one batch
+        cv_exp = filter_experience_text(cv)
+        jd_exp = filter_experience_text(jd)
+        has_exp = bool(cv_exp and jd_exp)
 
-    # Experience
-    exp_pct = experience_score(cv, jd)
+    texts = [cv, jd] + ([cv_exp, jd_exp] if has_exp else [])
+    vectors = encode_texts(texts)
+    cv_vec, jd_vec = vectors[0], vectors[1]
 
-    # Education
-    edu_pct = education_score(extract_degree(cv), extract_degree(jd))
+    with stage("features"):
+        # Experience
+        exp_semantic = cosine_score(vectors[2], vectors[3]) if has_exp else 0.3
+        exp_pct = experience_score(cv, jd, semantic_score=exp_semantic)
 
-    # Semantic
-    cv_vec = bert_model.encode([cv])
-    jd_vec = bert_model.encode([jd])
-    semantic = cosine_similarity(cv_vec, jd_vec)[0][0] * 100
+        # Education
+        edu_pct = education_score(extract_degree(cv), extract_degree(jd))
 
-    # Regression prediction
-    X = np.array([[skill_pct, exp_pct, edu_pct, semantic]])
-    raw_overall = float(reg_model.predict(X)[0])
+        # Semantic
+        semantic = cosine_score(cv_vec, jd_vec) * 100
 
-    # APPLY GUARDRAIL ✅
-    overall = apply_domain_guardrail(skill_pct, semantic, raw_overall)
+    with stage("regression"):
+        # Regression prediction
+        raw_overall = models.get_reg_model().score_row((skill_pct, exp_pct, edu_pct, semantic))
+
+        # APPLY GUARDRAIL ✅
+        overall = apply_domain_guardrail(skill_pct, semantic, raw_overall)
 
     return {
         "skill_match": round(skill_pct, 2),
@@ -239,3 +451,174 @@ def predict_match(cv_text, jd_text):
         "semantic_similarity": round(semantic, 2),
         "overall_match": round(overall, 2)
     }
+
+
+# =========================
+# BATCH SCORING
+# =========================
+
+def extract_features(text, semantic=True):
+    """
+    Per-document features used by the scorers (text must be cleaned)
+    semantic=False skips the embedding-based skill matching; finish those
+    features with add_semantic_skills.
+    """
+    skills = extract_skills_many([text])[0] if semantic else set(extract_skills(text))
+    return {
+        "skills": skills,
+        "degree": extract_degree(text),
+        "experience_years": extract_experience_years(text),
+        "experience_text": filter_experience_text(text),
+    }
+
+
+def feature_row(cv_features, jd_features, semantic, exp_semantic):
+    """Regression input row [skill, experience, education, semantic] for one pair"""
+    jd_skills = jd_features["skills"]
+    skill_pct = (len(cv_features["skills"] & jd_skills) / len(jd_skills) if jd_skills else 0) * 100
+
+    exp_pct = experience_score_from_years(
+        cv_features["experience_years"], jd_features["experience_years"], exp_semantic
+    )
+    edu_pct = education_score(cv_features["degree"], jd_features["degree"])
+
+    return [skill_pct, exp_pct, edu_pct, semantic]
+
+
+def encode_batched(texts, batch_size=64):
+    if not texts:
+        return np.empty((0, 0))
+    return np.vstack([
+        encode_texts(texts[i:i + batch_size]) for i in range(0, len(texts), batch_size)
+    ])
+
+
+def experience_semantic_batch(cv_features_list, jd_features, jd_exp_vec, batch_size=64):
+    """Experience similarity for many CVs against one JD (0.3 when either side has none)"""
+    scores = np.full(len(cv_features_list), 0.3)
+    if jd_exp_vec is None:
+        return scores
+
+    rows = [i for i, f in enumerate(cv_features_list) if f["experience_text"]]
+    if rows:
+        exp_vecs = encode_batched([cv_features_list[i]["experience_text"] for i in rows], batch_size)
+        scores[rows] = cosine_similarity(exp_vecs, [jd_exp_vec])[:, 0]
+    return scores
+
+
+def score_feature_matrix(X):
+    """Run the regression and domain guardrail over an Nx4 feature matrix"""
+    with stage("regression"):
+        raw_overall = models.get_reg_model().predict(X)
+        return apply_domain_guardrail_batch(X[:, 0], X[:, 3], raw_overall)
+
+
+def format_ranked(X, overall, top_k=None):
+    """Sort rows by overall score (stable on ties) and build result dicts"""
+    order = np.argsort(-overall, kind="stable")
+    if top_k:
+        order = order[:top_k]
+
+    return [
+        {
+            "index": int(i),
+            "skill_match": round(float(X[i, 0]), 2),
+            "experience_match": round(float(X[i, 1]), 2),
+            "education_match": round(float(X[i, 2]), 2),
+            "semantic_similarity": round(float(X[i, 3]), 2),
+            "overall_match": round(float(overall[i]), 2),
+        }
+        for i in order
+    ]
+
+
+def rank_matches(cv_texts, jd_text, top_k=None, batch_size=64):
+    """
+    Score many CVs against one JD
+    JD features and embeddings are computed once, CVs are encoded in batches
+    and the regression and guardrail run over the whole Nx4 feature matrix.
+    Each text may be a string or a NormalizedDocument. Returns results
+    sorted by overall_match (highest first); each result carries the CV's
+    position in the input list as "index".
+    """
+    if not cv_texts:
+        return []
+
+    with stage("features"):
+        jd = clean_text(jd_text)
+        jd_features = extract_features(jd)
+
+        cvs = [clean_text(t) for t in cv_texts]
+        cv_features = [extract_features(cv, semantic=False) for cv in cvs]
+        # Every CV's skill phrases in one encode and one matrix product
+        add_semantic_skills(cvs, cv_features)
+
+    # JD vectors once, CV vectors in encoder-sized batches
+    jd_exp = jd_features["experience_text"]
+    jd_vectors = encode_texts([jd] + ([jd_exp] if jd_exp else []))
+    jd_exp_vec = jd_vectors[1] if jd_exp else None
+
+    cv_vecs = encode_batched(cvs, batch_size)
+    semantic = cosine_similarity(cv_vecs, [jd_vectors[0]])[:, 0] * 100
+    exp_semantic = experience_semantic_batch(cv_features, jd_features, jd_exp_vec, batch_size)
+
+    X = np.array([
+        feature_row(cv_features[i], jd_features, semantic[i], exp_semantic[i])
+        for i in range(len(cvs))
+    ], dtype=float)
+
+    overall = score_feature_matrix(X)
+    return format_ranked(X, overall, top_k)
+
+
+def rowwise_cosine(a, b):
+    """Cosine similarity of each row of a with the same row of b (0 for zero vectors)"""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    norms = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    dots = np.einsum("ij,ij->i", a, b)
+    return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+
+def score_pairs(cv_texts, jd_texts, cv_features, jd_features, vectors):
+    """
+    Score aligned lists of CV/JD pairs in one pass
+    Texts must be cleaned and features come from extract_features. vectors
+    maps every cleaned text and non-empty experience text to its embedding
+    (see encode_batched). Returns one predict_match-style dict per pair.
+    """
+    if not cv_texts:
+        return []
+
+    with stage("features"):
+        semantic = rowwise_cosine(
+            [vectors[t] for t in cv_texts], [vectors[t] for t in jd_texts]
+        ) * 100
+
+        exp_semantic = np.full(len(cv_texts), 0.3)
+        rows = [
+            i for i in range(len(cv_texts))
+            if cv_features[i]["experience_text"] and jd_features[i]["experience_text"]
+        ]
+        if rows:
+            exp_semantic[rows] = rowwise_cosine(
+                [vectors[cv_features[i]["experience_text"]] for i in rows],
+                [vectors[jd_features[i]["experience_text"]] for i in rows],
+            )
+
+        X = np.array([
+            feature_row(cv_features[i], jd_features[i], semantic[i], exp_semantic[i])
+            for i in range(len(cv_texts))
+        ], dtype=float)
+
+    overall = score_feature_matrix(X)
+    return [
+        {
+            "skill_match": round(float(X[i, 0]), 2),
+            "experience_match": round(float(X[i, 1]), 2),
+            "education_match": round(float(X[i, 2]), 2),
+            "semantic_similarity": round(float(X[i, 3]), 2),
+            "overall_match": round(float(overall[i]), 2),
+        }
+        for i in range(len(cv_texts))
+    ]
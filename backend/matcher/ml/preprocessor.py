@@ -2,9 +2,93 @@
 Text preprocessing utilities for CV and JD normalization
 """
 
-import re
+from collections.abc import Mapping
 from typing import Optional
 
+from . import normalizer
+from .normalizer import NormalizedDocument, normalize_document
+from .section_segmenter import SectionSegmenter
+
+# Sections kept by CV preprocessing ('full_text' is always the whole text)
+CV_SECTION_KEYS = ('experience', 'skills', 'education', 'certifications')
+
+# Sections kept by JD preprocessing
+JD_SECTION_KEYS = ('requirements', 'responsibilities', 'benefits')
+
+
+class Sections(Mapping):
+    """
+    Read-only view of named sections stored as spans of the raw text
+
+    A section is only sliced out and cleaned when it is read; 'full_text'
+    is the already cleaned document.
+    """
+    __slots__ = ('_buffer', '_spans', '_full_text')
+
+    def __init__(self, buffer: str, spans: dict, full_text: str):
+        self._buffer = buffer
+        self._spans = spans
+        self._full_text = full_text
+
+    def span(self, key: str) -> tuple:
+        """(start, end) spans of the raw text that make up a section"""
+        return self._spans[key]
+
+    def __getitem__(self, key: str) -> str:
+        if key == 'full_text':
+            return self._full_text
+        runs = self._spans[key]
+        return normalizer.clean_text(' '.join([self._buffer[start:end] for start, end in runs]))
+
+    def __iter__(self):
+        yield from self._spans
+        yield 'full_text'
+
+    def __len__(self) -> int:
+        return len(self._spans) + 1
+
+
+class PreprocessedDocument:
+    """
+    Preprocessed CV or JD
+
+    Wraps the NormalizedDocument; sections are spans into its original text
+    rather than copies. Item access (doc['cleaned']) is kept for callers
+    written against the old dict result.
+    """
+    __slots__ = ('document', 'sections')
+
+    FIELDS = ('original', 'cleaned', 'normalized', 'sections', 'length', 'word_count', 'document')
+
+    def __init__(self, document: NormalizedDocument, spans: dict):
+        self.document = document
+        self.sections = Sections(document.original, spans, document.cleaned)
+
+    @property
+    def original(self) -> str:
+        return self.document.original
+
+    @property
+    def cleaned(self) -> str:
+        return self.document.cleaned
+
+    @property
+    def normalized(self) -> str:
+        return self.document.normalized
+
+    @property
+    def length(self) -> int:
+        return self.document.length
+
+    @property
+    def word_count(self) -> int:
+        return self.document.word_count
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
 
 class TextPreprocessor:
     """Preprocess and normalize text for matching"""
@@ -20,6 +104,16 @@ class TextPreprocessor:
         'certifications': ['certification', 'certificate', 'certified', 'course'],
     }
 
+    # Common sections in job descriptions; the ones not kept still end the
+    # section before them
+    JD_SECTIONS = {
+        'requirements': ['requirements', 'requirement', 'must have', 'what you need'],
+        'responsibilities': ['responsibilities', 'responsibility', 'duties', 'what you will do'],
+        'benefits': ['benefits', 'benefit', 'perks', 'we offer'],
+        'qualifications': ['qualifications', 'qualification', 'nice to have'],
+        'about': ['about', 'company', 'overview'],
+    }
+
     @staticmethod
     def clean_text(text: str) -> str:
         """
@@ -28,31 +122,7 @@ class TextPreprocessor:
         - Remove special characters (but keep spaces between words)
         - Normalize case
         """
-        if not text:
-            return ""
-
-        # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove HTML tags if any
-        text = re.sub(r'<[^>]+>', '', text)
-        
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+', '', text)
-        
-        # Remove email addresses
-        text = re.sub(r'\S+@\S+', '', text)
-        
-        # Remove phone numbers
-        text = re.sub(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', '', text)
-        
-        # Keep common punctuation for sentence structure but remove others
-        text = re.sub(r'[^a-zA-Z0-9\s\.\,\-\(\)]', ' ', text)
-        
-        # Remove extra spaces again
-        text = re.sub(r'\s+', ' ', text)
-        
-        return text.strip()
+        return normalizer.clean_text(text)
 
     @staticmethod
     def normalize_text(text: str) -> str:
@@ -60,132 +130,56 @@ class TextPreprocessor:
         return text.lower()
 
     @staticmethod
-    def extract_key_sections(text: str) -> dict:
+    def find_section_spans(text: str) -> dict:
         """
-        Extract and categorize key sections from CV
-        Returns: dict with section names as keys and extracted text as values
+        Locate the key CV sections in raw text (newlines intact)
+        Returns: dict of section name -> tuple of (start, end) spans
         """
-        sections = {
-            'experience': "",
-            'skills': "",
-            'education': "",
-            'certifications': "",
-            'full_text': text
-        }
-
-        text_lower = text.lower()
-        lines = text.split('\n')
-
-        current_section = 'full_text'
-
-        for line in lines:
-            line_lower = line.lower()
+        spans = CV_SEGMENTER.segment(text)
+        return {key: spans[key] for key in CV_SECTION_KEYS}
 
-            # Detect section headers
-            for section_key, keywords in TextPreprocessor.CV_SECTIONS.items():
-                if any(keyword in line_lower for keyword in keywords):
-                    if section_key in sections:
-                        current_section = section_key
-                    break
-
-            # Add content to current section
-            if current_section in sections and current_section != 'full_text':
-                sections[current_section] += line + " "
-
-        # Clean sections
-        for key in sections:
-            if key != 'full_text':
-                sections[key] = sections[key].strip()
+    @staticmethod
+    def find_jd_section_spans(text: str) -> dict:
+        """
+        Locate the key JD sections in raw text (newlines intact)
+        Returns: dict of section name -> tuple of (start, end) spans
+        """
+        spans = JD_SEGMENTER.segment(text)
+        return {key: spans[key] for key in JD_SECTION_KEYS}
 
-        return sections
+    @staticmethod
+    def extract_key_sections(text: str) -> dict:
+        """
+        Extract and categorize key sections from CV
+        Returns: dict with section names as keys and cleaned section text as
+        values; 'full_text' is the text as given
+        """
+        return dict(Sections(text, TextPreprocessor.find_section_spans(text), text))
 
     @staticmethod
-    def preprocess_cv(text: str) -> dict:
+    def preprocess_cv(text: str, document: Optional[NormalizedDocument] = None) -> PreprocessedDocument:
         """
         Complete preprocessing for CV
-        Returns: dict with preprocessed text and metadata
+        Pass an already normalized document to avoid cleaning the text again
+        Returns: PreprocessedDocument with sections as spans of the raw text
         """
-        # Store original for reference
-        original_text = text
-
-        # Clean text
-        cleaned_text = TextPreprocessor.clean_text(text)
-
-        # Normalize to lowercase
-        normalized_text = TextPreprocessor.normalize_text(cleaned_text)
-
-        # Extract sections
-        sections = TextPreprocessor.extract_key_sections(cleaned_text)
-
-        return {
-            'original': original_text,
-            'cleaned': cleaned_text,
-            'normalized': normalized_text,
-            'sections': sections,
-            'length': len(cleaned_text),
-            'word_count': len(cleaned_text.split())
-        }
+        document = document or normalize_document(text)
+        spans = TextPreprocessor.find_section_spans(document.original)
+        return PreprocessedDocument(document, spans)
 
     @staticmethod
-    def preprocess_jd(text: str) -> dict:
+    def preprocess_jd(text: str, document: Optional[NormalizedDocument] = None) -> PreprocessedDocument:
         """
         Complete preprocessing for Job Description
-        Returns: dict with preprocessed text and metadata
+        Pass an already normalized document to avoid cleaning the text again
+        Returns: PreprocessedDocument with sections as spans of the raw text
         """
-        # Store original for reference
-        original_text = text
-
-        # Clean text
-        cleaned_text = TextPreprocessor.clean_text(text)
-
-        # Normalize to lowercase
-        normalized_text = TextPreprocessor.normalize_text(cleaned_text)
-
-        # Extract key sections
-        sections = {
-            'full_text': cleaned_text,
-            'requirements': "",
-            'responsibilities': "",
-            'benefits': "",
-        }
-
-        # Try to extract requirements section
-        text_lower = cleaned_text.lower()
-        if 'requirement' in text_lower:
-            # Find requirements section
-            req_idx = text_lower.find('requirement')
-            next_section_idx = len(cleaned_text)
-            
-            # Find next major section
-            for keyword in ['responsibility', 'benefit', 'qualification', 'about']:
-                idx = text_lower.find(keyword, req_idx)
-                if idx > req_idx and idx < next_section_idx:
-                    next_section_idx = idx
-            
-            sections['requirements'] = cleaned_text[req_idx:next_section_idx]
-
-        if 'responsibility' in text_lower:
-            resp_idx = text_lower.find('responsibility')
-            next_section_idx = len(cleaned_text)
-            
-            for keyword in ['requirement', 'benefit', 'qualification', 'about']:
-                idx = text_lower.find(keyword, resp_idx)
-                if idx > resp_idx and idx < next_section_idx:
-                    next_section_idx = idx
-            
-            sections['responsibilities'] = cleaned_text[resp_idx:next_section_idx]
-
-        return {
-            'original': original_text,
-            'cleaned': cleaned_text,
-            'normalized': normalized_text,
-            'sections': sections,
-            'length': len(cleaned_text),
-            'word_count': len(cleaned_text.split())
-        }
+        document = document or normalize_document(text)
+        spans = TextPreprocessor.find_jd_section_spans(document.original)
+        return PreprocessedDocument(document, spans)
 
     @staticmethod
-    def validate_preprocessed_text(preprocessed: dict, min_length: int = 10) -> tuple:
+    def validate_preprocessed_text(preprocessed: PreprocessedDocument, min_length: int = 10) -> tuple:
         """
         Validate preprocessed text
         Returns: (is_valid, error_message)
@@ -193,26 +187,20 @@ class TextPreprocessor:
         if not preprocessed:
             return False, "No text provided"
 
-        if len(preprocessed['cleaned']) < min_length:
+        if preprocessed.length < min_length:
             return False, f"Text too short. Minimum {min_length} characters required."
 
-        if preprocessed['word_count'] < 3:
+        if preprocessed.word_count < 3:
             return False, "Text contains too few words."
 
         return True, ""
 
     @staticmethod
-    def get_preprocessing_stats(text: str) -> dict:
+    def get_preprocessing_stats(text: str, document: Optional[NormalizedDocument] = None) -> dict:
         """Get statistics about the text"""
-        cleaned = TextPreprocessor.clean_text(text)
-        words = cleaned.split()
-        
-        return {
-            'original_length': len(text),
-            'cleaned_length': len(cleaned),
-            'word_count': len(words),
-            'average_word_length': sum(len(w) for w in words) / len(words) if words else 0,
-            'unique_words': len(set(words)),
-            'has_contact_info': bool(re.search(r'[^@]+@[^@]+\.[^@]+', text)),
-            'has_phone': bool(re.search(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', text)),
-        }
+        document = document or normalize_document(text)
+        return dict(document.stats)
+
+
+CV_SEGMENTER = SectionSegmenter(TextPreprocessor.CV_SECTIONS)
+JD_SEGMENTER = SectionSegmenter(TextPreprocessor.JD_SECTIONS)
@@ -0,0 +1,128 @@
+"""
+Prediction result cache
+
+Keys combine hashes of the cleaned CV and JD with the scoring version (see
+predictor.scoring_version), so replacing the regression pickle, changing
+the encoder, the skill taxonomy or the guardrail constants invalidates every
+stale entry automatically. The store is pluggable: an in-process LRU or any
+cache configured in Django's CACHES.
+"""
+
+import hashlib
+import threading
+from typing import Optional
+
+from .conf import get_setting
+from .lru_cache import LRUCache
+
+
+def make_result_key(cv_cleaned: str, jd_cleaned: str, version: str) -> str:
+    digest = hashlib.sha256()
+    for part in (version, cv_cleaned, jd_cleaned):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class LocalResultCache(LRUCache):
+    """In-process LRU store"""
+
+    def __init__(self, max_entries: int = 10000):
+        super().__init__(max_entries)
+
+    # Callers get and store their own copies, so a result handed out is
+    # never the cached one
+    def _prepare(self, result: dict) -> dict:
+        return dict(result)
+
+    def _export(self, result: dict) -> dict:
+        return dict(result)
+
+    def set(self, key: str, result: dict) -> None:
+        self.put(key, result)
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        return {
+            'backend': 'local',
+            **{name: stats[name] for name in ('entries', 'max_entries', 'hits', 'misses', 'evictions')},
+        }
+
+
+class DjangoResultCache:
+    """Store backed by a cache alias from Django's CACHES setting"""
+
+    KEY_PREFIX = 'cvmatcher:result:'
+
+    def __init__(self, alias: str = 'default', timeout: Optional[int] = 3600):
+        self.alias = alias
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def _cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key: str) -> Optional[dict]:
+        result = self._cache.get(self.KEY_PREFIX + key)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def set(self, key: str, result: dict) -> None:
+        self._cache.set(self.KEY_PREFIX + key, result, self.timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'backend': 'django',
+                'alias': self.alias,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class NullResultCache:
+    """Disables result caching"""
+
+    def get(self, key: str) -> Optional[dict]:
+        return None
+
+    def set(self, key: str, result: dict) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {'backend': 'none'}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Process-wide result cache chosen by the RESULT_CACHE_BACKEND setting"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                backend = get_setting('RESULT_CACHE_BACKEND', 'local')
+                if backend == 'local':
+                    _cache = LocalResultCache(get_setting('RESULT_CACHE_MAX_ENTRIES', 10000))
+                elif backend == 'django':
+                    _cache = DjangoResultCache(
+                        alias=get_setting('RESULT_CACHE_ALIAS', 'default'),
+                        timeout=get_setting('RESULT_CACHE_TIMEOUT', 3600),
+                    )
+                elif backend == 'none':
+                    _cache = NullResultCache()
+                else:
+                    raise ValueError(
+                        f"Unknown RESULT_CACHE_BACKEND '{backend}'. Choose from: local, django, none"
+                    )
+    return _cache
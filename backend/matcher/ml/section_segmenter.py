@@ -0,0 +1,94 @@
+"""
+Single-pass section segmentation for CVs and job descriptions
+
+One compiled regex walks the raw text (newlines intact) and yields only
+short, header-shaped lines: a phrase of at most a few words that ends the
+line or is followed by a colon ("Work Experience", "Requirements: ...").
+The words of each candidate are looked up in a dict built from the
+configured keywords, so the cost is linear in document length and does not
+grow with the number of keywords. A section runs from its header line to
+the next recognised header.
+"""
+
+import re
+from typing import Dict, Iterable, Optional, Tuple
+
+from .skill_matcher import tokenize
+
+# Indentation and bullet/heading marks, then a letters-only phrase that
+# ends the line or is followed by a colon. The phrase is bounded, so each
+# line start costs a constant amount of work.
+HEADER_PATTERN = re.compile(
+    r'^[^\S\n]*(?:[^\w\s][^\S\n]*){0,3}'
+    r'([A-Za-z][A-Za-z&/ \t\-]{0,48}?)'
+    r'[^\S\n]*(?::|$)',
+    re.MULTILINE
+)
+
+Span = Tuple[int, int]
+
+
+def _singular(token: str) -> str:
+    """Plurals ("Skills", "Certifications") match their singular keyword"""
+    return token[:-1] if len(token) > 3 and token.endswith('s') else token
+
+
+class SectionSegmenter:
+    """Maps header keywords to section names and splits text into spans"""
+
+    def __init__(self, sections: Dict[str, Iterable[str]], max_header_words: int = 4):
+        # Keyword token tuple -> section; the first section to claim a
+        # keyword wins, as in the order of the configured dict
+        self._keywords = {}
+        self._max_keyword_words = 1
+        for section, keywords in sections.items():
+            for keyword in keywords:
+                tokens = tuple(_singular(token) for token in tokenize(keyword))
+                if tokens:
+                    self._keywords.setdefault(tokens, section)
+                    self._max_keyword_words = max(self._max_keyword_words, len(tokens))
+
+        self.sections = tuple(sections)
+        self.max_header_words = max_header_words
+
+    def header_section(self, phrase: str) -> Optional[str]:
+        """Section named by a header phrase, or None if it is not a header"""
+        tokens = tokenize(phrase)
+        if not tokens or len(tokens) > self.max_header_words:
+            return None
+        tokens = [_singular(token) for token in tokens]
+        for start in range(len(tokens)):
+            for size in range(min(self._max_keyword_words, len(tokens) - start), 0, -1):
+                section = self._keywords.get(tuple(tokens[start:start + size]))
+                if section is not None:
+                    return section
+        return None
+
+    def headers(self, text: str):
+        """Yield (line_start, section) for each recognised header line"""
+        for match in HEADER_PATTERN.finditer(text):
+            section = self.header_section(match.group(1))
+            if section is not None:
+                yield match.start(), section
+
+    def segment(self, text: str) -> Dict[str, Tuple[Span, ...]]:
+        """
+        Split text into sections
+        Returns: dict of section name -> tuple of (start, end) spans of text;
+        a section that appears more than once has one span per occurrence
+        """
+        spans = {section: [] for section in self.sections}
+        current = None
+        current_start = 0
+
+        for line_start, section in self.headers(text):
+            if section == current:
+                continue
+            if current is not None:
+                spans[current].append((current_start, line_start))
+            current, current_start = section, line_start
+
+        if current is not None:
+            spans[current].append((current_start, len(text)))
+
+        return {section: tuple(runs) for section, runs in spans.items()}
@@ -0,0 +1,104 @@
+"""
+Word-boundary-aware multi-phrase skill matching
+
+Skills are compiled once into a token trie with Aho-Corasick failure links,
+so every skill in a document is found in a single pass over its tokens. The
+cost depends on document length, not on how many skills are configured, and
+a skill only matches whole words ("java" does not match "javascript").
+"""
+
+import re
+from collections import deque
+from typing import Iterable, List, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, splitting on anything that is not a-z or 0-9"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SkillMatcher:
+    """Aho-Corasick automaton over word tokens"""
+
+    def __init__(self, skills: Iterable[str]):
+        # Node i: goto[i] maps token -> child, fail[i] is the failure link and
+        # output[i] the skills that end at this node (including via fail links)
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        self.skills = []
+        self._lengths = {}
+        for skill in skills:
+            tokens = tokenize(skill)
+            if tokens:
+                self._add(tokens, skill)
+                self.skills.append(skill)
+                self._lengths[skill] = len(tokens)
+
+        self._build_failure_links()
+
+    def __len__(self) -> int:
+        return len(self.skills)
+
+    def _add(self, tokens: List[str], skill: str) -> None:
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = child
+        if skill not in self._output[node]:
+            self._output[node] = self._output[node] + (skill,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+
+                fail = self._fail[node]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(token, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> Set[str]:
+        """Return every configured skill occurring in text as whole words"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = set()
+        node = 0
+        for token in TOKEN_PATTERN.findall(text.lower()):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if output[node]:
+                found.update(output[node])
+        return found
+
+    def spans(self, tokens: List[str]) -> List[Tuple[int, int, str]]:
+        """(start, end, skill) for every skill occurring in a token list"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        found = []
+        node = 0
+        for end, token in enumerate(tokens, 1):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            for skill in output[node]:
+                found.append((end - self._lengths[skill], end, skill))
+        return found
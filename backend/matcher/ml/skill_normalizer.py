@@ -0,0 +1,203 @@
+"""
+Map the skills a document mentions onto the canonical skill taxonomy
+
+Two stages, cheapest first:
+
+1. Exact: one Aho-Corasick pass (SkillMatcher) over the canonical skills
+   and an alias table ("k8s" -> "kubernetes", "postgres" -> "sql").
+2. Semantic (off unless SKILL_SEMANTIC_MATCHING is set): the word n-grams
+   of the document that the exact stage did not cover (trimmed of
+   stopwords, deduplicated, the most frequent kept) are embedded in one
+   batch and compared with the embeddings of every canonical skill in a
+   single matrix product. A candidate maps to its most similar skill when
+   the cosine similarity reaches the threshold.
+
+The skill embedding matrix is built once per encoder and taxonomy and
+cached as an .npy file, so workers after the first one load it from disk.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import zlib
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set
+
+import numpy as np
+
+from .skill_matcher import SkillMatcher, tokenize
+from .vectors import normalize_rows
+
+# Words that never start or end a skill phrase
+STOPWORDS = frozenset("""
+a an and are as at be been but by for from has have in into is it its of on or
+our over the their this to under was were will with within without we you your
+i my me he she they them who which what when where while than then also etc
+very more most other such can could should would may must per via using used
+years year months month experience experienced work worked working team teams
+responsible responsibilities including strong good excellent ability skills
+knowledge understanding role job position company new various across
+""".split())
+
+
+# Bump when candidate selection changes which phrases are matched
+CANDIDATES_VERSION = 2
+
+
+class SkillNormalizer:
+    """Exact alias matching plus embedding-based matching of candidate phrases"""
+
+    def __init__(self, skills: Sequence[str], aliases: Dict[str, str],
+                 encode: Callable[[List[str]], np.ndarray], encoder_id: Callable[[], str],
+                 threshold: float = 0.7, max_ngram: int = 3, max_candidates: int = 512,
+                 cache_dir: Optional[str] = None):
+        unknown = sorted(set(aliases.values()) - set(skills))
+        if unknown:
+            raise ValueError(f"Aliases point at unknown skills: {', '.join(unknown)}")
+
+        self.skills = list(skills)
+        self.aliases = dict(aliases)
+        self.threshold = threshold
+        self.max_ngram = max_ngram
+        self.max_candidates = max_candidates
+        self.cache_dir = cache_dir
+
+        self._encode = encode
+        self._encoder_id = encoder_id
+        self._canonical = {skill: skill for skill in self.skills}
+        self._canonical.update(self.aliases)
+        self._matcher = SkillMatcher(list(self._canonical))
+        # Token forms of every phrase the exact stage already knows
+        self._known = {' '.join(tokenize(phrase)) for phrase in self._canonical}
+
+        self._matrix = None
+        self._matrix_key = None
+        self._lock = threading.Lock()
+
+    @property
+    def config(self) -> tuple:
+        """Everything besides the encoder that can change which skills are found"""
+        return (
+            tuple(self.skills), tuple(sorted(self.aliases.items())),
+            self.threshold, self.max_ngram, self.max_candidates, CANDIDATES_VERSION,
+        )
+
+    # =========================
+    # EXACT
+    # =========================
+
+    def find(self, text: str) -> Set[str]:
+        """Canonical skills spelled out in text, directly or through an alias"""
+        return {self._canonical[phrase] for phrase in self._matcher.find(text)}
+
+    def candidates(self, text: str) -> List[str]:
+        """
+        Distinct word n-grams of text that may name a skill: no stopword at
+        either end, not all digits, and no token that is part of an exact
+        skill or alias match. Drawn from the whole document; when there are
+        more than max_candidates, the most frequent are kept, ties broken by
+        a stable hash so that they are sampled evenly across the text.
+        """
+        tokens = tokenize(text)
+        covered = bytearray(len(tokens))
+        for start, end, _ in self._matcher.spans(tokens):
+            covered[start:end] = b'\x01' * (end - start)
+
+        counts: Dict[str, int] = {}
+        for start, token in enumerate(tokens):
+            if covered[start] or token in STOPWORDS or token.isdigit() or len(token) < 2:
+                continue
+            for end in range(start + 1, min(start + self.max_ngram, len(tokens)) + 1):
+                if covered[end - 1]:
+                    break
+                if tokens[end - 1] in STOPWORDS:
+                    # A later token can still end a phrase ("design of apis")
+                    continue
+                phrase = ' '.join(tokens[start:end])
+                if phrase not in self._known:
+                    counts[phrase] = counts.get(phrase, 0) + 1
+
+        if len(counts) <= self.max_candidates:
+            return list(counts)
+        ranked = sorted(counts, key=lambda phrase: (-counts[phrase], zlib.crc32(phrase.encode('utf-8'))))
+        return ranked[:self.max_candidates]
+
+    # =========================
+    # SEMANTIC
+    # =========================
+
+    def _cache_path(self, encoder_id: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        digest = hashlib.sha256()
+        digest.update(encoder_id.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update('\n'.join(self.skills).encode('utf-8'))
+        return os.path.join(self.cache_dir, f"skill_embeddings-{digest.hexdigest()[:16]}.npy")
+
+    def skill_matrix(self) -> np.ndarray:
+        """L2-normalised embeddings of the canonical skills (len(skills) x dim)"""
+        encoder_id = self._encoder_id()
+        if self._matrix is not None and self._matrix_key == encoder_id:
+            return self._matrix
+
+        with self._lock:
+            if self._matrix is None or self._matrix_key != encoder_id:
+                path = self._cache_path(encoder_id)
+                matrix = None
+                if path and os.path.exists(path):
+                    matrix = np.load(path)
+                    if matrix.shape[0] != len(self.skills):
+                        matrix = None
+                if matrix is None:
+                    matrix = normalize_rows(self._encode(self.skills))
+                    if path:
+                        _save_matrix(path, matrix)
+                self._matrix, self._matrix_key = matrix, encoder_id
+        return self._matrix
+
+    def match(self, phrases: List[str], vectors: np.ndarray) -> Dict[str, str]:
+        """Canonical skill for every phrase whose best similarity reaches the threshold"""
+        if not phrases:
+            return {}
+        similarities = normalize_rows(vectors) @ self.skill_matrix().T
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(phrases)), best]
+        return {
+            phrase: self.skills[skill]
+            for phrase, skill, score in zip(phrases, best, scores)
+            if score >= self.threshold
+        }
+
+    def find_many(self, texts: Iterable[str], semantic: bool = True) -> List[Set[str]]:
+        """
+        Skills of several documents
+        The semantic stage encodes the union of every document's candidates
+        in one batch and matches them with one matrix product.
+        """
+        texts = list(texts)
+        skills = [self.find(text) for text in texts]
+        if not semantic:
+            return skills
+
+        candidates = [self.candidates(text) for text in texts]
+        phrases = list(dict.fromkeys(phrase for found in candidates for phrase in found))
+        if not phrases:
+            return skills
+
+        matched = self.match(phrases, self._encode(phrases))
+        for found, document_candidates in zip(skills, candidates):
+            found.update(matched[phrase] for phrase in document_candidates if phrase in matched)
+        return skills
+
+
+def _save_matrix(path: str, matrix: np.ndarray) -> None:
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npy')
+        with os.fdopen(fd, 'wb') as matrix_file:
+            np.save(matrix_file, matrix)
+        os.replace(temp_path, path)
+    except OSError:
+        # The cache only saves an encode on the next start
+        pass
@@ -0,0 +1,61 @@
+"""
+Deterministic model stubs for the test suite and the benchmarks
+
+install_stub_models() swaps the sentence encoder and the regression for
+stubs that need no network or model files, so scoring code runs end to end
+and measures (or asserts on) the matcher's own work.
+"""
+
+import hashlib
+from typing import Callable
+
+import numpy as np
+
+
+class StubEncoder:
+    """Deterministic unit vectors derived from a hash of each text"""
+
+    dimension = 384
+
+    def encode(self, texts, **kwargs):
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+            vectors[row] = np.random.default_rng(seed).standard_normal(self.dimension)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def install_stub_models(encoder=None) -> Callable[[], None]:
+    """
+    Replace the models with stubs (encoder defaults to a StubEncoder)
+    Returns a function that puts the previous models back. Stub vectors are
+    cached under the real encoder's id, so it also drops them from the
+    in-memory caches.
+    """
+    from .linear_scorer import LinearScorer
+    from .model_loader import models
+    from .predictor import embedding_cache, phrase_cache, skill_normalizer
+
+    saved = (
+        models._bert_model, models._reg_model, skill_normalizer.cache_dir,
+        skill_normalizer._matrix, skill_normalizer._matrix_key,
+    )
+
+    def clear_caches():
+        embedding_cache.clear()
+        phrase_cache.clear()
+        skill_normalizer._matrix = skill_normalizer._matrix_key = None
+
+    models._bert_model = encoder or StubEncoder()
+    # Fixed weights over [skill, experience, education, semantic]
+    models._reg_model = LinearScorer([0.4, 0.25, 0.1, 0.25], 0.0)
+    # Stub skill embeddings must not land in the on-disk cache of the real encoder
+    skill_normalizer.cache_dir = None
+    clear_caches()
+
+    def restore():
+        clear_caches()
+        (models._bert_model, models._reg_model, skill_normalizer.cache_dir,
+         skill_normalizer._matrix, skill_normalizer._matrix_key) = saved
+
+    return restore
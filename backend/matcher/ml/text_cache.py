@@ -0,0 +1,49 @@
+"""
+Cache of extracted document text keyed by upload content hash
+
+Re-uploading the same file skips parsing entirely. Entries are bounded by
+count and by UTF-8 size and evicted LRU; an optional directory acts as a
+write-through disk tier, bounded by max_disk_bytes (see lru_cache.py).
+"""
+
+import hashlib
+from typing import Optional
+
+from .lru_cache import LRUCache, atomic_write
+
+
+class ExtractedTextCache(LRUCache):
+    """Thread-safe LRU cache of extracted text"""
+
+    DISK_SUFFIX = '.txt'
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024,
+                 disk_dir: Optional[str] = None, max_disk_bytes: int = 1024 * 1024 * 1024):
+        super().__init__(max_entries, max_bytes, disk_dir, max_disk_bytes)
+
+    @staticmethod
+    def hash_upload(file) -> str:
+        """SHA-256 of an uploaded file, computed while streaming its chunks"""
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(content_digest: str, *variant) -> str:
+        """Key for a digest plus anything that changes the extracted output"""
+        suffix = ":".join(str(v) for v in variant)
+        return hashlib.sha256(f"{content_digest}:{suffix}".encode('utf-8')).hexdigest()
+
+    def _size(self, text: str) -> int:
+        return len(text.encode('utf-8'))
+
+    # newline='' both ways: a disk hit must return the text exactly as
+    # extracted (\r\n included), like a memory hit or a fresh parse
+
+    def _read(self, path: str) -> str:
+        with open(path, 'r', encoding='utf-8', newline='') as cached:
+            return cached.read()
+
+    def _write(self, path: str, text: str) -> int:
+        return atomic_write(path, lambda out: out.write(text), 'w', encoding='utf-8', newline='')
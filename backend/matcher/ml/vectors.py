@@ -0,0 +1,16 @@
+"""
+Vector helpers shared by scoring, the CV index, the ANN index and skill matching
+"""
+
+import numpy as np
+
+
+def normalize_rows(vectors, dtype=np.float32) -> np.ndarray:
+    """
+    Rows of vectors (a 1-D vector is one row) scaled to unit L2 norm
+    Zero rows stay zero, so their cosine similarity with anything is 0 (as in
+    scikit-learn).
+    """
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=dtype))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
@@ -0,0 +1,24 @@
+"""
+Shared fixtures: the models are replaced by the deterministic stubs in
+matcher.ml.testing (which the benchmarks use too), so no test needs the
+network or the real encoder
+"""
+
+import pytest
+
+from matcher.ml.testing import install_stub_models
+
+
+@pytest.fixture(autouse=True)
+def no_match_recording(settings):
+    # Tests that exercise the recorder build their own
+    settings.MATCH_RECORDER_ENABLED = False
+
+
+@pytest.fixture
+def stub_models():
+    from matcher.ml.model_loader import models
+
+    restore = install_stub_models()
+    yield models
+    restore()
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pytest
+
+from matcher.ml.ann_index import IVFIndex, IVFIndexError
+
+
+def unit_vectors(count, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_top_k(queries, vectors, ids, k):
+    scores = queries @ vectors.T
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+    return ids[order]
+
+
+@pytest.fixture
+def index():
+    vectors = unit_vectors(2000)
+    index = IVFIndex(32, nlist=16, nprobe=4)
+    index.train(vectors, iterations=5)
+    index.add(vectors)
+    return index, vectors
+
+
+def test_full_probe_matches_exact_search(index):
+    index, vectors = index
+    queries = unit_vectors(50, seed=1)
+    _, found = index.search(queries, 10, nprobe=index.nlist)
+    np.testing.assert_array_equal(found, exact_top_k(queries, vectors, np.arange(len(vectors)), 10))
+
+
+def test_remove_and_replace(index):
+    index, vectors = index
+    assert index.remove([3, 5, 5, 123456, -1]) == 2
+    assert index.remove([3]) == 0
+    assert index.ntotal == len(vectors) - 2
+
+    # Re-adding an id replaces its vector instead of duplicating it
+    index.add(vectors[[7]], [7])
+    index.add(vectors[[7]], [7])
+    assert index.ntotal == len(vectors) - 2
+
+    ids = np.delete(np.arange(len(vectors)), [3, 5])
+    queries = unit_vectors(20, seed=2)
+    _, found = index.search(queries, 10, nprobe=index.nlist)
+    np.testing.assert_array_equal(found, exact_top_k(queries, vectors[ids], ids, 10))
+
+
+def test_save_swaps_in_a_complete_directory(index, tmp_path):
+    index, vectors = index
+    path = str(tmp_path / 'ann')
+    index.save(path)
+    first = os.path.realpath(path)
+    index.remove([0])
+    index.save(path)
+
+    assert os.path.islink(path) and os.path.realpath(path) != first
+    assert not os.path.exists(first)
+    loaded = IVFIndex.load(path)
+    assert loaded.ntotal == len(vectors) - 1
+    assert loaded.remove([0]) == 0 and loaded.remove([1]) == 1
+
+    IVFIndex.delete(path)
+    assert os.listdir(tmp_path) == []
+
+
+def test_negative_ids_are_rejected(index):
+    index, vectors = index
+    with pytest.raises(IVFIndexError):
+        index.add(vectors[:1], [-5])
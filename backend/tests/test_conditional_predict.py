@@ -0,0 +1,47 @@
+import pytest
+from rest_framework.test import APIClient
+
+CV = 'Python developer with 6 years of experience building Django and PostgreSQL services on AWS.'
+JD = 'We are hiring a backend engineer: Python, Django, SQL and AWS, at least 4 years of experience.'
+
+
+@pytest.fixture
+def client(stub_models):
+    return APIClient()
+
+
+def predict(client, **headers):
+    return client.post('/api/predict/', {'cv_text': CV, 'jd_text': JD}, format='json', **headers)
+
+
+def test_matching_etag_returns_304(client):
+    first = predict(client)
+    assert first.status_code == 200
+    etag = first['ETag']
+
+    second = predict(client, HTTP_IF_NONE_MATCH=etag)
+    assert second.status_code == 304
+    assert second['ETag'] == etag
+    assert not second.content
+
+    weak = predict(client, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+    assert weak.status_code == 304
+
+
+def test_other_etag_returns_result(client):
+    response = predict(client, HTTP_IF_NONE_MATCH='"0123456789abcdef0123456789abcdef"')
+    assert response.status_code == 200
+    assert 'overall_match' in response.json()
+
+
+def test_wildcard_is_ignored(client):
+    response = predict(client, HTTP_IF_NONE_MATCH='*')
+    assert response.status_code == 200
+    assert 'overall_match' in response.json()
+
+
+def test_etag_changes_with_the_texts(client):
+    first = predict(client)['ETag']
+    other = client.post('/api/predict/', {'cv_text': CV + ' Kubernetes.', 'jd_text': JD}, format='json')
+    assert other.status_code == 200
+    assert other['ETag'] != first
@@ -0,0 +1,66 @@
+import numpy as np
+
+from matcher.ml.cv_index import CVIndex
+
+
+def entry(number):
+    return {
+        'id': f'cv{number}', 'text_hash': str(number), 'skills': {'python'},
+        'experience_text': '', 'education': '', 'experience_years': 0,
+    }
+
+
+def vectors(count, seed=0):
+    data = np.random.default_rng(seed).standard_normal((count, 8)).astype(np.float32)
+    return data / np.linalg.norm(data, axis=1, keepdims=True)
+
+
+def test_instances_sharing_a_directory_see_each_others_changes(tmp_path):
+    # Two instances stand in for two worker processes
+    writer = CVIndex(str(tmp_path), dim=8)
+    reader = CVIndex(str(tmp_path), dim=8)
+
+    added = vectors(1500)
+    writer.add_features([entry(i) for i in range(1500)], added)
+    assert len(reader) == 1500
+    np.testing.assert_array_equal(reader._vectors[reader._rows['cv1499']], added[1499])
+
+    # Both append; rows never collide
+    reader.add_features([entry(5000)], vectors(1, seed=1))
+    writer.add_features([entry(6000)], vectors(1, seed=2))
+    assert writer._rows['cv5000'] != writer._rows['cv6000']
+    assert len(writer) == len(reader) == 1502
+
+    writer.remove('cv3')
+    assert 'cv3' not in reader
+
+    writer.compact()
+    assert len(reader) == 1501
+    assert len(CVIndex(str(tmp_path), dim=8)) == 1501
+
+
+def test_ann_follows_journaled_changes(tmp_path):
+    writer = CVIndex(str(tmp_path), dim=8)
+    writer.add_features([entry(i) for i in range(300)], vectors(300))
+    writer.build_ann(nlist=4, iterations=3)
+
+    reader = CVIndex(str(tmp_path), dim=8)
+    assert reader.ann is not None and reader.ann.ntotal == 300
+
+    writer.add_features([entry(1000)], vectors(1, seed=3))
+    writer.remove('cv0')
+    assert len(reader) == 300
+    assert reader.ann.ntotal == 300
+    assert reader.ann.remove([reader._rows['cv1000']]) == 1
+
+
+def test_search_skips_removed_cvs(tmp_path, stub_models):
+    index = CVIndex(str(tmp_path), dim=384)
+    index.add_many([f"Python developer number {i} with Django and SQL" for i in range(6)],
+                   [f'cv{i}' for i in range(6)])
+    index.remove('cv2')
+    index.remove('cv4')
+
+    found = {result['cv_id'] for result in index.search("Python Django developer", top_k=10)}
+    assert found == {'cv0', 'cv1', 'cv3', 'cv5'}
+    assert len(CVIndex(str(tmp_path), dim=384)) == 4
@@ -0,0 +1,26 @@
+import itertools
+
+import numpy as np
+
+from matcher.ml.predictor import (
+    MAX_MISMATCH_SCORE, SEMANTIC_MIN, SKILL_MIN, apply_domain_guardrail, apply_domain_guardrail_batch,
+)
+
+
+def test_batch_matches_scalar():
+    # Every boundary the scalar version branches on, plus values around them
+    skills = [0, 0.5, SKILL_MIN - 1, SKILL_MIN, SKILL_MIN + 1, 50, 100]
+    semantics = [0, 29.9, 30, 31, SEMANTIC_MIN - 1, SEMANTIC_MIN, SEMANTIC_MIN + 1, 80, 100]
+    overalls = [0, 20, 30, 31, MAX_MISMATCH_SCORE, MAX_MISMATCH_SCORE + 1, 70, 100]
+    grid = np.array(list(itertools.product(skills, semantics, overalls)), dtype=float)
+
+    batch = apply_domain_guardrail_batch(grid[:, 0], grid[:, 1], grid[:, 2])
+    scalar = [apply_domain_guardrail(*row) for row in grid]
+    np.testing.assert_array_equal(batch, scalar)
+
+
+def test_batch_matches_scalar_on_random_scores():
+    scores = np.random.default_rng(0).uniform(0, 100, size=(10000, 3))
+    scores[::7, 0] = 0
+    batch = apply_domain_guardrail_batch(scores[:, 0], scores[:, 1], scores[:, 2])
+    np.testing.assert_array_equal(batch, [apply_domain_guardrail(*row) for row in scores])
@@ -0,0 +1,50 @@
+import random
+import re
+
+from matcher.ml.normalizer import clean_text, has_email_like, normalize_document
+
+
+def baseline_clean_text(text):
+    """TextPreprocessor.clean_text before the patterns were precompiled and fused"""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'http\S+|www\S+', '', text)
+    text = re.sub(r'\S+@\S+', '', text)
+    text = re.sub(r'[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}', '', text)
+    text = re.sub(r'[^a-zA-Z0-9\s\.\,\-\(\)]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+PIECES = [
+    'Python', 'developer', '5 years', '<b>', '</b>', '<a href="x">', 'http://example.com/cv',
+    'www.site.org', 'jane.doe@mail.com', '@', '+1 (555) 123-4567', '555.123.4567', '(020)',
+    'C++', 'C#', 'node.js', 'café', 'naïve', '—', '\t', '\n\n', '   ', '.', ',', '-', '(', ')',
+    '<', '>', 'wwwx', 'https', '123', '4567890', '!', '?', '€', '½',
+]
+
+
+def test_clean_text_matches_baseline_pipeline():
+    rng = random.Random(0)
+    for _ in range(2000):
+        glue = rng.choice(['', ' ', '\n'])
+        text = glue.join(rng.choice(PIECES) for _ in range(rng.randint(0, 40)))
+        assert clean_text(text) == baseline_clean_text(text), repr(text)
+
+
+def test_has_email_like_matches_regex():
+    rng = random.Random(1)
+    alphabet = ['a', 'b', '.', '@', ' ']
+    for _ in range(2000):
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert has_email_like(text) == bool(re.search(r'[^@]+@[^@]+\.[^@]+', text)), repr(text)
+
+
+def test_document_stats_come_from_cleaned_text():
+    document = normalize_document('Senior <i>Python</i> engineer, mail me@x.io')
+    assert document.cleaned == 'Senior Python engineer, mail'
+    assert document.stats['word_count'] == 4
+    assert document.stats['has_contact_info']
+    assert document.match_text == 'senior python engineer mail'
@@ -0,0 +1,110 @@
+import threading
+
+import pytest
+from django.db import OperationalError
+
+from api import recorder
+from api.models import MatchResult
+
+RESULT = {
+    'skill_match': 50.0, 'experience_match': 60.0, 'education_match': 70.0,
+    'semantic_similarity': 80.0, 'overall_match': 65.0,
+}
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def dropped(reason):
+    counter = recorder.DROPPED_TOTAL
+    return counter._values.get(counter._key({'reason': reason}), 0.0)
+
+
+def test_writes_in_batches():
+    rec = recorder.MatchRecorder(batch_size=3, flush_interval=60)
+    for number in range(7):
+        assert rec.record(f'cv {number}', 'jd', RESULT, 'v1')
+    assert rec.flush(5)
+    rec.close()
+
+    rows = MatchResult.objects.all()
+    assert rows.count() == 7
+    assert {row.scoring_version for row in rows} == {'v1'}
+    assert all(len(row.cv_hash) == 64 for row in rows)
+
+
+def test_hashes_only_without_store_text():
+    rec = recorder.MatchRecorder(store_text=False)
+    rec.record('cv text', 'jd text', RESULT)
+    rec.close()
+    row = MatchResult.objects.get()
+    assert row.cv_text == row.jd_text == ''
+    assert row.cv_hash == recorder.text_hash('cv text')
+
+
+def test_drops_when_the_queue_is_full(monkeypatch):
+    written = threading.Event()
+    release = threading.Event()
+    real_write = recorder.MatchRecorder._write
+
+    def slow_write(self, batch):
+        written.set()
+        release.wait(5)
+        real_write(self, batch)
+
+    monkeypatch.setattr(recorder.MatchRecorder, '_write', slow_write)
+    rec = recorder.MatchRecorder(max_queue=2, batch_size=1)
+    before = dropped('queue_full')
+
+    rec.record('cv 0', 'jd', RESULT)
+    assert written.wait(5)
+    # The writer is busy: two fit in the queue, the rest are dropped
+    accepted = [rec.record(f'cv {n}', 'jd', RESULT) for n in range(1, 5)]
+    assert accepted == [True, True, False, False]
+    assert dropped('queue_full') == before + 2
+
+    release.set()
+    rec.close()
+    assert MatchResult.objects.count() == 3
+    assert not rec.record('cv late', 'jd', RESULT)
+
+
+def test_retries_transient_write_errors(monkeypatch):
+    real_bulk_create = type(MatchResult.objects).bulk_create
+    failures = iter([True, True])
+
+    def flaky_bulk_create(self, objects, **kwargs):
+        if next(failures, False):
+            raise OperationalError('database is locked')
+        return real_bulk_create(self, objects, **kwargs)
+
+    monkeypatch.setattr(type(MatchResult.objects), 'bulk_create', flaky_bulk_create)
+    rec = recorder.MatchRecorder(retry_backoff=0.001)
+    rec.record('cv', 'jd', RESULT)
+    rec.close()
+    assert MatchResult.objects.count() == 1
+
+
+def test_gives_up_after_the_retries(monkeypatch):
+    def locked(self, objects, **kwargs):
+        raise OperationalError('database is locked')
+
+    monkeypatch.setattr(type(MatchResult.objects), 'bulk_create', locked)
+    before = dropped('write_error')
+    rec = recorder.MatchRecorder(write_retries=2, retry_backoff=0.001)
+    rec.record('cv', 'jd', RESULT)
+    rec.record('cv', 'jd', RESULT)
+    rec.close()
+    assert dropped('write_error') == before + 2
+
+
+def test_flush_after_close_returns_at_once():
+    rec = recorder.MatchRecorder()
+    rec.record('cv', 'jd', RESULT)
+    rec.close()
+
+    done = []
+    flusher = threading.Thread(target=lambda: done.append(rec.flush()), daemon=True)
+    flusher.start()
+    flusher.join(5)
+    assert done == [True]
+    assert MatchResult.objects.count() == 1
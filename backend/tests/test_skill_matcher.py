@@ -0,0 +1,35 @@
+import random
+
+from matcher.ml.predictor import SKILLS, clean_text
+from matcher.ml.skill_matcher import SkillMatcher
+
+FILLER = ['we', 'need', 'a', 'developer', 'with', 'years', 'of', 'strong', 'team', 'and', 'in', '5']
+
+
+def substring_skills(text, skills):
+    """The scan SkillMatcher replaced, restricted to whole words"""
+    padded = f' {text} '
+    return {skill for skill in skills if f' {skill} ' in padded}
+
+
+def test_matches_substring_scan_on_whole_words():
+    matcher = SkillMatcher(SKILLS)
+    words = [word for skill in SKILLS for word in skill.split()] + FILLER
+    rng = random.Random(0)
+    for _ in range(500):
+        text = clean_text(' '.join(rng.choice(words) for _ in range(rng.randint(1, 60))))
+        assert matcher.find(text) == substring_skills(text, SKILLS)
+
+
+def test_does_not_match_inside_words():
+    matcher = SkillMatcher(['java', 'sql', 'git'])
+    text = clean_text('JavaScript, NoSQL and digital marketing')
+    assert matcher.find(text) == set()
+    # The old substring scan matched all three
+    assert {skill for skill in ['java', 'sql', 'git'] if skill in text} == {'java', 'sql', 'git'}
+
+
+def test_overlapping_and_multiword_skills():
+    matcher = SkillMatcher(['machine learning', 'learning', 'deep learning'])
+    assert matcher.find('deep learning and machine learning') == {'machine learning', 'learning', 'deep learning'}
+    assert matcher.spans(['machine', 'learning']) == [(0, 2, 'machine learning'), (1, 2, 'learning')]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from matcher.ml.testing import StubEncoder, install_stub_models
+
+TEXT = "Deployed services on k8s backed by postgres, with container orchestration. Enjoys sailing."
+
+
+class SynonymEncoder(StubEncoder):
+    """StubEncoder that embeds some phrases exactly like a given skill"""
+
+    def __init__(self, synonyms):
+        self.synonyms = synonyms
+
+    def encode(self, texts, **kwargs):
+        return super().encode([self.synonyms.get(text, text) for text in texts], **kwargs)
+
+
+@pytest.fixture
+def synonym_models():
+    restore = install_stub_models(SynonymEncoder({'container orchestration': 'docker'}))
+    yield
+    restore()
+
+
+def test_aliases_map_to_canonical_skills_without_the_encoder(synonym_models, settings):
+    from matcher.ml.predictor import extract_skills, extract_skills_many
+
+    settings.SKILL_SEMANTIC_MATCHING = False
+    assert set(extract_skills(TEXT)) == {'kubernetes', 'sql'}
+    assert extract_skills_many([TEXT]) == [{'kubernetes', 'sql'}]
+
+
+def test_semantic_stage_maps_only_phrases_above_the_threshold(synonym_models, settings):
+    from matcher.ml.predictor import extract_skills_many
+
+    settings.SKILL_SEMANTIC_MATCHING = True
+    # "container orchestration" embeds like docker; "sailing" and the other
+    # candidates are unrelated random directions
+    assert extract_skills_many([TEXT]) == [{'kubernetes', 'sql', 'docker'}]
+
+
+def test_phrase_below_the_threshold_is_not_mapped(stub_models):
+    from matcher.ml.predictor import skill_normalizer
+
+    threshold = skill_normalizer.threshold
+    docker = skill_normalizer.skill_matrix()[skill_normalizer.skills.index('docker')]
+    other = StubEncoder().encode(['sailing'])[0]
+    other = other - (other @ docker) * docker
+    other /= np.linalg.norm(other)
+
+    def at(similarity):
+        return similarity * docker + np.sqrt(1 - similarity ** 2) * other
+
+    phrases = ['just below', 'just above']
+    vectors = np.stack([at(threshold - 0.01), at(threshold + 0.01)])
+    assert skill_normalizer.match(phrases, vectors) == {'just above': 'docker'}
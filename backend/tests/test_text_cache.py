@@ -0,0 +1,30 @@
+import time
+
+from matcher.ml.text_cache import ExtractedTextCache
+
+
+def test_disk_hit_returns_text_exactly_as_extracted(tmp_path):
+    text = "Jane Doe\r\nPython developer\r\n\r\nExperience\n5 years\r"
+    ExtractedTextCache(disk_dir=str(tmp_path)).put('ab' * 32, text)
+
+    # A new instance (a restarted worker) only has the disk tier
+    cache = ExtractedTextCache(disk_dir=str(tmp_path))
+    assert cache.get('ab' * 32) == text
+    assert cache.stats()['disk_hits'] == 1
+
+
+def test_disk_tier_is_pruned_least_recently_used_first(tmp_path):
+    cache = ExtractedTextCache(max_entries=1, disk_dir=str(tmp_path), max_disk_bytes=3500)
+    keys = [f'{i:02d}' * 32 for i in range(5)]
+    for key in keys:
+        cache.put(key, 'x' * 1000)
+        time.sleep(0.01)  # distinct mtimes
+        while cache._pruning:
+            time.sleep(0.01)
+
+    stats = cache.stats()
+    assert stats['disk_evictions'] >= 2
+    assert stats['disk_bytes'] <= 3500
+    # The newest files survive
+    assert cache.get(keys[-1]) is not None
+    assert ExtractedTextCache(disk_dir=str(tmp_path)).get(keys[0]) is None